@@ -0,0 +1,77 @@
+"""
+Benchmark the events processed per second by a TradingSession
+backtest polling a queue.Queue versus the single-threaded
+BacktestEventQueue dispatch loop, on the bundled data/ CSVs.
+
+$ python -m benchmarks.bench_dispatch
+"""
+import contextlib
+import io
+import shutil
+import tempfile
+import time
+
+from munch import munchify
+
+from qstrader import settings
+from qstrader.compat import queue
+from qstrader.dispatcher import BacktestEventQueue
+from qstrader.event import EventType
+from qstrader.price_handler.yahoo_daily_csv_bar import YahooDailyCsvBarPriceHandler
+from qstrader.strategy.base import AbstractStrategy
+from qstrader.trading_session import TradingSession
+
+
+class CountingStrategy(AbstractStrategy):
+    """
+    Counts the price events it receives without trading,
+    so that the benchmark measures the event loop itself.
+    """
+    def __init__(self):
+        self.events = 0
+
+    def calculate_signals(self, event, portfolio_handler=None):
+        self.events += 1
+
+
+def bench_session(config, tickers, events_queue):
+    """
+    Returns the number of price events and the events per
+    second processed by a backtest using events_queue.
+    """
+    strategy = CountingStrategy()
+    with contextlib.redirect_stdout(io.StringIO()):
+        price_handler = YahooDailyCsvBarPriceHandler(
+            config.CSV_DATA_DIR, events_queue, tickers, columnar=True
+        )
+        session = TradingSession(
+            config, strategy, tickers, 10000.0, None, None,
+            events_queue, price_handler=price_handler,
+            title=["Dispatch benchmark"]
+        )
+        t0 = time.time()
+        session._run_session()
+        elapsed = time.time() - t0
+    return strategy.events, strategy.events / elapsed
+
+
+def run(config, tickers=("SPY", "AMZN", "RTN", "AGG", "GOOG")):
+    out_dir = tempfile.mkdtemp()
+    config = munchify({
+        "CSV_DATA_DIR": config.CSV_DATA_DIR, "OUTPUT_DIR": out_dir
+    })
+    try:
+        for name, events_queue in (
+            ("queue.Queue", queue.Queue()),
+            ("BacktestEventQueue", BacktestEventQueue())
+        ):
+            events, speed = bench_session(config, list(tickers), events_queue)
+            print("%20s: %d %sS @ %.0f events/s" % (
+                name, events, EventType.BAR.name, speed
+            ))
+    finally:
+        shutil.rmtree(out_dir)
+
+
+if __name__ == "__main__":
+    run(settings.TEST)
@@ -0,0 +1,71 @@
+"""
+Benchmark the vectorised create_drawdowns against the original
+loop-based implementation on random equity curves of up to
+10^6 points (the loop is only timed up to 10^5 points).
+
+$ python -m benchmarks.bench_drawdowns
+"""
+from itertools import groupby
+import time
+
+import numpy as np
+import pandas as pd
+
+from qstrader.statistics.performance import create_drawdowns
+
+
+def loop_create_drawdowns(returns):
+    """
+    The original loop-based implementation of create_drawdowns.
+    """
+    idx = returns.index
+    hwm = np.zeros(len(idx))
+    for t in range(1, len(idx)):
+        hwm[t] = max(hwm[t - 1], returns.iloc[t])
+    perf = pd.DataFrame(index=idx)
+    perf["Drawdown"] = (hwm - returns) / hwm
+    perf.loc[perf.index[0], "Drawdown"] = 0.0
+    perf["DurationCheck"] = np.where(perf["Drawdown"] == 0, 0, 1)
+    duration = max(
+        sum(1 for i in g if i == 1)
+        for k, g in groupby(perf["DurationCheck"])
+    )
+    return perf["Drawdown"], np.max(perf["Drawdown"]), duration
+
+
+def equity_curve(points, seed=42):
+    """
+    Creates a minutely cumulative returns curve.
+    """
+    rnd = np.random.RandomState(seed)
+    idx = pd.date_range("2000-01-03", periods=points, freq="min")
+    returns = rnd.normal(0.0, 0.0005, points)
+    return pd.Series(np.exp(np.cumsum(np.log1p(returns))), index=idx)
+
+
+def timed(func, *args, **kwargs):
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def run(sizes=(10 ** 4, 10 ** 5, 10 ** 6), max_loop_size=10 ** 5):
+    print("%10s %14s %14s %10s" % ("points", "vectorised", "loop", "episodes"))
+    for points in sizes:
+        curve = equity_curve(points)
+        (dd, dd_max, dd_dur, episodes), secs = timed(
+            create_drawdowns, curve, episodes=True
+        )
+        if points <= max_loop_size:
+            (dd_l, dd_max_l, dd_dur_l), secs_l = timed(
+                loop_create_drawdowns, curve
+            )
+            assert dd_max == dd_max_l and dd_dur == dd_dur_l
+            loop = "%.3fs" % secs_l
+        else:
+            loop = "-"
+        print("%10d %13.3fs %14s %10d" % (points, secs, loop, len(episodes)))
+
+
+if __name__ == "__main__":
+    run()
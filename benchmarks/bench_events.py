@@ -0,0 +1,115 @@
+"""
+Benchmark the memory footprint and throughput of BarEvents.
+
+Compares the slotted BarEvent against an equivalent __dict__-based
+event (as BarEvent was originally implemented), and the columnar
+YahooDailyCsvBarPriceHandler stream with and without event recycling.
+
+$ python -m benchmarks.bench_events
+"""
+import contextlib
+import io
+import time
+import tracemalloc
+
+import pandas as pd
+
+from qstrader import settings
+from qstrader.compat import queue
+from qstrader.event import BarEvent, EventType
+from qstrader.price_handler.yahoo_daily_csv_bar import YahooDailyCsvBarPriceHandler
+
+
+class DictBarEvent(object):
+    """
+    Reference __dict__-based bar event, computing its
+    readable period eagerly from a freshly built lookup table.
+    """
+    def __init__(
+        self, ticker, time, period,
+        open_price, high_price, low_price,
+        close_price, volume, adj_close_price=None
+    ):
+        self.type = EventType.BAR
+        self.ticker = ticker
+        self.time = time
+        self.period = period
+        self.open_price = open_price
+        self.high_price = high_price
+        self.low_price = low_price
+        self.close_price = close_price
+        self.volume = volume
+        self.adj_close_price = adj_close_price
+        lut = {60: "1min", 3600: "1hr", 86400: "1day"}
+        self.period_readable = lut.get(period, "%ssec" % period)
+
+
+def bench_allocation(event_cls, n):
+    """
+    Returns the time taken and peak memory used to hold
+    n events of class event_cls.
+    """
+    timestamp = pd.Timestamp("2016-01-04")
+    t0 = time.time()
+    events = [
+        event_cls("SPY", timestamp, 86400, i, i, i, i, i, i)
+        for i in range(n)
+    ]
+    elapsed = time.time() - t0
+    del events
+    # Memory is traced separately as tracing slows allocation
+    tracemalloc.start()
+    events = [
+        event_cls("SPY", timestamp, 86400, i, i, i, i, i, i)
+        for i in range(n)
+    ]
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    del events
+    return elapsed, peak
+
+
+def bench_stream(config, tickers, recycle_events):
+    """
+    Returns the number of bars and bars per second streamed
+    through the events queue by the columnar price handler.
+    """
+    events_queue = queue.Queue()
+    with contextlib.redirect_stdout(io.StringIO()):
+        price_handler = YahooDailyCsvBarPriceHandler(
+            config.CSV_DATA_DIR, events_queue, tickers,
+            columnar=True, recycle_events=recycle_events
+        )
+    bars = 0
+    t0 = time.time()
+    while price_handler.continue_backtest:
+        price_handler.stream_next()
+        while not events_queue.empty():
+            events_queue.get(False)
+            bars += 1
+    return bars, bars / (time.time() - t0)
+
+
+def run(config, n=1000000, tickers=("SPY", "AMZN", "RTN", "AGG")):
+    print("Allocating %d bar events" % n)
+    for name, event_cls in (
+        ("dict", DictBarEvent), ("slotted", BarEvent)
+    ):
+        elapsed, peak = bench_allocation(event_cls, n)
+        print(
+            "%8s: %6.2fs, %7.1f MB peak, %5.0f bytes/event" % (
+                name, elapsed, peak / 1e6, peak / float(n)
+            )
+        )
+    print("Streaming %s" % list(tickers))
+    for recycle_events in (False, True):
+        bars, speed = bench_stream(config, list(tickers), recycle_events)
+        print(
+            "recycle_events=%s: %d bars @ %.0f bars/s" % (
+                recycle_events, bars, speed
+            )
+        )
+
+
+if __name__ == "__main__":
+    run(settings.TEST)
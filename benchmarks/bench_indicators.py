@@ -0,0 +1,68 @@
+"""
+Benchmark the streaming indicators against recomputing the same
+statistic over a deque of the window on every update, as the
+example strategies did, on a random walk of integer prices.
+
+$ python -m benchmarks.bench_indicators
+"""
+from collections import deque
+import time
+
+import numpy as np
+
+from qstrader.indicators import RollingMax, RollingStd, SMA
+
+
+def naive(func, window):
+    """
+    Returns an update function recomputing func over the window.
+    """
+    values = deque(maxlen=window)
+
+    def update(value):
+        values.append(value)
+        if len(values) == window:
+            return func(values)
+    return update
+
+
+NAIVE = {
+    "SMA": lambda values: np.mean(values),
+    "RollingStd": lambda values: np.std(values, ddof=1),
+    "RollingMax": max,
+}
+
+STREAMING = {
+    "SMA": SMA,
+    "RollingStd": RollingStd,
+    "RollingMax": RollingMax,
+}
+
+
+def timed(update, prices):
+    start = time.perf_counter()
+    for price in prices:
+        update(price)
+    return time.perf_counter() - start
+
+
+def run(updates=100000, windows=(20, 100, 300)):
+    prices = (
+        1000000000 + np.cumsum(
+            np.random.RandomState(42).randint(-10000000, 10000000, updates)
+        )
+    ).tolist()
+    print("%12s %8s %14s %14s %9s" % (
+        "indicator", "window", "naive", "streaming", "speedup"
+    ))
+    for name in NAIVE:
+        for window in windows:
+            secs = timed(naive(NAIVE[name], window), prices)
+            secs_s = timed(STREAMING[name](window).update, prices)
+            print("%12s %8d %13.3fs %13.3fs %8.1fx" % (
+                name, window, secs, secs_s, secs / secs_s
+            ))
+
+
+if __name__ == "__main__":
+    run()
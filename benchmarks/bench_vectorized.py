@@ -0,0 +1,108 @@
+"""
+Benchmark a month-end rebalance backtested by the event-driven
+TradingSession versus the vectorised TargetWeightBacktest, on
+the bundled data/ CSVs.
+
+$ python -m benchmarks.bench_vectorized
+"""
+import calendar
+import contextlib
+import io
+import shutil
+import tempfile
+import time
+
+import pandas as pd
+from munch import munchify
+
+from qstrader import settings
+from qstrader.dispatcher import BacktestEventQueue
+from qstrader.event import EventType, SignalEvent
+from qstrader.price_handler.yahoo_daily_csv_bar import YahooDailyCsvBarPriceHandler
+from qstrader.signal_sizer.weight import WeightComplexSignalSizer
+from qstrader.strategy.base import AbstractStrategy
+from qstrader.trading_session import TradingSession
+from qstrader.vectorized import TargetWeightBacktest
+
+
+def end_of_month(date):
+    return date.day == calendar.monthrange(date.year, date.month)[1]
+
+
+class MonthEndRebalanceStrategy(AbstractStrategy):
+    """
+    Rebalances every ticker to its weight on the bars falling
+    on the last day of a month.
+    """
+    def __init__(self, events_queue, ticker_weights):
+        self.events_queue = events_queue
+        self.signal_sizer = WeightComplexSignalSizer(ticker_weights)
+        self.invested = set()
+
+    def calculate_signals(self, event, portfolio_handler):
+        if event.type == EventType.BAR and end_of_month(event.time):
+            ticker = event.ticker
+            action = "REBALANCE" if ticker in self.invested else "BOT"
+            signal = self.signal_sizer.size_signal(
+                portfolio_handler.portfolio, SignalEvent(ticker, action)
+            )
+            if signal.suggested_quantity > 0:
+                self.events_queue.put(signal)
+                self.invested.add(ticker)
+
+
+def bench_event_driven(config, ticker_weights):
+    tickers = list(ticker_weights)
+    events_queue = BacktestEventQueue()
+    with contextlib.redirect_stdout(io.StringIO()):
+        t0 = time.time()
+        price_handler = YahooDailyCsvBarPriceHandler(
+            config.CSV_DATA_DIR, events_queue, tickers
+        )
+        session = TradingSession(
+            config, MonthEndRebalanceStrategy(events_queue, ticker_weights),
+            tickers, 500000.0, None, None, events_queue,
+            price_handler=price_handler, title=["Event-driven"]
+        )
+        results = session.start_trading(testing=True)
+        elapsed = time.time() - t0
+    return results, elapsed
+
+
+def bench_vectorized(config, ticker_weights):
+    t0 = time.time()
+    dates = pd.DatetimeIndex([])
+    for ticker in ticker_weights:
+        dates = dates.union(YahooDailyCsvBarPriceHandler.read_ticker_csv(
+            config.CSV_DATA_DIR, ticker
+        ).index)
+    dates = [date for date in dates if end_of_month(date)]
+    weights = pd.DataFrame([ticker_weights] * len(dates), index=dates)
+    results = TargetWeightBacktest(
+        config, weights, 500000.0, title=["Vectorised"]
+    ).run()
+    return results, time.time() - t0
+
+
+def run(config, ticker_weights=None):
+    if ticker_weights is None:
+        ticker_weights = {"SPY": 0.4, "AGG": 0.3, "GOOG": 0.3}
+    out_dir = tempfile.mkdtemp()
+    config = munchify({
+        "CSV_DATA_DIR": config.CSV_DATA_DIR, "OUTPUT_DIR": out_dir
+    })
+    try:
+        for name, bench in (
+            ("TradingSession", bench_event_driven),
+            ("TargetWeightBacktest", bench_vectorized)
+        ):
+            results, elapsed = bench(config, ticker_weights)
+            print("%20s: %.3fs, final equity %.2f, Sharpe %.3f" % (
+                name, elapsed, results["equity"].iloc[-1], results["sharpe"]
+            ))
+    finally:
+        shutil.rmtree(out_dir)
+
+
+if __name__ == "__main__":
+    run(settings.TEST)
@@ -3,8 +3,9 @@ import datetime
 
 from qstrader import settings
 from qstrader.strategy.base import AbstractStrategy
-from qstrader.signal_sizer.weight import WeightComplexSignalSizer
-from qstrader.event import SignalEvent, EventType
+from qstrader.signal_sizer.rebalance import PortfolioRebalanceSignalSizer
+from qstrader.event import EventType
+from qstrader.execution_handler.ib_simulated import IBSimulatedExecutionHandler
 from qstrader.compat import queue
 from qstrader.trading_session import TradingSession
 
@@ -14,14 +15,26 @@ class MonthlyRebalanceStrategy(AbstractStrategy):
     A generic strategy that allows monthly rebalancing of a
     set of tickers, via dollar-weighting of new positions.
 
-    Must be used in conjunction with the
-    RebalancePositionSizer object to work correctly.
+    The whole portfolio is rebalanced at once, with a single
+    batch of orders, once the bars of every ticker for the
+    end of the month have been received.
+
+    If a ticker has no bar at the end of the month (e.g. it is
+    not yet listed, or halted) the rebalance is instead made
+    when the next timestamp begins, trading only the tickers
+    which had a bar and leaving the position of the others as
+    it is.
     """
     def __init__(self, tickers, events_queue, ticker_weights):
         self.tickers = tickers
         self.events_queue = events_queue
         self.ticker_weights = ticker_weights
-        self.tickers_invested = self._create_invested_list()
+        self.signal_sizer = PortfolioRebalanceSignalSizer(
+            ticker_weights,
+            IBSimulatedExecutionHandler.calculate_ib_commission_array
+        )
+        self.rebalance_time = None
+        self.tickers_received = []
 
     def _end_of_month(self, cur_time):
         """
@@ -31,46 +44,30 @@ class MonthlyRebalanceStrategy(AbstractStrategy):
         end_day = calendar.monthrange(cur_time.year, cur_time.month)[1]
         return cur_day == end_day
 
-    def _create_invested_list(self):
-        """
-        Create a dictionary with each ticker as a key, with
-        a boolean value depending upon whether the ticker has
-        been "invested" yet. This is necessary to avoid sending
-        a liquidation signal on the first allocation.
-        """
-        tickers_invested = {ticker: False for ticker in self.tickers}
-        return tickers_invested
-
     def calculate_signals(self, event, portfolio_handler):
         """
         For a particular received BarEvent, determine whether
-        it is the end of the month (for that bar) and generate
-        a rebalance signal, as well as a purchase signal,
-        for each ticker.
+        it is the end of the month (for that bar) and, once the
+        bars of every ticker have arrived, rebalance the
+        portfolio to the ticker weights.
         """
-        if (
-            event.type in [EventType.BAR, EventType.TICK] and
-            self._end_of_month(event.time)
-        ):
-            ticker = event.ticker
-            # Select type of sizer
-            signal_sizer = WeightComplexSignalSizer(self.ticker_weights)
-            if self.tickers_invested[ticker]:
-                rebalance_signal = SignalEvent(ticker, "REBALANCE")
-                # Size the quantity of the signal
-                sized_signal = signal_sizer.size_signal(
-                    portfolio_handler.portfolio, rebalance_signal
-                )
-                self.events_queue.put(sized_signal)
-            
-            elif self.tickers_invested[ticker] == False:
-                long_signal = SignalEvent(ticker, "BOT")
-                # Size the quantity of the signal
-                sized_signal = signal_sizer.size_signal(
-                    portfolio_handler.portfolio, long_signal
-                )
-                self.events_queue.put(sized_signal)
-                self.tickers_invested[ticker] = True
+        if event.type not in [EventType.BAR, EventType.TICK]:
+            return
+        if self.rebalance_time is not None and event.time != self.rebalance_time:
+            # Not every ticker had a bar at the end of the month,
+            # so rebalance only those which did
+            portfolio_handler.rebalance(
+                self.signal_sizer, self.tickers_received
+            )
+            self.rebalance_time = None
+        if self._end_of_month(event.time):
+            if event.time != self.rebalance_time:
+                self.rebalance_time = event.time
+                self.tickers_received = []
+            self.tickers_received.append(event.ticker)
+            if len(self.tickers_received) == len(self.tickers):
+                portfolio_handler.rebalance(self.signal_sizer)
+                self.rebalance_time = None
 
 
 def run(config, testing, tickers, filename):
@@ -1,18 +1,15 @@
 import datetime
 import calendar
 
-from pypfopt import risk_models, expected_returns
-from pypfopt.efficient_frontier import EfficientFrontier
-
-import pandas as pd
-
 from qstrader import settings
 from qstrader.strategy.base import AbstractStrategy
 from qstrader.event import SignalEvent, EventType
+from qstrader.portfolio_construction import (
+    EWMeanCovariance, MaxSharpePortfolio
+)
 from qstrader.compat import queue
 from qstrader.trading_session import TradingSession
 from qstrader.signal_sizer.weight import WeightComplexSignalSizer
-from qstrader.price_parser import PriceParser
 
 
 class BuyAndHoldStopLossStrategy(AbstractStrategy):
@@ -35,7 +32,10 @@ class BuyAndHoldStopLossStrategy(AbstractStrategy):
         self.risk_pct = risk_pct
         self.tickers_invested = self._create_invested_list()
         self.maximum_prices = self._create_maximum_list()
-        self.df_close_price = self._create_event_list()
+        # Maximal Sharpe ratio weights, solved once per rebalance
+        self.portfolio = MaxSharpePortfolio(
+            tickers, EWMeanCovariance(tickers, span_mean=500, span_cov=180)
+        )
         
     def _end_of_month(self, cur_time):
         """
@@ -56,13 +56,6 @@ class BuyAndHoldStopLossStrategy(AbstractStrategy):
 
         return tickers_invested
 
-    def _create_event_list(self):
-        """
-        TODO
-        """
-        df_close_price = pd.DataFrame(columns=["date","close_price","ticker"])
-        return df_close_price
-
     def _create_maximum_list(self):
         """
         TODO
@@ -81,10 +74,6 @@ class BuyAndHoldStopLossStrategy(AbstractStrategy):
             # Update historical maximum price for the ticker
             if self.maximum_prices[ticker] < event.high_price:
                 self.maximum_prices[ticker] = event.high_price
-            # Store close price
-            data = {'date':[event.time.strftime("%Y-%m-%d")], 'close_price':[PriceParser.display(event.close_price)], 'ticker':[ticker]}
-            df = pd.DataFrame(data)
-            self.df_close_price = self.df_close_price.append(df)
             # Update investment list
             if ticker in portfolio_handler.portfolio.positions:
                 self.tickers_invested[ticker] = True
@@ -100,15 +89,13 @@ class BuyAndHoldStopLossStrategy(AbstractStrategy):
                 self.events_queue.put(signal) 
             # Enter or Rebalance Signal
             elif self._end_of_month(event.time) and event.low_price > self.maximum_prices[ticker] * (1 - self.risk_pct):
-                # Calculate expected returns and sample covariance
-                clean = self.df_close_price.set_index('date')
-                table = clean.pivot(columns='ticker', values='close_price')
-                mu = expected_returns.ema_historical_return(table, span=500)
-                S = risk_models.exp_cov(table, span=180)
-                # Optimise for maximal Sharpe ratio
-                ef = EfficientFrontier(mu, S)
-                raw_weights = ef.max_sharpe()
-                ticker_weights = ef.clean_weights()
+                # Optimise for maximal Sharpe ratio, from the close
+                # prices kept by the price handler
+                ticker_weights = self.portfolio.weights(
+                    portfolio_handler.price_handler.history, event.time
+                )
+                if ticker_weights is None:
+                    return
                 # Select type of sizer
                 signal_sizer = WeightComplexSignalSizer(ticker_weights)             
                 # Enter a position
@@ -143,6 +130,9 @@ def run(config, testing, tickers, filename):
     
     # Acceptable drop percentage for the position
     risk_pct = 0.2
+    # Bars of close prices kept for the optimisation: at most one
+    # a day, so that every bar of the backtest is kept
+    history_length = (end_date - start_date).days + 1
 
     # Use the Buy and Hold Strategy
     events_queue = queue.Queue()
@@ -154,7 +144,8 @@ def run(config, testing, tickers, filename):
     backtest = TradingSession(
         config, strategy, tickers,
         initial_equity, start_date, end_date,
-        events_queue, title=title, benchmark=tickers[0]
+        events_queue, title=title, benchmark=tickers[0],
+        history_length=history_length
     )
     results = backtest.start_trading(testing=testing)
     return results
@@ -1,9 +1,7 @@
-from collections import deque
 import datetime
 
-import numpy as np
-
 from qstrader import settings
+from qstrader.indicators import IndicatorRegistry, SMA
 from qstrader.strategy.base import AbstractStrategy
 from qstrader.event import SignalEvent, EventType
 from qstrader.compat import queue
@@ -31,8 +29,14 @@ class MovingAverageCrossStrategy(AbstractStrategy):
         self.long_window = long_window
         self.bars = 0
         self.invested = False
-        self.sw_bars = deque(maxlen=self.short_window)
-        self.lw_bars = deque(maxlen=self.long_window)
+        # The moving averages are updated with every bar by the session
+        self.indicators = IndicatorRegistry()
+        self.short_sma = self.indicators.subscribe(
+            ticker, "short_sma", SMA(self.short_window)
+        )
+        self.long_sma = self.indicators.subscribe(
+            ticker, "long_sma", SMA(self.long_window)
+        )
 
     def calculate_signals(self, event, portfolio_handler):
         if (
@@ -41,17 +45,11 @@ class MovingAverageCrossStrategy(AbstractStrategy):
         ):
             # Select the signal sizer
             signal_sizer = NaiveSignalSizer(default_quantity=1000)
-            # Add latest adjusted closing price to the
-            # short and long window bars
-            self.lw_bars.append(event.close_price)
-            if self.bars > self.long_window - self.short_window:
-                self.sw_bars.append(event.close_price)
-
             # Enough bars are present for trading
             if self.bars > self.long_window:
-                # Calculate the simple moving averages
-                short_sma = np.mean(self.sw_bars)
-                long_sma = np.mean(self.lw_bars)
+                # The simple moving averages up to the latest close
+                short_sma = self.short_sma.value
+                long_sma = self.long_sma.value
                 # Trading signals based on moving average cross
                 if short_sma > long_sma and not self.invested:
                     signal = SignalEvent(
@@ -54,6 +54,6 @@ class ExampleCompliance(AbstractCompliance):
             writer.writerow([
                 fill.timestamp, fill.ticker,
                 fill.action, fill.quantity,
-                fill.exchange, PriceParser.display(fill.price, 4),
-                PriceParser.display(fill.commission, 4)
+                fill.exchange, PriceParser.display_scalar(fill.price, 4),
+                PriceParser.display_scalar(fill.commission, 4)
             ])
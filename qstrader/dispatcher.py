@@ -0,0 +1,82 @@
+from collections import deque
+
+from .compat import queue
+
+
+class BacktestEventQueue(object):
+    """
+    BacktestEventQueue is an unsynchronised first-in first-out
+    events queue for single-threaded backtests.
+
+    It exposes the same put/get/empty/qsize interface as
+    queue.Queue, so that it can be handed to strategies, the
+    PortfolioHandler and the ExecutionHandler unchanged, but it
+    is backed by a plain deque and so pays for no lock
+    acquisition. It must not be shared between threads, hence
+    live sessions should continue to use queue.Queue.
+    """
+    def __init__(self):
+        self._events = deque()
+        self.put = self._events.append
+
+    def get(self, block=False, timeout=None):
+        """
+        Removes and returns the oldest event. Raises queue.Empty
+        if no events are present, as the backtest can never be
+        unblocked by another thread.
+        """
+        try:
+            return self._events.popleft()
+        except IndexError:
+            raise queue.Empty
+
+    def empty(self):
+        return not self._events
+
+    def qsize(self):
+        return len(self._events)
+
+    def __len__(self):
+        return len(self._events)
+
+
+class EventDispatcher(object):
+    """
+    EventDispatcher directs each event to the handler registered
+    for its EventType, replacing a chain of if/elif comparisons
+    with a single dictionary lookup.
+    """
+    def __init__(self):
+        self.handlers = {}
+
+    def register(self, event_type, handler):
+        """
+        Registers handler, a callable taking a single event,
+        for all events of the given EventType.
+        """
+        self.handlers[event_type] = handler
+
+    def dispatch(self, event):
+        """
+        Calls the handler registered for the type of the event.
+        """
+        try:
+            handler = self.handlers[event.type]
+        except KeyError:
+            raise NotImplementedError(
+                "Unsupported event.type '%s'" % event.type
+            )
+        handler(event)
+
+    def dispatch_pending(self, events_queue):
+        """
+        Dispatches events from a BacktestEventQueue until it
+        is empty, including any events placed onto the queue
+        by the handlers themselves.
+        """
+        get = events_queue.get
+        dispatch = self.dispatch
+        while events_queue:
+            event = get()
+            if event is not None:
+                dispatch(event)
@@ -3,7 +3,25 @@ from __future__ import print_function
 from enum import Enum
 
 
-EventType = Enum("EventType", "TICK BAR SIGNAL ORDER FILL SENTIMENT")
+EventType = Enum("EventType", "TICK BAR SIGNAL ORDER FILL SENTIMENT BAR_BATCH ORDER_BATCH")
+
+
+# Human-readable names for common bar periods, in seconds
+READABLE_PERIODS = {
+    1: "1sec",
+    5: "5sec",
+    10: "10sec",
+    15: "15sec",
+    30: "30sec",
+    60: "1min",
+    300: "5min",
+    600: "10min",
+    900: "15min",
+    1800: "30min",
+    3600: "1hr",
+    86400: "1day",
+    604800: "1wk"
+}
 
 
 class Event(object):
@@ -11,7 +29,13 @@ class Event(object):
     Event is base class providing an interface for all subsequent
     (inherited) events, that will trigger further events in the
     trading infrastructure.
+
+    Events are created for every tick or bar of a backtest, so
+    all events use __slots__ rather than a per-instance __dict__
+    and store their EventType as a class attribute.
     """
+    __slots__ = ()
+
     @property
     def typename(self):
         return self.type.name
@@ -23,6 +47,9 @@ class TickEvent(Event):
     which is defined as a ticker symbol and associated best
     bid and ask from the top of the order book.
     """
+    __slots__ = ("ticker", "time", "bid", "ask")
+    type = EventType.TICK
+
     def __init__(self, ticker, time, bid, ask):
         """
         Initialises the TickEvent.
@@ -33,7 +60,6 @@ class TickEvent(Event):
         bid - The best bid price at the time of the tick.
         ask - The best ask price at the time of the tick.
         """
-        self.type = EventType.TICK
         self.ticker = ticker
         self.time = time
         self.bid = bid
@@ -54,7 +80,16 @@ class BarEvent(Event):
     Handles the event of receiving a new market
     open-high-low-close-volume bar, as would be generated
     via common data providers such as Yahoo Finance.
+
+    The human-readable period is only computed when the
+    period_readable attribute is accessed.
     """
+    __slots__ = (
+        "ticker", "time", "period", "open_price", "high_price",
+        "low_price", "close_price", "volume", "adj_close_price"
+    )
+    type = EventType.BAR
+
     def __init__(
         self, ticker, time, period,
         open_price, high_price, low_price,
@@ -79,7 +114,6 @@ class BarEvent(Event):
         of 'open_price', 'close_price' as 'open' is a reserved
         word in Python.
         """
-        self.type = EventType.BAR
         self.ticker = ticker
         self.time = time
         self.period = period
@@ -89,7 +123,10 @@ class BarEvent(Event):
         self.close_price = close_price
         self.volume = volume
         self.adj_close_price = adj_close_price
-        self.period_readable = self._readable_period()
+
+    @property
+    def period_readable(self):
+        return self._readable_period()
 
     def _readable_period(self):
         """
@@ -106,23 +143,8 @@ class BarEvent(Event):
         readable period is simply passed through from period,
         in seconds.
         """
-        lut = {
-            1: "1sec",
-            5: "5sec",
-            10: "10sec",
-            15: "15sec",
-            30: "30sec",
-            60: "1min",
-            300: "5min",
-            600: "10min",
-            900: "15min",
-            1800: "30min",
-            3600: "1hr",
-            86400: "1day",
-            604800: "1wk"
-        }
-        if self.period in lut:
-            return lut[self.period]
+        if self.period in READABLE_PERIODS:
+            return READABLE_PERIODS[self.period]
         else:
             return "%ssec" % str(self.period)
 
@@ -142,11 +164,99 @@ class BarEvent(Event):
         return str(self)
 
 
+class BarBatchEvent(Event):
+    """
+    Handles the event of receiving the bars of every ticker for
+    a single timestamp at once (a "cross-section"), rather than
+    as one BarEvent per ticker.
+
+    The prices and volumes are aligned NumPy arrays, with element
+    i of each array belonging to tickers[i]. Iterating over the
+    BarBatchEvent yields the equivalent individual BarEvents.
+    """
+    __slots__ = (
+        "time", "period", "tickers", "open_prices", "high_prices",
+        "low_prices", "close_prices", "volumes", "adj_close_prices"
+    )
+    type = EventType.BAR_BATCH
+
+    def __init__(
+        self, time, period, tickers,
+        open_prices, high_prices, low_prices,
+        close_prices, volumes, adj_close_prices=None
+    ):
+        """
+        Initialises the BarBatchEvent.
+
+        Parameters:
+        time - The timestamp of the bars
+        period - The time period covered by the bars in seconds
+        tickers - The list of ticker symbols of the bars
+        open_prices - Array of the unadjusted opening prices
+        high_prices - Array of the unadjusted high prices
+        low_prices - Array of the unadjusted low prices
+        close_prices - Array of the unadjusted close prices
+        volumes - Array of the volumes of trading within the bars
+        adj_close_prices - Optional array of the vendor adjusted
+            closing prices of the bars
+        """
+        self.time = time
+        self.period = period
+        self.tickers = tickers
+        self.open_prices = open_prices
+        self.high_prices = high_prices
+        self.low_prices = low_prices
+        self.close_prices = close_prices
+        self.volumes = volumes
+        self.adj_close_prices = adj_close_prices
+
+    @property
+    def period_readable(self):
+        return BarEvent._readable_period(self)
+
+    def __len__(self):
+        return len(self.tickers)
+
+    def __iter__(self):
+        """
+        Yields a BarEvent for each ticker of the batch.
+        """
+        if self.adj_close_prices is not None:
+            adj_close_prices = self.adj_close_prices.tolist()
+        else:
+            adj_close_prices = [None] * len(self.tickers)
+        for bar in zip(
+            self.tickers, self.open_prices.tolist(),
+            self.high_prices.tolist(), self.low_prices.tolist(),
+            self.close_prices.tolist(), self.volumes.tolist(),
+            adj_close_prices
+        ):
+            ticker, open_price, high_price, low_price, \
+                close_price, volume, adj_close_price = bar
+            yield BarEvent(
+                ticker, self.time, self.period, open_price,
+                high_price, low_price, close_price,
+                volume, adj_close_price
+            )
+
+    def __str__(self):
+        return "Type: %s, Time: %s, Period: %s, Tickers: %s" % (
+            str(self.type), str(self.time),
+            str(self.period_readable), str(list(self.tickers))
+        )
+
+    def __repr__(self):
+        return str(self)
+
+
 class SignalEvent(Event):
     """
     Handles the event of sending a Signal from a Strategy object.
     This is received by a Portfolio object and acted upon.
     """
+    __slots__ = ("ticker", "action", "suggested_quantity")
+    type = EventType.SIGNAL
+
     def __init__(self, ticker, action, suggested_quantity=None):
         """
         Initialises the SignalEvent.
@@ -159,7 +269,6 @@ class SignalEvent(Event):
             of an asset to transact in, which is used by the
             PositionSizer and RiskManager.
         """
-        self.type = EventType.SIGNAL
         self.ticker = ticker
         self.action = action
         self.suggested_quantity = suggested_quantity
@@ -171,6 +280,9 @@ class OrderEvent(Event):
     The order contains a ticker (e.g. GOOG), action (BOT or SLD)
     and quantity.
     """
+    __slots__ = ("ticker", "action", "quantity")
+    type = EventType.ORDER
+
     def __init__(self, ticker, action, quantity):
         """
         Initialises the OrderEvent.
@@ -180,7 +292,6 @@ class OrderEvent(Event):
         action - 'BOT' (for long) or 'SLD' (for short).
         quantity - The quantity of shares to transact.
         """
-        self.type = EventType.ORDER
         self.ticker = ticker
         self.action = action
         self.quantity = quantity
@@ -196,6 +307,39 @@ class OrderEvent(Event):
         )
 
 
+class OrderBatchEvent(Event):
+    """
+    Handles the event of sending many Orders to an execution
+    system at once, such as those of the rebalance of a whole
+    portfolio. The orders are executed in turn, so sells are
+    placed before buys to fund them.
+    """
+    __slots__ = ("orders",)
+    type = EventType.ORDER_BATCH
+
+    def __init__(self, orders):
+        """
+        Initialises the OrderBatchEvent.
+
+        Parameters:
+        orders - The list of OrderEvents, in order of execution.
+        """
+        self.orders = orders
+
+    def __len__(self):
+        return len(self.orders)
+
+    def __iter__(self):
+        return iter(self.orders)
+
+    def print_orders(self):
+        """
+        Outputs the values within each OrderEvent.
+        """
+        for order in self.orders:
+            order.print_order()
+
+
 class FillEvent(Event):
     """
     Encapsulates the notion of a filled order, as returned
@@ -207,6 +351,11 @@ class FillEvent(Event):
     different prices. This will be simulated by averaging
     the cost.
     """
+    __slots__ = (
+        "timestamp", "ticker", "action", "quantity",
+        "exchange", "price", "commission"
+    )
+    type = EventType.FILL
 
     def __init__(
         self, timestamp, ticker,
@@ -225,7 +374,6 @@ class FillEvent(Event):
         price - The price at which the trade was filled
         commission - The brokerage commission for carrying out the trade.
         """
-        self.type = EventType.FILL
         self.timestamp = timestamp
         self.ticker = ticker
         self.action = action
@@ -241,6 +389,9 @@ class SentimentEvent(Event):
     with a ticker. Can be used for a generic "date-ticker-sentiment"
     service, often provided by many data vendors.
     """
+    __slots__ = ("timestamp", "ticker", "sentiment")
+    type = EventType.SENTIMENT
+
     def __init__(self, timestamp, ticker, sentiment):
         """
         Initialises the SentimentEvent.
@@ -251,7 +402,6 @@ class SentimentEvent(Event):
         sentiment - A string, float or integer value of "sentiment",
             e.g. "bullish", -1, 5.4, etc.
         """
-        self.type = EventType.SENTIMENT
         self.timestamp = timestamp
         self.ticker = ticker
         self.sentiment = sentiment
@@ -30,3 +30,15 @@ class AbstractExecutionHandler(object):
         event - Contains an Event object with order information.
         """
         raise NotImplementedError("Should implement execute_order()")
+
+    def execute_order_batch(self, event):
+        """
+        Takes an OrderBatchEvent and executes each of its
+        OrderEvents in turn. Handlers able to execute many
+        orders at once may override this.
+
+        Parameters:
+        event - Contains an OrderBatchEvent.
+        """
+        for order in event:
+            self.execute_order(order)
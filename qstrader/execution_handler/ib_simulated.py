@@ -1,3 +1,5 @@
+import numpy as np
+
 from .base import AbstractExecutionHandler
 from ..event import (FillEvent, EventType)
 from ..price_parser import PriceParser
@@ -38,11 +40,44 @@ class IBSimulatedExecutionHandler(AbstractExecutionHandler):
             max(0.01 * quantity, 5.0), 10.0
         )
         ECN_Fee_removing_liquidity = 0.0035 * quantity
-        SEC_Fee = 0.0000207 * quantity * PriceParser.display(fill_price) #Only applicable for US Securities
+        SEC_Fee = 0.0000207 * quantity * PriceParser.display_scalar(fill_price) #Only applicable for US Securities
         # Addition of all different types of fees
         commission = questrade_order_Fee + ECN_Fee_removing_liquidity + SEC_Fee
 
-        return PriceParser.parse(commission)
+        return PriceParser.parse_scalar(commission)
+
+    @staticmethod
+    def calculate_ib_commission_array(quantities, fill_prices):
+        """
+        Calculate the commissions of many transactions at once,
+        given arrays of their quantities and (integer) fill prices,
+        in exactly the same manner as calculate_ib_commission.
+        """
+        quantities = np.asarray(quantities)
+        questrade_order_Fee = np.minimum(
+            np.maximum(0.01 * quantities, 5.0), 10.0
+        )
+        ECN_Fee_removing_liquidity = 0.0035 * quantities
+        SEC_Fee = 0.0000207 * quantities * PriceParser.display_array(
+            fill_prices
+        )
+        commission = questrade_order_Fee + ECN_Fee_removing_liquidity + SEC_Fee
+
+        return PriceParser.parse_array(commission)
+
+    def _fill_price(self, ticker, action):
+        """
+        Returns the price at which an order is filled, the ask
+        (BOT) or bid (SLD) of tick data or else the last close.
+        """
+        if self.price_handler.istick():
+            bid, ask = self.price_handler.get_best_bid_ask(ticker)
+            if action == "BOT":
+                return ask
+            else: # Short position
+                return bid
+        else:
+            return self.price_handler.get_last_close(ticker)
 
     def execute_order(self, event):
         """
@@ -60,15 +95,7 @@ class IBSimulatedExecutionHandler(AbstractExecutionHandler):
             quantity = event.quantity
 
             # Obtain the fill price
-            if self.price_handler.istick():
-                bid, ask = self.price_handler.get_best_bid_ask(ticker)
-                if event.action == "BOT":
-                    fill_price = ask
-                else: # Short position
-                    fill_price = bid
-            else:
-                close_price = self.price_handler.get_last_close(ticker)
-                fill_price = close_price
+            fill_price = self._fill_price(ticker, action)
 
             # Set a dummy exchange and calculate trade commission
             exchange = "ARCA"
@@ -85,3 +112,35 @@ class IBSimulatedExecutionHandler(AbstractExecutionHandler):
 
             if self.compliance is not None:
                 self.compliance.record_trade(fill_event)
+
+    def execute_order_batch(self, event):
+        """
+        Converts each OrderEvent of an OrderBatchEvent into a
+        FillEvent as execute_order, calculating the commissions
+        of all of the orders at once. The FillEvents are placed
+        on the events queue in the order of the OrderEvents.
+
+        Parameters:
+        event - An OrderBatchEvent.
+        """
+        if event.type == EventType.ORDER_BATCH and len(event) > 0:
+            fill_prices = [
+                self._fill_price(order.ticker, order.action)
+                for order in event
+            ]
+            commissions = self.calculate_ib_commission_array(
+                [order.quantity for order in event], fill_prices
+            ).tolist()
+            exchange = "ARCA"
+            for order, fill_price, commission in zip(
+                event, fill_prices, commissions
+            ):
+                fill_event = FillEvent(
+                    self.price_handler.get_last_timestamp(order.ticker),
+                    order.ticker, order.action, order.quantity,
+                    exchange, fill_price, commission
+                )
+                self.events_queue.put(fill_event)
+
+                if self.compliance is not None:
+                    self.compliance.record_trade(fill_event)
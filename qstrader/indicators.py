@@ -0,0 +1,319 @@
+from collections import deque
+from math import sqrt
+
+from .event import EventType
+
+
+class Indicator(object):
+    """
+    Indicator is the base class of the streaming indicators, each
+    of which is updated with the latest value(s) of a single series
+    in constant time, rather than being recomputed over its whole
+    window on every bar.
+
+    The fields are the BarEvent attributes passed to update() when
+    the indicator is updated by an IndicatorRegistry. The current
+    value is None until ready, i.e. until the indicator has been
+    updated with a full window of values.
+    """
+    fields = ("close_price",)
+
+    def __init__(self, window):
+        if window < 1:
+            raise ValueError("window must be at least 1")
+        self.window = window
+        self.count = 0
+        self.value = None
+
+    @property
+    def ready(self):
+        return self.count >= self.window
+
+    def update(self, value):
+        raise NotImplementedError("Should implement update()")
+
+
+class SMA(Indicator):
+    """
+    The simple moving average of the last window values, kept as
+    a running sum, which is exact for integer (PriceParser) prices.
+    """
+    def __init__(self, window):
+        super(SMA, self).__init__(window)
+        self.values = deque(maxlen=window)
+        self.total = 0
+
+    def update(self, value):
+        if len(self.values) == self.window:
+            self.total -= self.values[0]
+        self.values.append(value)
+        self.total += value
+        self.count += 1
+        if self.ready:
+            self.value = self.total / self.window
+        return self.value
+
+
+class EMA(Indicator):
+    """
+    The exponential moving average with smoothing factor alpha
+    (by default 2 / (window + 1)), seeded with the simple moving
+    average of the first window values.
+    """
+    def __init__(self, window, alpha=None):
+        super(EMA, self).__init__(window)
+        self.alpha = 2.0 / (window + 1) if alpha is None else alpha
+        self.total = 0
+
+    def update(self, value):
+        self.count += 1
+        if self.count < self.window:
+            self.total += value
+        elif self.count == self.window:
+            self.value = (self.total + value) / self.window
+        else:
+            self.value += self.alpha * (value - self.value)
+        return self.value
+
+
+class RollingStd(Indicator):
+    """
+    The rolling standard deviation of the last window values, with
+    ddof delta degrees of freedom (1 for the sample standard
+    deviation, as pandas). The mean and sum of squared deviations
+    are updated by Welford's method as each value enters and leaves
+    the window, which is stable where a running sum of squares
+    cancels catastrophically.
+    """
+    def __init__(self, window, ddof=1):
+        if window <= ddof:
+            raise ValueError("window must be greater than ddof")
+        super(RollingStd, self).__init__(window)
+        self.ddof = ddof
+        self.values = deque(maxlen=window)
+        self.mean = 0.0
+        self.m2 = 0.0
+
+    def update(self, value):
+        if len(self.values) == self.window:
+            old = self.values[0]
+            new_mean = self.mean + (value - old) / self.window
+            self.m2 += (value - old) * (value - new_mean + old - self.mean)
+            self.mean = new_mean
+        else:
+            n = len(self.values) + 1
+            delta = value - self.mean
+            self.mean += delta / n
+            self.m2 += delta * (value - self.mean)
+        self.values.append(value)
+        self.count += 1
+        if self.ready:
+            self.value = sqrt(max(self.m2, 0.0) / (self.window - self.ddof))
+        return self.value
+
+
+class RollingMax(Indicator):
+    """
+    The maximum of the last window values, from a deque of the
+    values which may yet become the maximum, in decreasing order,
+    so that each value is added and removed at most once.
+    """
+    def __init__(self, window):
+        super(RollingMax, self).__init__(window)
+        self.candidates = deque()
+
+    def _dominates(self, value, candidate):
+        return value >= candidate
+
+    def update(self, value):
+        candidates = self.candidates
+        while candidates and self._dominates(value, candidates[-1][1]):
+            candidates.pop()
+        candidates.append((self.count, value))
+        if candidates[0][0] <= self.count - self.window:
+            candidates.popleft()
+        self.count += 1
+        if self.ready:
+            self.value = candidates[0][1]
+        return self.value
+
+
+class RollingMin(RollingMax):
+    """
+    The minimum of the last window values.
+    """
+    def _dominates(self, value, candidate):
+        return value <= candidate
+
+
+class ATR(Indicator):
+    """
+    The average true range over window bars, smoothed as by Wilder
+    (an exponential moving average with alpha = 1 / window) and
+    seeded with the mean of the first window true ranges. The true
+    range of the first bar is its high less its low.
+    """
+    fields = ("high_price", "low_price", "close_price")
+
+    def __init__(self, window):
+        super(ATR, self).__init__(window)
+        self.average = EMA(window, alpha=1.0 / window)
+        self.prev_close = None
+
+    def update(self, high, low, close):
+        true_range = high - low
+        if self.prev_close is not None:
+            true_range = max(
+                true_range, abs(high - self.prev_close),
+                abs(low - self.prev_close)
+            )
+        self.prev_close = close
+        self.count += 1
+        self.value = self.average.update(true_range)
+        return self.value
+
+
+class Donchian(Indicator):
+    """
+    The Donchian channel of the highest high (upper) and lowest
+    low (lower) of the last window bars, and their midpoint, the
+    value being the tuple (upper, middle, lower).
+    """
+    fields = ("high_price", "low_price")
+
+    def __init__(self, window):
+        super(Donchian, self).__init__(window)
+        self.highs = RollingMax(window)
+        self.lows = RollingMin(window)
+        self.upper = None
+        self.middle = None
+        self.lower = None
+
+    def update(self, high, low):
+        self.upper = self.highs.update(high)
+        self.lower = self.lows.update(low)
+        self.count += 1
+        if self.ready:
+            self.middle = (self.upper + self.lower) / 2.0
+            self.value = (self.upper, self.middle, self.lower)
+        return self.value
+
+
+class RollingCovariance(Indicator):
+    """
+    The rolling covariance of the last window pairs of values
+    (x, y), with ddof delta degrees of freedom, whose co-moment is
+    updated as each pair enters and leaves the window.
+
+    As the pairs usually come from two series (e.g. the returns of
+    two tickers), it is updated by the strategy rather than by an
+    IndicatorRegistry, unless fields of a single bar are given.
+    """
+    fields = None
+
+    def __init__(self, window, ddof=1):
+        if window <= ddof:
+            raise ValueError("window must be greater than ddof")
+        super(RollingCovariance, self).__init__(window)
+        self.ddof = ddof
+        self.pairs = deque(maxlen=window)
+        self.mean_x = 0.0
+        self.mean_y = 0.0
+        self.comoment = 0.0
+
+    def update(self, x, y):
+        if len(self.pairs) == self.window:
+            old_x, old_y = self.pairs[0]
+            n = self.window
+            mean_x = self.mean_x + (x - old_x) / n
+            mean_y = self.mean_y + (y - old_y) / n
+            self.comoment += (
+                (x - self.mean_x) * (y - mean_y) -
+                (old_x - self.mean_x) * (old_y - mean_y)
+            )
+            self.mean_x, self.mean_y = mean_x, mean_y
+        else:
+            n = len(self.pairs) + 1
+            dx = x - self.mean_x
+            self.mean_x += dx / n
+            self.mean_y += (y - self.mean_y) / n
+            self.comoment += dx * (y - self.mean_y)
+        self.pairs.append((x, y))
+        self.count += 1
+        if self.ready:
+            self.value = self.comoment / (self.window - self.ddof)
+        return self.value
+
+
+class IndicatorRegistry(object):
+    """
+    IndicatorRegistry holds the indicators subscribed to by a
+    strategy, keyed by ticker and name, and updates every indicator
+    of a ticker once with each of its bars.
+
+    A strategy exposing an IndicatorRegistry as its indicators
+    attribute has it updated by the TradingSession before the
+    strategy receives each bar, e.g.
+
+    self.indicators = IndicatorRegistry()
+    self.indicators.subscribe("SPY", "short", SMA(100))
+    ...
+    if self.indicators["SPY", "short"].ready:
+        short_sma = self.indicators["SPY", "short"].value
+    """
+    def __init__(self):
+        self.indicators = {}
+        self._subscriptions = {}
+
+    def subscribe(self, ticker, name, indicator, fields=None):
+        """
+        Adds the indicator of the ticker under the name, updated
+        with the BarEvent attributes named by fields, or else by
+        the fields of the indicator. Returns the indicator.
+        """
+        fields = indicator.fields if fields is None else fields
+        if fields is None:
+            raise ValueError(
+                "The fields updating %s must be given" % name
+            )
+        self.unsubscribe(ticker, name)
+        self.indicators[(ticker, name)] = indicator
+        self._subscriptions.setdefault(ticker, []).append(
+            (name, indicator, tuple(fields))
+        )
+        return indicator
+
+    def unsubscribe(self, ticker, name):
+        if self.indicators.pop((ticker, name), None) is not None:
+            self._subscriptions[ticker] = [
+                subscription for subscription in self._subscriptions[ticker]
+                if subscription[0] != name
+            ]
+
+    def __getitem__(self, key):
+        return self.indicators[key]
+
+    def __contains__(self, key):
+        return key in self.indicators
+
+    def get(self, ticker, name, default=None):
+        return self.indicators.get((ticker, name), default)
+
+    def value(self, ticker, name):
+        """
+        Returns the current value of an indicator, None if
+        it is not yet ready.
+        """
+        return self.indicators[(ticker, name)].value
+
+    def update(self, event):
+        """
+        Updates every indicator of the ticker of a BarEvent.
+        """
+        if event.type != EventType.BAR:
+            return
+        subscriptions = self._subscriptions.get(event.ticker)
+        if not subscriptions:
+            return
+        for name, indicator, fields in subscriptions:
+            indicator.update(*[getattr(event, field) for field in fields])
@@ -1,9 +1,10 @@
 from .position import Position
+from .position_book import PositionBook, ClosedPositionBook
 from qstrader.price_parser import PriceParser
 
 
 class Portfolio(object):
-    def __init__(self, price_handler, cash):
+    def __init__(self, price_handler, cash, position_book=False):
         """
         On creation, the Portfolio object contains no
         positions and all values are "reset" to the initial
@@ -12,37 +13,97 @@ class Portfolio(object):
         Note that realised_pnl is the running tally pnl from closed
         positions (closed_pnl), as well as realised_pnl
         from currently open positions.
+
+        The equity and unrealised_pnl are maintained incrementally,
+        by adjusting them for the change in value of a single
+        Position whenever it is revalued or transacted.
+
+        If position_book is True the open and closed Positions are
+        stored as rows of NumPy arrays (see PositionBook), so that
+        the whole Portfolio is revalued with vectorised operations.
         """
         self.price_handler = price_handler
         self.init_cash = cash
         self.equity = cash
         self.cur_cash = cash
-        self.positions = {}
-        self.closed_positions = []
+        if position_book:
+            self.positions = PositionBook()
+            self.closed_positions = ClosedPositionBook()
+        else:
+            self.positions = {}
+            self.closed_positions = []
         self.realised_pnl = 0
+        self.unrealised_pnl = 0
+
+    def _get_bid_ask(self, ticker):
+        """
+        Obtains the best bid/ask of a ticker from the price
+        handler, using the last close for both with bar data.
+        """
+        if self.price_handler.istick():
+            return self.price_handler.get_best_bid_ask(ticker)
+        else:
+            close_price = self.price_handler.get_last_close(ticker)
+            return close_price, close_price
+
+    def _position_equity(self, pt):
+        """
+        Returns the contribution of a Position to the equity.
+        """
+        return pt.market_value - pt.cost_basis + pt.realised_pnl
 
     def _update_portfolio(self):
         """
         Updates the value of all positions that are currently open.
         Value of closed positions is tallied as self.realised_pnl.
         """
+        if isinstance(self.positions, PositionBook):
+            self._update_position_book()
+            return
+
         self.unrealised_pnl = 0
         self.equity = self.realised_pnl
         self.equity += self.init_cash
 
         for ticker in self.positions:
             pt = self.positions[ticker]
-            if self.price_handler.istick():
-                bid, ask = self.price_handler.get_best_bid_ask(ticker)
-            else:
-                close_price = self.price_handler.get_last_close(ticker)
-                bid = close_price
-                ask = close_price
+            bid, ask = self._get_bid_ask(ticker)
             pt.update_market_value(bid, ask)
             self.unrealised_pnl += pt.unrealised_pnl
-            self.equity += (
-                pt.market_value - pt.cost_basis + pt.realised_pnl
-            )
+            self.equity += self._position_equity(pt)
+
+    def _update_position_book(self):
+        """
+        Updates the value of all open positions held in a
+        PositionBook at once.
+        """
+        bids, asks = [], []
+        for ticker in self.positions:
+            bid, ask = self._get_bid_ask(ticker)
+            bids.append(bid)
+            asks.append(ask)
+        self.positions.update_market_values(bids, asks)
+        self.unrealised_pnl = self.positions.total_unrealised_pnl()
+        self.equity = (
+            self.init_cash + self.realised_pnl +
+            self.positions.total_equity()
+        )
+
+    def _update_position_value(self, ticker):
+        """
+        Updates the value of the open position in ticker only,
+        adjusting the equity and unrealised PnL by the change
+        in its value. Tickers which are not held cost nothing.
+        """
+        pt = self.positions.get(ticker)
+        if pt is None:
+            return
+        equity_before = self._position_equity(pt)
+        unrealised_before = pt.unrealised_pnl
+        bid, ask = self._get_bid_ask(ticker)
+        pt.update_market_value(bid, ask)
+        self.unrealised_pnl += pt.unrealised_pnl - unrealised_before
+        self.equity += self._position_equity(pt) - equity_before
 
     def _add_position(
         self, action, ticker,
@@ -58,18 +119,14 @@ class Portfolio(object):
         are updated.
         """
         if ticker not in self.positions:
-            if self.price_handler.istick():
-                bid, ask = self.price_handler.get_best_bid_ask(ticker)
-            else:
-                close_price = self.price_handler.get_last_close(ticker)
-                bid = close_price
-                ask = close_price
+            bid, ask = self._get_bid_ask(ticker)
             position = Position(
                 action, ticker, quantity,
                 price, commission, bid, ask
             )
             self.positions[ticker] = position
-            self._update_portfolio()
+            self.unrealised_pnl += position.unrealised_pnl
+            self.equity += self._position_equity(position)
         else:
             print(
                 "Ticker %s is already in the positions list. "
@@ -90,23 +147,23 @@ class Portfolio(object):
         are updated.
         """
         if ticker in self.positions:
-            self.positions[ticker].transact_shares(
+            pt = self.positions[ticker]
+            equity_before = self._position_equity(pt)
+            unrealised_before = pt.unrealised_pnl
+            pt.transact_shares(
                 action, quantity, price, commission
             )
-            if self.price_handler.istick():
-                bid, ask = self.price_handler.get_best_bid_ask(ticker)
-            else:
-                close_price = self.price_handler.get_last_close(ticker)
-                bid = close_price
-                ask = close_price
-            self.positions[ticker].update_market_value(bid, ask)
+            bid, ask = self._get_bid_ask(ticker)
+            pt.update_market_value(bid, ask)
+            self.equity += self._position_equity(pt) - equity_before
+            self.unrealised_pnl -= unrealised_before
 
-            if self.positions[ticker].quantity == 0:
+            if pt.quantity == 0:
                 closed = self.positions.pop(ticker)
                 self.realised_pnl += closed.realised_pnl
                 self.closed_positions.append(closed)
-
-            self._update_portfolio()
+            else:
+                self.unrealised_pnl += pt.unrealised_pnl
         else:
             print(
                 "Ticker %s not in the current position list. "
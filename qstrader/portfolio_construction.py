@@ -0,0 +1,235 @@
+import copy
+
+import numpy as np
+import pandas as pd
+
+
+class EWMoments(object):
+    """
+    EWMoments keeps the exponentially weighted mean (and optionally
+    the covariance) of a stream of vectors, updated in place as each
+    vector arrives. The weights are those of pandas ewm(alpha=alpha)
+    with adjust=True, and the covariance that of cov(bias=True),
+    i.e. demeaned by the exponentially weighted mean.
+    """
+    def __init__(self, alpha, size, covariance=True):
+        self.alpha = alpha
+        self.count = 0
+        self.weight = 0.0
+        self.mean = np.zeros(size)
+        self.comoment = np.zeros((size, size)) if covariance else None
+
+    def copy(self):
+        return copy.deepcopy(self)
+
+    def update(self, x):
+        """
+        Decays the weight of the previous vectors by (1 - alpha)
+        and adds x with a weight of one.
+        """
+        decay = 1.0 - self.alpha
+        self.weight = decay * self.weight + 1.0
+        delta = x - self.mean
+        self.mean += delta / self.weight
+        if self.comoment is not None:
+            self.comoment *= decay
+            self.comoment += np.outer(delta, x - self.mean)
+        self.count += 1
+
+    @property
+    def covariance(self):
+        return self.comoment / self.weight
+
+
+class EWMeanCovariance(object):
+    """
+    EWMeanCovariance estimates the annualised expected returns and
+    covariance of the daily returns of the tickers, weighted
+    exponentially with spans of span_mean and span_cov bars, as by
+    the pypfopt ema_historical_return and exp_cov estimators.
+
+    Rather than recomputing over the full history on every call,
+    the estimates are updated incrementally from the new rows of a
+    PriceHistory, so each bar is only ever processed once. As the
+    latest row of the history may not yet hold the bars of every
+    ticker, it is only included provisionally in each estimate,
+    and is consumed once a later timestamp has begun.
+
+    The covariance is demeaned by the exponentially weighted mean
+    (as pandas ewm().cov()), rather than by the mean of the whole
+    history as exp_cov, which cannot be updated incrementally.
+    Returns of a bar in which any ticker has no price are skipped.
+    """
+    def __init__(self, tickers, span_mean=500, span_cov=180, periods=252):
+        """
+        Parameters:
+        tickers - The tickers whose returns are estimated
+        span_mean - The span of the expected returns, in bars
+        span_cov - The span of the covariance, in bars
+        periods - The number of bars per year
+        """
+        self.tickers = list(tickers)
+        self.periods = periods
+        self.returns_moments = EWMoments(
+            2.0 / (span_mean + 1), len(self.tickers), covariance=False
+        )
+        self.cov_moments = EWMoments(2.0 / (span_cov + 1), len(self.tickers))
+        self.last_time = None
+        self.last_prices = None
+        # The first row not yet consumed, i.e. the latest row of
+        # the history when last updated
+        self.next_time = None
+
+    def _add(self, returns_moments, cov_moments, prices):
+        if self.last_prices is not None:
+            returns = prices / self.last_prices - 1.0
+            if np.isfinite(returns).all():
+                returns_moments.update(returns)
+                cov_moments.update(returns)
+
+    def update(self, history):
+        """
+        Consumes the rows of the PriceHistory which are complete,
+        i.e. every row but the latest, not yet consumed.
+
+        Raises a ValueError if rows not yet consumed have already
+        left the history, i.e. if the estimates are updated less
+        often than every lookback bars of the PriceHistory.
+        """
+        times = history.timestamps()
+        closes = history.history(self.tickers, "close_price")
+        if len(times) == 0:
+            return
+        if self.next_time is not None and self.next_time < times[0]:
+            raise ValueError(
+                "rows of the PriceHistory have been dropped before "
+                "being estimated from: its lookback must exceed the "
+                "number of bars between updates"
+            )
+        start = 0
+        if self.last_time is not None:
+            start = np.searchsorted(times, self.last_time, side="right")
+        for row in range(start, len(times) - 1):
+            self._add(self.returns_moments, self.cov_moments, closes[row])
+            self.last_prices = np.array(closes[row])
+            self.last_time = times[row]
+        self.next_time = times[-1]
+
+    def estimate(self, history):
+        """
+        Returns the annualised expected returns (a Series) and
+        covariance (a DataFrame) of the tickers, including the
+        latest row of the PriceHistory, or (None, None) if there
+        are fewer than two returns.
+        """
+        self.update(history)
+        returns_moments = self.returns_moments.copy()
+        cov_moments = self.cov_moments.copy()
+        closes = history.history(self.tickers, "close_price", 1)
+        if len(closes) and history.timestamps(1)[0] != self.last_time:
+            self._add(returns_moments, cov_moments, closes[0])
+        if cov_moments.count < 2:
+            return None, None
+        mu = (1.0 + returns_moments.mean) ** self.periods - 1.0
+        cov = cov_moments.covariance * self.periods
+        return (
+            pd.Series(mu, index=self.tickers),
+            pd.DataFrame(cov, index=self.tickers, columns=self.tickers)
+        )
+
+
+class MaxSharpePortfolio(object):
+    """
+    MaxSharpePortfolio constructs the long-only portfolio of maximal
+    Sharpe ratio from the estimates of an EWMeanCovariance, fed by
+    the PriceHistory of the price handler.
+
+    The weights are memoized by timestamp, so that a strategy asking
+    for them with the bar of every ticker of a rebalance date solves
+    the optimisation once and hands every ticker the same weights.
+
+    The optimisation uses pypfopt's EfficientFrontier if it is
+    installed, otherwise scipy's SLSQP. Either way the weights are
+    cleaned as by EfficientFrontier.clean_weights, and are None if
+    there are not yet enough returns to estimate.
+    """
+    def __init__(
+        self, tickers, estimator=None, risk_free_rate=0.02,
+        cutoff=1e-4, rounding=5
+    ):
+        """
+        Parameters:
+        tickers - The tickers of the portfolio
+        estimator - The EWMeanCovariance of the tickers, by default
+            with the spans of the MPT example
+        risk_free_rate - The annualised risk-free rate
+        cutoff - Weights below which are set to zero
+        rounding - The number of decimal places of the weights
+        """
+        self.tickers = list(tickers)
+        self.estimator = (
+            estimator if estimator is not None else EWMeanCovariance(tickers)
+        )
+        self.risk_free_rate = risk_free_rate
+        self.cutoff = cutoff
+        self.rounding = rounding
+        self.timestamp = None
+        self.cached_weights = None
+        self.solves = 0
+
+    def weights(self, history, timestamp):
+        """
+        Returns the dictionary of the weight of each ticker at the
+        timestamp, solving only upon the first call at a timestamp,
+        or None if there are too few returns or no weights remain
+        once cleaned.
+        """
+        if self.timestamp is not None and timestamp == self.timestamp:
+            return self.cached_weights
+        mu, cov = self.estimator.estimate(history)
+        weights = None
+        if mu is not None:
+            weights = self._clean(self._optimise(mu, cov))
+            self.solves += 1
+        self.timestamp = timestamp
+        self.cached_weights = weights
+        return weights
+
+    def _optimise(self, mu, cov):
+        try:
+            from pypfopt.efficient_frontier import EfficientFrontier
+        except ImportError:
+            return self._optimise_slsqp(mu.values, cov.values)
+        ef = EfficientFrontier(mu, cov)
+        ef.max_sharpe(risk_free_rate=self.risk_free_rate)
+        return np.asarray(ef.weights)
+
+    def _optimise_slsqp(self, mu, cov):
+        from scipy.optimize import minimize
+
+        def negative_sharpe(w):
+            return -(w.dot(mu) - self.risk_free_rate) / np.sqrt(w.dot(cov).dot(w))
+
+        n = len(mu)
+        result = minimize(
+            negative_sharpe, np.full(n, 1.0 / n), method="SLSQP",
+            bounds=[(0.0, 1.0)] * n,
+            constraints=({"type": "eq", "fun": lambda w: w.sum() - 1.0},)
+        )
+        if not result.success:
+            print("Could not maximise the Sharpe ratio:", result.message)
+        return result.x
+
+    def _clean(self, weights):
+        """
+        Returns the dictionary of the weights, those below the
+        cutoff set to zero and the rest renormalised, or None if
+        no weight remains.
+        """
+        weights = np.where(np.abs(weights) < self.cutoff, 0.0, weights)
+        total = weights.sum()
+        if not np.isfinite(total) or total <= 0.0:
+            return None
+        weights = weights / total
+        weights = np.round(weights, self.rounding)
+        return dict(zip(self.tickers, weights.tolist()))
@@ -1,10 +1,11 @@
+from .event import OrderBatchEvent
 from .portfolio import Portfolio
 
 
 class PortfolioHandler(object):
     def __init__(
         self, initial_cash, events_queue,
-        price_handler, risk_manager
+        price_handler, risk_manager, position_book=False
     ):
         """
         The PortfolioHandler is designed to interact with the
@@ -23,12 +24,18 @@ class PortfolioHandler(object):
         The PortfolioHandler also takes a handle to the
         RiskManager, which is used to modify any generated
         Orders to remain in line with risk parameters.
+
+        If position_book is True the Portfolio stores its Positions
+        in an array-backed PositionBook, which revalues them all at
+        once, for portfolios of many instruments.
         """
         self.initial_cash = initial_cash
         self.events_queue = events_queue
         self.price_handler = price_handler
         self.risk_manager = risk_manager
-        self.portfolio = Portfolio(price_handler, initial_cash)
+        self.portfolio = Portfolio(
+            price_handler, initial_cash, position_book=position_book
+        )
 
     def _create_order_from_signal(self, signal_event):
         """
@@ -78,6 +85,32 @@ class PortfolioHandler(object):
         """
         self._create_order_from_signal(signal_event)
 
+    def rebalance(self, signal_sizer, tickers=None):
+        """
+        Rebalances the whole Portfolio at once with a portfolio
+        level signal sizer, such as PortfolioRebalanceSignalSizer.
+
+        The signals of every ticker are sized together, sells
+        first, and once refined by the RiskManager are sent to
+        the events queue as a single OrderBatchEvent, rather than
+        as one SignalEvent per ticker. If tickers is given, only
+        those tickers are rebalanced. Returns the OrderBatchEvent,
+        or None if there are no orders to make.
+        """
+        orders = []
+        signal_events = signal_sizer.size_portfolio(self.portfolio, tickers)
+        for signal_event in signal_events:
+            order_event = self.risk_manager.refine_orders(
+                self.portfolio, signal_event
+            )
+            if order_event is not None:
+                orders.append(order_event)
+        if not orders:
+            return None
+        batch_event = OrderBatchEvent(orders)
+        self.events_queue.put(batch_event)
+        return batch_event
+
     def on_fill(self, fill_event):
         """
         This is called by the backtester or live trading architecture
@@ -91,9 +124,16 @@ class PortfolioHandler(object):
         """
         self._convert_fill_to_portfolio_update(fill_event)
 
-    def update_portfolio_value(self):
+    def update_portfolio_value(self, ticker=None):
         """
         Update the portfolio to reflect current market value as
         based on last bid/ask of each ticker.
+
+        If a ticker is given, only the position in that ticker
+        (whose price has just changed) is revalued, otherwise
+        every open position is revalued.
         """
-        self.portfolio._update_portfolio()
+        if ticker is None:
+            self.portfolio._update_portfolio()
+        else:
+            self.portfolio._update_position_value(ticker)
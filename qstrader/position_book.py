@@ -0,0 +1,330 @@
+import numpy as np
+import pandas as pd
+
+from .position import Position
+
+
+# Integer-valued attributes of a Position, in the order
+# in which they appear in Position.__dict__
+POSITION_FIELDS = (
+    "quantity", "init_price", "init_commission",
+    "realised_pnl", "unrealised_pnl",
+    "buys", "sells", "avg_bot", "avg_sld",
+    "total_bot", "total_sld", "total_commission",
+    "avg_price", "cost_basis",
+    "net", "net_total", "net_incl_comm",
+    "market_value"
+)
+
+ACTIONS = {"BOT": 1, "SLD": -1}
+ACTION_NAMES = {1: "BOT", -1: "SLD"}
+
+
+def _integer(name, value):
+    """
+    Returns the value as an integer, raising a ValueError rather
+    than truncating a value which is not integral (e.g. a float
+    commission not converted with PriceParser.parse).
+    """
+    integer = int(value)
+    if integer != value:
+        raise ValueError(
+            "Position %s must be an integer (PriceParser) value, "
+            "not %r" % (name, value)
+        )
+    return integer
+
+
+def _integer_array(name, values):
+    """
+    Returns the values as an int64 array, raising a ValueError
+    if any of them is not integral.
+    """
+    values = np.asarray(values)
+    if values.dtype.kind == "f":
+        if not (np.isfinite(values) & (values == np.floor(values))).all():
+            raise ValueError(
+                "%s must be integer (PriceParser) values" % name
+            )
+    return values.astype(np.int64)
+
+
+def _column_property(name):
+    """
+    Creates a property reading and writing the row of a
+    PositionView within the column of its book.
+    """
+    def fget(self):
+        return int(self._book.columns[name][self._row])
+
+    def fset(self, value):
+        self._book.columns[name][self._row] = _integer(name, value)
+
+    return property(fget, fset)
+
+
+class PositionView(Position):
+    """
+    PositionView is a Position whose attributes are stored in a
+    row of a PositionBook (or ClosedPositionBook) rather than in
+    the object itself.
+
+    As each attribute is a property onto the underlying NumPy
+    columns, all of the Position methods (transact_shares,
+    update_market_value) operate directly on the book.
+    """
+    def __init__(self, book, row):
+        self._book = book
+        self._row = row
+
+    @property
+    def action(self):
+        return ACTION_NAMES[int(self._book.actions[self._row])]
+
+    @action.setter
+    def action(self, value):
+        self._book.actions[self._row] = ACTIONS[value]
+
+    @property
+    def ticker(self):
+        return self._book.tickers[self._row]
+
+    @ticker.setter
+    def ticker(self, value):
+        self._book.tickers[self._row] = value
+
+    def as_dict(self):
+        """
+        Returns the attributes of the Position as a dictionary,
+        in the same form as Position.__dict__.
+        """
+        attrs = {"action": self.action, "ticker": self.ticker}
+        for name in POSITION_FIELDS:
+            attrs[name] = getattr(self, name)
+        return attrs
+
+    def __repr__(self):
+        return "PositionView(%s, %s, %s)" % (
+            self.ticker, self.action, self.quantity
+        )
+
+
+for _name in POSITION_FIELDS:
+    setattr(PositionView, _name, _column_property(_name))
+
+
+class PositionColumns(object):
+    """
+    PositionColumns stores the attributes of many Positions as
+    preallocated int64 NumPy columns, one row per Position, and
+    grows them by doubling their capacity when full.
+
+    As the columns hold PriceParser integers, writing a value
+    which is not integral raises a ValueError, rather than
+    silently truncating it as the column would.
+    """
+    def __init__(self, capacity=64):
+        self.capacity = capacity
+        self.columns = {
+            name: np.zeros(capacity, dtype=np.int64)
+            for name in POSITION_FIELDS
+        }
+        self.actions = np.zeros(capacity, dtype=np.int8)
+        self.tickers = np.empty(capacity, dtype=object)
+
+    def _grow(self):
+        """
+        Doubles the capacity of every column.
+        """
+        self.capacity *= 2
+        for name, column in self.columns.items():
+            grown = np.zeros(self.capacity, dtype=np.int64)
+            grown[:len(column)] = column
+            self.columns[name] = grown
+        actions = np.zeros(self.capacity, dtype=np.int8)
+        actions[:len(self.actions)] = self.actions
+        self.actions = actions
+        tickers = np.empty(self.capacity, dtype=object)
+        tickers[:len(self.tickers)] = self.tickers
+        self.tickers = tickers
+
+    def _write(self, row, position):
+        """
+        Copies every attribute of a Position into a row.
+        """
+        self.actions[row] = ACTIONS[position.action]
+        self.tickers[row] = position.ticker
+        for name in POSITION_FIELDS:
+            self.columns[name][row] = _integer(name, getattr(position, name))
+
+    def _frame(self, rows):
+        """
+        Returns the given rows as a DataFrame with the same
+        columns as a list of Position.__dict__ objects.
+        """
+        data = {
+            "action": [ACTION_NAMES[a] for a in self.actions[rows]],
+            "ticker": list(self.tickers[rows]),
+        }
+        for name in POSITION_FIELDS:
+            data[name] = self.columns[name][rows]
+        return pd.DataFrame(
+            data, columns=["action", "ticker"] + list(POSITION_FIELDS)
+        )
+
+
+class PositionBook(PositionColumns):
+    """
+    PositionBook is an array-backed store of the open Positions
+    of a Portfolio, with the same dictionary interface (keyed by
+    ticker) as Portfolio.positions.
+
+    Assigning a Position copies it into a row of the book, while
+    looking up a ticker returns a PositionView onto its row. The
+    market value of every open Position can be updated at once
+    with vectorised operations via update_market_values.
+
+    Rows of closed Positions are recycled for new Positions, so a
+    PositionView returned by pop() is only valid until the next
+    Position is added to the book.
+    """
+    def __init__(self, capacity=64):
+        super(PositionBook, self).__init__(capacity)
+        self.rows = {}
+        self._free_rows = []
+        self._next_row = 0
+
+    def __len__(self):
+        return len(self.rows)
+
+    def __contains__(self, ticker):
+        return ticker in self.rows
+
+    def __iter__(self):
+        return iter(list(self.rows))
+
+    def __getitem__(self, ticker):
+        return PositionView(self, self.rows[ticker])
+
+    def __setitem__(self, ticker, position):
+        if ticker in self.rows:
+            row = self.rows[ticker]
+        elif self._free_rows:
+            row = self._free_rows.pop()
+        else:
+            if self._next_row == self.capacity:
+                self._grow()
+            row = self._next_row
+            self._next_row += 1
+        self._write(row, position)
+        self.rows[ticker] = row
+
+    def get(self, ticker, default=None):
+        if ticker in self.rows:
+            return self[ticker]
+        return default
+
+    def keys(self):
+        return list(self.rows)
+
+    def values(self):
+        return [self[ticker] for ticker in self.rows]
+
+    def items(self):
+        return [(ticker, self[ticker]) for ticker in self.rows]
+
+    def pop(self, ticker):
+        """
+        Removes the Position in ticker from the book, returning
+        a PositionView onto its (now free) row.
+        """
+        row = self.rows.pop(ticker)
+        self._free_rows.append(row)
+        return PositionView(self, row)
+
+    def _open_rows(self):
+        return np.fromiter(self.rows.values(), dtype=np.int64, count=len(self.rows))
+
+    def update_market_values(self, bids, asks):
+        """
+        Updates the market value and unrealised PnL of every open
+        Position at once, as Position.update_market_value does for
+        a single one. The bids and asks must be ordered as the
+        tickers of the book (i.e. as list(book)).
+        """
+        rows = self._open_rows()
+        midpoint = (
+            _integer_array("bids", bids) + _integer_array("asks", asks)
+        ) // 2
+        market_value = (
+            self.columns["quantity"][rows] * midpoint *
+            np.sign(self.columns["net"][rows])
+        )
+        self.columns["market_value"][rows] = market_value
+        self.columns["unrealised_pnl"][rows] = (
+            market_value - self.columns["cost_basis"][rows]
+        )
+
+    def total_unrealised_pnl(self):
+        """
+        Returns the unrealised PnL summed over all open Positions.
+        """
+        return int(self.columns["unrealised_pnl"][self._open_rows()].sum())
+
+    def total_equity(self):
+        """
+        Returns the contribution of all open Positions to the
+        equity of the Portfolio.
+        """
+        rows = self._open_rows()
+        return int((
+            self.columns["market_value"][rows] -
+            self.columns["cost_basis"][rows] +
+            self.columns["realised_pnl"][rows]
+        ).sum())
+
+    def to_frame(self):
+        """
+        Returns the open Positions as a DataFrame.
+        """
+        return self._frame(self._open_rows())
+
+
+class ClosedPositionBook(PositionColumns):
+    """
+    ClosedPositionBook compactly stores closed Positions as rows
+    of NumPy columns, with the list interface (append, len,
+    indexing and iteration) of Portfolio.closed_positions.
+    """
+    def __init__(self, capacity=64):
+        super(ClosedPositionBook, self).__init__(capacity)
+        self.length = 0
+
+    def __len__(self):
+        return self.length
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += self.length
+        if not 0 <= index < self.length:
+            raise IndexError("closed position index out of range")
+        return PositionView(self, index)
+
+    def __iter__(self):
+        for row in range(self.length):
+            yield PositionView(self, row)
+
+    def append(self, position):
+        """
+        Copies a closed Position (or PositionView) into the book.
+        """
+        if self.length == self.capacity:
+            self._grow()
+        self._write(self.length, position)
+        self.length += 1
+
+    def to_frame(self):
+        """
+        Returns the closed Positions as a DataFrame.
+        """
+        return self._frame(np.arange(self.length))
@@ -1,7 +1,10 @@
 from __future__ import print_function
 
+import time
 from abc import ABCMeta
 
+from .history import PriceHistory
+
 
 class AbstractPriceHandler(object):
     """
@@ -32,6 +35,16 @@ class AbstractPriceHandler(object):
                 "as it was never subscribed." % ticker
             )
 
+    def wait_for_prices(self, timeout):
+        """
+        Blocks a live session, which has no events to process,
+        until new prices may be available or for at most timeout
+        seconds. Handlers fed by another thread override this
+        to return as soon as prices arrive.
+        """
+        time.sleep(timeout)
+        return False
+
     def get_last_timestamp(self, ticker):
         """
         Returns the most recent actual timestamp for a given ticker
@@ -80,12 +93,28 @@ class AbstractTickPriceHandler(AbstractPriceHandler):
 
 
 class AbstractBarPriceHandler(AbstractPriceHandler):
+    # The PriceHistory of the streamed bars, if enabled
+    history = None
+
     def istick(self):
         return False
 
     def isbar(self):
         return True
 
+    def enable_history(self, lookback):
+        """
+        Keeps the bars of the last lookback timestamps of every
+        ticker in a PriceHistory, shared by the strategies and
+        signal sizers via price_handler.history, and returns it.
+        """
+        self.history = PriceHistory(lookback, list(self.tickers))
+        return self.history
+
+    def _record_history(self, event):
+        if self.history is not None:
+            self.history.record(event)
+
     def _store_event(self, event):
         """
         Store price event for closing price and adjusted closing price
@@ -94,6 +123,26 @@ class AbstractBarPriceHandler(AbstractPriceHandler):
         self.tickers[ticker]["close"] = event.close_price
         self.tickers[ticker]["adj_close"] = event.adj_close_price
         self.tickers[ticker]["timestamp"] = event.time
+        self._record_history(event)
+
+    def _store_batch_event(self, event):
+        """
+        Store closing prices and adjusted closing prices
+        of every ticker in a BarBatchEvent
+        """
+        if event.adj_close_prices is not None:
+            adj_close_prices = event.adj_close_prices.tolist()
+        else:
+            adj_close_prices = [None] * len(event)
+        for ticker, close_price, adj_close_price in zip(
+            event.tickers, event.close_prices.tolist(), adj_close_prices
+        ):
+            ticker_prices = self.tickers[ticker]
+            ticker_prices["close"] = close_price
+            ticker_prices["adj_close"] = adj_close_price
+            ticker_prices["timestamp"] = event.time
+        if self.history is not None:
+            self.history.record_batch(event)
 
     def get_last_close(self, ticker):
         """
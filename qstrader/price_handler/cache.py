@@ -0,0 +1,166 @@
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from ..price_parser import PriceParser
+
+
+class CsvPriceCache(object):
+    """
+    CsvPriceCache is a transparent on-disk cache of parsed price
+    CSV files. The first read of a CSV file parses it with
+    pandas.read_csv as usual and writes its columns as NumPy .npy
+    files, together with the modification time and size of the
+    CSV. Subsequent reads of the unchanged file load (and, by
+    default, memory-map) the .npy files instead of parsing the CSV.
+
+    The price columns are stored, and returned, as int64 in the
+    integer representation of the PriceParser. As PriceParser.parse
+    passes integers through, handlers create exactly the same
+    events as from the float prices. Price columns containing
+    missing values are kept as floats.
+
+    By default the cache of data/SPY.csv is written to the
+    directory data/.price_cache/SPY.csv/, alongside the CSV file.
+    """
+    def __init__(self, cache_dir=None, mmap=True):
+        """
+        Parameters:
+        cache_dir - Optional directory holding the cache of every
+            CSV file, instead of one alongside each CSV file
+        mmap - Whether to memory-map the cached columns
+        """
+        self.cache_dir = cache_dir
+        self.mmap = mmap
+        self.hits = []
+        self.misses = []
+
+    def _entry_dir(self, csv_path):
+        name = os.path.basename(csv_path)
+        if self.cache_dir is not None:
+            return os.path.join(self.cache_dir, name)
+        return os.path.join(os.path.dirname(csv_path), ".price_cache", name)
+
+    def _fingerprint(self, csv_path, price_columns, read_csv_kwargs):
+        stat = os.stat(csv_path)
+        return {
+            "mtime_ns": stat.st_mtime_ns,
+            "size": stat.st_size,
+            "price_columns": list(price_columns),
+            "options": repr(sorted(read_csv_kwargs.items())),
+        }
+
+    def read_csv(self, csv_path, price_columns, **read_csv_kwargs):
+        """
+        Returns the DataFrame of the CSV file, with its price
+        columns converted into integers, reading it from the cache
+        when the file is unchanged since it was cached.
+
+        Parameters:
+        csv_path - The path of the CSV file
+        price_columns - The names of the columns holding prices
+        read_csv_kwargs - Keyword arguments for pandas.read_csv
+        """
+        fingerprint = self._fingerprint(
+            csv_path, price_columns, read_csv_kwargs
+        )
+        entry_dir = self._entry_dir(csv_path)
+        df = self._load(entry_dir, fingerprint)
+        if df is not None:
+            self.hits.append(csv_path)
+            return df
+        self.misses.append(csv_path)
+        df = pd.read_csv(csv_path, **read_csv_kwargs)
+        for col in price_columns:
+            if not df[col].isnull().any():
+                df[col] = PriceParser.parse_array(df[col].values)
+        self._save(entry_dir, fingerprint, df)
+        return df
+
+    def _load(self, entry_dir, fingerprint):
+        """
+        Loads a cached DataFrame, or returns None if there is no
+        valid cache entry for the fingerprint of the CSV file.
+        """
+        try:
+            with open(os.path.join(entry_dir, "meta.json")) as meta_file:
+                meta = json.load(meta_file)
+        except (IOError, OSError, ValueError):
+            return None
+        if meta.get("fingerprint") != fingerprint:
+            return None
+        mmap_mode = "r" if self.mmap else None
+        try:
+            index = np.load(
+                os.path.join(entry_dir, "index.npy"), mmap_mode=mmap_mode
+            )
+            columns = [
+                np.load(
+                    os.path.join(entry_dir, "col_%d.npy" % i),
+                    mmap_mode=mmap_mode
+                )
+                for i in range(len(meta["columns"]))
+            ]
+        except (IOError, OSError, ValueError):
+            return None
+        index = pd.DatetimeIndex(
+            index.view("datetime64[ns]"), name=meta["index_name"]
+        )
+        if meta["tz"] is not None:
+            index = index.tz_localize("UTC").tz_convert(meta["tz"])
+        return pd.DataFrame(
+            dict(zip(meta["columns"], columns)),
+            index=index, columns=meta["columns"], copy=False
+        )
+
+    def _save(self, entry_dir, fingerprint, df):
+        """
+        Writes the columns of the DataFrame to the cache, writing
+        the metadata last so that partial entries are never read.
+        Frames which cannot be stored as plain arrays are not cached.
+        """
+        if not isinstance(df.index, pd.DatetimeIndex):
+            return
+        if any(dtype == object for dtype in df.dtypes):
+            return
+        meta_path = os.path.join(entry_dir, "meta.json")
+        if not os.path.isdir(entry_dir):
+            os.makedirs(entry_dir)
+        elif os.path.exists(meta_path):
+            os.remove(meta_path)
+        index = df.index
+        tz = None
+        if index.tz is not None:
+            tz = str(index.tz)
+            index = index.tz_convert("UTC").tz_localize(None)
+        np.save(
+            os.path.join(entry_dir, "index.npy"),
+            index.values.astype("datetime64[ns]").view(np.int64)
+        )
+        for i, col in enumerate(df.columns):
+            np.save(
+                os.path.join(entry_dir, "col_%d.npy" % i),
+                np.ascontiguousarray(df[col].values)
+            )
+        meta = {
+            "fingerprint": fingerprint,
+            "columns": [str(col) for col in df.columns],
+            "index_name": df.index.name,
+            "tz": tz,
+        }
+        with open(meta_path + ".tmp", "w") as meta_file:
+            json.dump(meta, meta_file)
+        os.replace(meta_path + ".tmp", meta_path)
+
+    def report(self):
+        """
+        Returns a summary of the cache hits and misses.
+        """
+        return "CsvPriceCache: %d hits, %d misses%s" % (
+            len(self.hits), len(self.misses),
+            "" if not self.misses else " (%s)" % ", ".join(
+                os.path.basename(path) for path in self.misses
+            )
+        )
@@ -0,0 +1,152 @@
+import contextlib
+import datetime
+import os
+import sqlite3
+
+
+# The fields of a Questrade API candle, in the order of the API
+CANDLE_FIELDS = (
+    "start", "end", "low", "high", "open", "close", "volume", "VWAP"
+)
+
+
+class CandleStore(object):
+    """
+    CandleStore persists the daily candles downloaded from the
+    Questrade API in a local SQLite database, together with the
+    range of dates already downloaded for each ticker.
+
+    Histories are then read from the store, only requesting from
+    the API the dates which are not yet covered, so that a daily
+    re-run downloads just the newest candles of each ticker. The
+    last stored date is requested again when topping up, as its
+    candle may have been incomplete when it was downloaded.
+
+    Every call uses its own connection, so the store may be used
+    by the threads of a ConcurrentFetcher.
+    """
+    def __init__(self, db_path):
+        """
+        Parameters:
+        db_path - The path of the SQLite database file
+        """
+        self.db_path = db_path
+        db_dir = os.path.dirname(db_path)
+        if db_dir and not os.path.isdir(db_dir):
+            os.makedirs(db_dir)
+        self.requests = []
+        with self._connect() as connection:
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS candles ("
+                "ticker TEXT NOT NULL, date TEXT NOT NULL, %s, "
+                "PRIMARY KEY (ticker, date))" % ", ".join(
+                    '"%s"' % field for field in CANDLE_FIELDS
+                )
+            )
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS coverage ("
+                "ticker TEXT PRIMARY KEY, first TEXT NOT NULL, "
+                "last TEXT NOT NULL)"
+            )
+
+    @contextlib.contextmanager
+    def _connect(self):
+        """
+        Yields a connection within a transaction, committed
+        (or rolled back) and closed upon leaving the block.
+        """
+        connection = sqlite3.connect(self.db_path, timeout=60)
+        try:
+            with connection:
+                yield connection
+        finally:
+            connection.close()
+
+    def coverage(self, ticker):
+        """
+        Returns the first and last dates ("YYYY-MM-DD") downloaded
+        for the ticker, or None if it has never been downloaded.
+        """
+        with self._connect() as connection:
+            row = connection.execute(
+                "SELECT first, last FROM coverage WHERE ticker = ?", (ticker,)
+            ).fetchone()
+        return None if row is None else tuple(row)
+
+    def _missing_ranges(self, ticker, start, end):
+        covered = self.coverage(ticker)
+        if covered is None:
+            return [(start, end)]
+        first, last = covered
+        ranges = []
+        if start < first:
+            ranges.append((start, first))
+        if end > last:
+            ranges.append((last, end))
+        return ranges
+
+    def store(self, ticker, start, end, candles):
+        """
+        Inserts (or replaces) the candles downloaded for the
+        ticker between the dates start and end, inclusive.
+        """
+        rows = [
+            (ticker, candle["start"][:10]) + tuple(
+                candle[field] for field in CANDLE_FIELDS
+            )
+            for candle in candles
+        ]
+        with self._connect() as connection:
+            connection.executemany(
+                "INSERT OR REPLACE INTO candles VALUES (%s)" % ", ".join(
+                    ["?"] * (len(CANDLE_FIELDS) + 2)
+                ), rows
+            )
+            covered = connection.execute(
+                "SELECT first, last FROM coverage WHERE ticker = ?", (ticker,)
+            ).fetchone()
+            if covered is not None:
+                start = min(start, covered[0])
+                end = max(end, covered[1])
+            connection.execute(
+                "INSERT OR REPLACE INTO coverage VALUES (?, ?, ?)",
+                (ticker, start, end)
+            )
+
+    def candles(self, ticker, start, end):
+        """
+        Returns the stored candles of the ticker between the dates
+        start and end, inclusive, as dictionaries of the API fields.
+        """
+        with self._connect() as connection:
+            rows = connection.execute(
+                "SELECT %s FROM candles WHERE ticker = ? "
+                "AND date >= ? AND date <= ? ORDER BY date" % ", ".join(
+                    '"%s"' % field for field in CANDLE_FIELDS
+                ), (ticker, start, end)
+            ).fetchall()
+        return [dict(zip(CANDLE_FIELDS, row)) for row in rows]
+
+    def history(self, ticker, start, end, fetch):
+        """
+        Returns the candles of the ticker between the dates start
+        and end, inclusive, first downloading with fetch(ticker,
+        start, end) any dates which are not yet stored.
+        """
+        end = min(end, datetime.date.today().strftime("%Y-%m-%d"))
+        for fetch_start, fetch_end in self._missing_ranges(ticker, start, end):
+            self.requests.append((ticker, fetch_start, fetch_end))
+            self.store(
+                ticker, fetch_start, fetch_end,
+                fetch(ticker, fetch_start, fetch_end)
+            )
+        return self.candles(ticker, start, end)
+
+    def cached(self, fetch):
+        """
+        Wraps the fetch callable of a ConcurrentFetcher so that
+        it reads and tops up the store.
+        """
+        def fetch_stored(ticker, start, end):
+            return self.history(ticker, start, end, fetch)
+        return fetch_stored
@@ -0,0 +1,221 @@
+import hashlib
+import os
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+
+class CsvDateIndex(object):
+    """
+    CsvDateIndex is a sidecar index of a date-ordered price CSV
+    file, holding the date and byte offset of every stride-th
+    row. It allows the rows within a date range to be read by
+    seeking straight to them, rather than parsing the full history
+    of the file and trimming it afterwards.
+
+    The index is built by a single scan of the raw lines of the
+    file, without parsing them, and is saved to index_dir or, by
+    default, to a directory of the system temporary directory,
+    so that the (possibly read-only) data directory is never
+    written to. Saving is best-effort: if the index cannot be
+    written it is simply kept in memory. It is rebuilt whenever
+    the modification time or size of the file change. Files
+    whose rows are not in ascending date order are never
+    range-read, but read in full as before.
+    """
+    def __init__(self, csv_path, header=True, stride=256, index_dir=None):
+        """
+        Parameters:
+        csv_path - The path of the CSV file, dated in its first column
+        header - Whether the first line of the file is a header
+        stride - The number of rows between indexed rows
+        index_dir - Optional directory of the index file, instead
+            of the qstrader_csv_index directory of the system
+            temporary directory
+        """
+        self.csv_path = csv_path
+        self.header = header
+        self.stride = stride
+        if index_dir is None:
+            index_dir = os.path.join(
+                tempfile.gettempdir(), "qstrader_csv_index"
+            )
+        # Files of the same name in different directories are
+        # told apart by a digest of their directory
+        digest = hashlib.sha1(
+            os.path.dirname(os.path.abspath(csv_path)).encode()
+        ).hexdigest()[:12]
+        self.index_path = os.path.join(
+            index_dir, "%s-%s.index.npz" % (os.path.basename(csv_path), digest)
+        )
+        self.offsets = None
+        self.dates = None
+        self.ordered = False
+        self._load_or_build()
+
+    def _fingerprint(self):
+        stat = os.stat(self.csv_path)
+        return np.array(
+            [stat.st_mtime_ns, stat.st_size, self.stride, int(self.header)],
+            dtype=np.int64
+        )
+
+    def _load_or_build(self):
+        fingerprint = self._fingerprint()
+        try:
+            with np.load(self.index_path) as index:
+                if np.array_equal(index["fingerprint"], fingerprint):
+                    self.offsets = index["offsets"]
+                    self.dates = index["dates"]
+                    self.ordered = bool(index["ordered"])
+                    return
+        except (IOError, OSError, ValueError, KeyError):
+            pass
+        self._build()
+        self._save(fingerprint)
+
+    def _build(self):
+        """
+        Scans the lines of the file for the byte offset and
+        date of every stride-th (non-blank) row.
+        """
+        offsets = []
+        date_strings = []
+        with open(self.csv_path, "rb") as csv_file:
+            pos = 0
+            if self.header:
+                pos = len(csv_file.readline())
+            row = 0
+            for line in csv_file:
+                if line.strip():
+                    if row % self.stride == 0:
+                        offsets.append(pos)
+                        date_strings.append(line.split(b",", 1)[0].decode())
+                    row += 1
+                pos += len(line)
+        try:
+            dates = pd.to_datetime(date_strings)
+        except (ValueError, TypeError):
+            dates = None
+        if dates is not None and getattr(dates, "tz", None) is not None:
+            dates = dates.tz_convert("UTC").tz_localize(None)
+        self.offsets = np.array(offsets, dtype=np.int64)
+        if dates is None or dates.hasnans or not dates.is_monotonic_increasing:
+            self.dates = np.zeros(len(offsets), dtype=np.int64)
+            self.ordered = False
+        else:
+            self.dates = dates.values.astype("datetime64[ns]").view(np.int64)
+            self.ordered = True
+
+    def _save(self, fingerprint):
+        """
+        Saves the index, if possible, otherwise keeping
+        it in memory only.
+        """
+        tmp_path = self.index_path + ".tmp"
+        try:
+            index_dir = os.path.dirname(self.index_path)
+            if not os.path.isdir(index_dir):
+                os.makedirs(index_dir)
+            with open(tmp_path, "wb") as index_file:
+                np.savez(
+                    index_file, fingerprint=fingerprint, offsets=self.offsets,
+                    dates=self.dates, ordered=np.array(self.ordered)
+                )
+            os.replace(tmp_path, self.index_path)
+        except (IOError, OSError):
+            try:
+                os.remove(tmp_path)
+            except (IOError, OSError):
+                pass
+
+    @staticmethod
+    def _value(date):
+        date = pd.Timestamp(date)
+        if date.tz is not None:
+            date = date.tz_convert("UTC").tz_localize(None)
+        return date.value
+
+    def locate(self, start_date=None, end_date=None):
+        """
+        Returns the byte offset of the first row, and the number of
+        rows (or None for every remaining row), to read in order to
+        cover the rows of the date range (start_date <= date < end_date).
+        Returns (None, None) if the file cannot be range-read.
+        """
+        if not self.ordered or len(self.offsets) == 0:
+            return None, None
+        first = 0
+        if start_date is not None:
+            # The last indexed row before the start, as the rows
+            # preceding it are earlier still
+            first = max(
+                np.searchsorted(self.dates, self._value(start_date)) - 1, 0
+            )
+        nrows = None
+        if end_date is not None:
+            # The first indexed row on or after the end
+            last = np.searchsorted(self.dates, self._value(end_date))
+            if last < len(self.offsets):
+                nrows = (max(last, first) - first) * self.stride
+        return int(self.offsets[first]), nrows
+
+    def read_csv(
+        self, start_date=None, end_date=None, chunksize=None,
+        **read_csv_kwargs
+    ):
+        """
+        Reads the rows covering the date range with pandas.read_csv,
+        seeking to the first of them. The returned rows may include
+        up to stride rows either side of the date range, so should
+        be trimmed as usual. The column names must be given as names
+        in read_csv_kwargs, as the header line is skipped.
+
+        With a chunksize, returns a generator of DataFrames which
+        keeps the file open until it is exhausted or closed.
+        Returns None if the file cannot be range-read.
+        """
+        offset, nrows = self.locate(start_date, end_date)
+        if offset is None:
+            return None
+        read_csv_kwargs = dict(read_csv_kwargs, header=None, nrows=nrows)
+        if chunksize is not None:
+            return self._read_chunks(offset, chunksize, read_csv_kwargs)
+        with open(self.csv_path, "rb") as csv_file:
+            csv_file.seek(offset)
+            return pd.read_csv(csv_file, **read_csv_kwargs)
+
+    def _read_chunks(self, offset, chunksize, read_csv_kwargs):
+        with open(self.csv_path, "rb") as csv_file:
+            csv_file.seek(offset)
+            reader = pd.read_csv(
+                csv_file, chunksize=chunksize, **read_csv_kwargs
+            )
+            try:
+                for chunk in reader:
+                    yield chunk
+            finally:
+                reader.close()
+
+
+def read_csv_range(
+    csv_path, start_date=None, end_date=None, index_dir=None,
+    **read_csv_kwargs
+):
+    """
+    Reads the rows of a date-ordered CSV file covering the date
+    range via its CsvDateIndex (saved to index_dir, if given), or
+    the whole file if there is no date range, or it cannot be
+    range-read, or it has no rows within the date range. The file
+    has a header line if a header is given in read_csv_kwargs.
+    """
+    if start_date is not None or end_date is not None:
+        csv_index = CsvDateIndex(
+            csv_path, header=read_csv_kwargs.get("header") is not None,
+            index_dir=index_dir
+        )
+        df = csv_index.read_csv(start_date, end_date, **read_csv_kwargs)
+        if df is not None and len(df) > 0:
+            return df
+    return pd.read_csv(csv_path, **read_csv_kwargs)
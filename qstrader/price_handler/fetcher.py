@@ -0,0 +1,134 @@
+from __future__ import print_function
+
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+
+class RateLimiter(object):
+    """
+    RateLimiter spaces out calls shared between threads, so that
+    no more than rate calls are started per second.
+    """
+    def __init__(self, rate):
+        self.interval = 1.0 / rate
+        self._next = 0.0
+        self._lock = threading.Lock()
+
+    def wait(self):
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next)
+            self._next = start + self.interval
+        if start > now:
+            time.sleep(start - now)
+
+
+class ConcurrentFetcher(object):
+    """
+    ConcurrentFetcher retrieves the price history of many tickers
+    concurrently from a remote source, such as the Questrade API,
+    with a thread pool of at most max_workers requests in flight.
+
+    Each request is rate limited, retried with exponential backoff
+    upon any error and, if a cache directory is given, its response
+    is cached on disk as JSON by (ticker, start, end), so repeated
+    backtests over the same dates do not call the source again.
+
+    The fetch callable takes the ticker and the first and last
+    dates (as "YYYY-MM-DD" strings) and returns the JSON-serialisable
+    response, e.g. a list of candle dictionaries.
+    """
+    def __init__(
+        self, fetch, max_workers=8, retries=3, backoff=0.5,
+        rate=None, cache_dir=None
+    ):
+        """
+        Parameters:
+        fetch - Callable fetching the history of a single ticker
+        max_workers - The maximum number of concurrent requests
+        retries - The number of retries of a failed request
+        backoff - The delay in seconds before the first retry,
+            doubling with each further retry
+        rate - Optional maximum number of requests per second
+        cache_dir - Optional directory of the cached responses
+        """
+        self.fetch = fetch
+        self.max_workers = max_workers
+        self.retries = retries
+        self.backoff = backoff
+        self.rate_limiter = RateLimiter(rate) if rate else None
+        self.cache_dir = cache_dir
+
+    def _cache_path(self, ticker, start, end):
+        return os.path.join(
+            self.cache_dir, "%s_%s_%s.json" % (ticker, start, end)
+        )
+
+    def _read_cache(self, ticker, start, end):
+        if self.cache_dir is None:
+            return None
+        try:
+            with open(self._cache_path(ticker, start, end)) as cache_file:
+                return json.load(cache_file)
+        except (IOError, OSError, ValueError):
+            return None
+
+    def _write_cache(self, ticker, start, end, data):
+        if self.cache_dir is None:
+            return
+        if not os.path.isdir(self.cache_dir):
+            os.makedirs(self.cache_dir, exist_ok=True)
+        cache_path = self._cache_path(ticker, start, end)
+        tmp_path = "%s.%d.tmp" % (cache_path, threading.get_ident())
+        with open(tmp_path, "w") as cache_file:
+            json.dump(data, cache_file)
+        os.replace(tmp_path, cache_path)
+
+    def fetch_one(self, ticker, start, end):
+        """
+        Returns the history of a single ticker, from the cache
+        or else from the source, retrying failed requests. The
+        error of the last attempt is raised if every attempt fails.
+        """
+        data = self._read_cache(ticker, start, end)
+        if data is not None:
+            return data
+        for attempt in range(self.retries + 1):
+            if self.rate_limiter is not None:
+                self.rate_limiter.wait()
+            try:
+                data = self.fetch(ticker, start, end)
+                break
+            except Exception:
+                if attempt == self.retries:
+                    raise
+                time.sleep(self.backoff * 2 ** attempt)
+        self._write_cache(ticker, start, end, data)
+        return data
+
+    def fetch_many(self, tickers, start, end):
+        """
+        Returns a dictionary of the history of each ticker,
+        fetched concurrently. Tickers which could not be fetched
+        are reported and left out.
+        """
+        tickers = list(tickers)
+        results = {}
+        if not tickers:
+            return results
+        with ThreadPoolExecutor(
+            max_workers=min(self.max_workers, len(tickers))
+        ) as pool:
+            futures = [
+                (ticker, pool.submit(self.fetch_one, ticker, start, end))
+                for ticker in tickers
+            ]
+            for ticker, future in futures:
+                try:
+                    results[ticker] = future.result()
+                except Exception as error:
+                    print("Could not fetch prices of %s:" % ticker, error)
+        return results
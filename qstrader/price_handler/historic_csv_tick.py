@@ -67,8 +67,8 @@ class HistoricCSVTickPriceHandler(AbstractTickPriceHandler):
                 dft = self.tickers_data[ticker]
                 row0 = dft.iloc[0]
                 ticker_prices = {
-                    "bid": PriceParser.parse(row0["Bid"]),
-                    "ask": PriceParser.parse(row0["Ask"]),
+                    "bid": PriceParser.parse_scalar(row0["Bid"]),
+                    "ask": PriceParser.parse_scalar(row0["Ask"]),
                     "timestamp": dft.index[0]
                 }
                 self.tickers[ticker] = ticker_prices
@@ -88,8 +88,8 @@ class HistoricCSVTickPriceHandler(AbstractTickPriceHandler):
         Obtain all elements of the bar a row of dataframe
         and return a TickEvent
         """
-        bid = PriceParser.parse(row["Bid"])
-        ask = PriceParser.parse(row["Ask"])
+        bid = PriceParser.parse_scalar(row["Bid"])
+        ask = PriceParser.parse_scalar(row["Ask"])
         tev = TickEvent(ticker, index, bid, ask)
         return tev
 
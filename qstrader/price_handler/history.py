@@ -0,0 +1,207 @@
+import numpy as np
+import pandas as pd
+
+from ..price_parser import PriceParser
+
+
+# The BarEvent attributes kept by a PriceHistory (the attributes
+# of a BarBatchEvent being their plurals, e.g. close_prices)
+HISTORY_FIELDS = (
+    "open_price", "high_price", "low_price",
+    "close_price", "adj_close_price", "volume"
+)
+
+
+class PriceHistory(object):
+    """
+    PriceHistory keeps the bars of the last lookback timestamps of
+    every ticker in preallocated (time x ticker) NumPy matrices, one
+    per field, so that strategies and signal sizers may read their
+    lookback windows without building DataFrames.
+
+    Each matrix has 2 * lookback rows and every bar is written to
+    both row i and row i + lookback. Whatever the current position
+    of the ring, the last n rows are then always a contiguous slice,
+    which history() returns as a (read-only) view, without copying.
+
+    Prices are held as floats in dollars rather than PriceParser
+    integers. A ticker without a bar at a timestamp keeps its last
+    price (or NaN before its first bar), as does the price handler.
+    Tickers are added as their first bar arrives.
+    """
+    def __init__(self, lookback, tickers=None, fields=HISTORY_FIELDS):
+        """
+        Parameters:
+        lookback - The number of timestamps kept
+        tickers - Optional tickers given the first columns, in order
+        fields - The BarEvent attributes kept
+        """
+        if lookback < 1:
+            raise ValueError("lookback must be at least 1")
+        self.lookback = lookback
+        self.fields = tuple(fields)
+        self.columns = {}
+        self.tickers = []
+        self.capacity = max(len(tickers or ()), 8)
+        self.data = {
+            field: np.full((2 * lookback, self.capacity), np.nan)
+            for field in self.fields
+        }
+        self.times = np.zeros(2 * lookback, dtype=np.int64)
+        self.tz = None
+        self.length = 0
+        self._row = -1
+        self._time = None
+        for ticker in tickers or ():
+            self._column(ticker)
+
+    def __len__(self):
+        return self.length
+
+    def _column(self, ticker):
+        column = self.columns.get(ticker)
+        if column is None:
+            column = len(self.tickers)
+            if column == self.capacity:
+                self._grow()
+            self.columns[ticker] = column
+            self.tickers.append(ticker)
+        return column
+
+    def _grow(self):
+        """
+        Doubles the number of ticker columns.
+        """
+        self.capacity *= 2
+        for field, matrix in self.data.items():
+            grown = np.full((2 * self.lookback, self.capacity), np.nan)
+            grown[:, :matrix.shape[1]] = matrix
+            self.data[field] = grown
+
+    def _advance(self, timestamp):
+        """
+        Starts the row of a new timestamp, carrying forward
+        the prices of the previous row.
+        """
+        previous = self._row
+        row = (previous + 1) % self.lookback
+        if previous >= 0:
+            for matrix in self.data.values():
+                matrix[row] = matrix[previous]
+                matrix[row + self.lookback] = matrix[previous]
+        ts = pd.Timestamp(timestamp)
+        if self._time is None:
+            self.tz = ts.tz
+        self.times[row] = self.times[row + self.lookback] = ts.value
+        self._row = row
+        self._time = timestamp
+        self.length = min(self.length + 1, self.lookback)
+
+    @staticmethod
+    def _value(field, value):
+        if value is None:
+            return np.nan
+        if field == "volume":
+            return value
+        return value / PriceParser.PRICE_MULTIPLIER
+
+    def record(self, event):
+        """
+        Records the bar of a BarEvent.
+        """
+        if self._time is None or event.time != self._time:
+            self._advance(event.time)
+        column = self._column(event.ticker)
+        row = self._row
+        for field in self.fields:
+            value = self._value(field, getattr(event, field))
+            matrix = self.data[field]
+            matrix[row, column] = matrix[row + self.lookback, column] = value
+
+    def record_batch(self, event):
+        """
+        Records the bars of every ticker of a BarBatchEvent at once.
+        """
+        if self._time is None or event.time != self._time:
+            self._advance(event.time)
+        columns = [self._column(ticker) for ticker in event.tickers]
+        rows = [self._row, self._row + self.lookback]
+        for field in self.fields:
+            values = getattr(event, field + "s")
+            if values is None:
+                values = np.nan
+            elif field != "volume":
+                values = np.asarray(values) / PriceParser.PRICE_MULTIPLIER
+            self.data[field][np.ix_(rows, columns)] = values
+
+    def _rows(self, lookback):
+        if lookback is None or lookback > self.length:
+            lookback = self.length
+        end = self._row + self.lookback + 1
+        return slice(end - lookback, end)
+
+    def _columns(self, tickers):
+        """
+        Returns the columns of the tickers as a slice where
+        possible, so that they may be viewed without a copy.
+        """
+        if tickers is None:
+            return slice(0, len(self.tickers))
+        if isinstance(tickers, str):
+            return self.columns[tickers]
+        columns = [self.columns[ticker] for ticker in tickers]
+        if columns and columns == list(range(columns[0], columns[-1] + 1)):
+            return slice(columns[0], columns[-1] + 1)
+        return columns
+
+    def history(self, tickers=None, field="close_price", lookback=None):
+        """
+        Returns the last lookback values (at most, and by default
+        every value kept) of the field, oldest first, as a (time x
+        ticker) array, or a one-dimensional array for a single
+        ticker given as a string. Every ticker is returned if
+        tickers is None.
+
+        The array is a read-only view onto the history, valid until
+        the next bar is recorded, unless the tickers are not
+        adjacent columns (in the order they were first seen), in
+        which case it is a copy.
+        """
+        values = self.data[field][self._rows(lookback), self._columns(tickers)]
+        values.flags.writeable = False
+        return values
+
+    def timestamps(self, lookback=None):
+        """
+        Returns the timestamps of the last lookback rows as a
+        (read-only) view of int64 nanoseconds since the epoch (UTC).
+        """
+        times = self.times[self._rows(lookback)]
+        times.flags.writeable = False
+        return times
+
+    def index(self, lookback=None):
+        """
+        Returns the timestamps of the last lookback rows
+        as a DatetimeIndex.
+        """
+        index = pd.DatetimeIndex(
+            self.timestamps(lookback).view("datetime64[ns]")
+        )
+        if self.tz is not None:
+            index = index.tz_localize("UTC").tz_convert(self.tz)
+        return index
+
+    def history_frame(self, tickers=None, field="close_price", lookback=None):
+        """
+        Returns the history of the field as a DataFrame
+        indexed by timestamp, with a column per ticker.
+        """
+        if tickers is None:
+            tickers = list(self.tickers)
+        elif isinstance(tickers, str):
+            tickers = [tickers]
+        return pd.DataFrame(
+            self.history(tickers, field, lookback),
+            index=self.index(lookback), columns=list(tickers)
+        )
@@ -1,15 +1,24 @@
 import pandas as pd
 
-from trading_ig.lightstreamer import Subscription
-
 from ..price_parser import PriceParser
 from ..event import TickEvent
 from .base import AbstractTickPriceHandler
+from .ring_buffer import TickRingBuffer
 
 
 class IGTickPriceHandler(AbstractTickPriceHandler):
-    def __init__(self, events_queue, ig_stream_service, tickers):
-        self.price_event = None
+    def __init__(self, events_queue, ig_stream_service, tickers, buffer_size=1024):
+        """
+        Subscribes to the prices of the tickers from the IG
+        Lightstreamer service. Price updates arrive on the thread of
+        the stream and are held in a TickRingBuffer, of at most
+        buffer_size pending updates per ticker, until the trading
+        loop streams them (see buffer.stats()).
+        """
+        from trading_ig.lightstreamer import Subscription
+
+        self.buffer = TickRingBuffer(buffer_size)
+        self.last_arrival = None
         self.events_queue = events_queue
         self.continue_backtest = True
         self.ig_stream_service = ig_stream_service
@@ -34,22 +43,28 @@ class IGTickPriceHandler(AbstractTickPriceHandler):
 
     def on_prices_update(self, data):
         tev = self._create_event(data)
-        if self.price_event is not None:
-            print("losing %s" % self.price_event)
-        self.price_event = tev
+        self.buffer.put(tev.ticker, tev)
 
     def _create_event(self, data):
         ticker = data["name"]
         index = pd.to_datetime(data["values"]["UPDATE_TIME"])
-        bid = PriceParser.parse(data["values"]["BID"])
-        ask = PriceParser.parse(data["values"]["OFFER"])
+        bid = PriceParser.parse_scalar(data["values"]["BID"])
+        ask = PriceParser.parse_scalar(data["values"]["OFFER"])
         return TickEvent(ticker, index, bid, ask)
 
     def stream_next(self):
         """
         Place the next PriceEvent (BarEvent or TickEvent) onto the event queue.
         """
-        if self.price_event is not None:
-            self._store_event(self.price_event)
-            self.events_queue.put(self.price_event)
-            self.price_event = None
+        tev = self.buffer.get()
+        if tev is not None:
+            self.last_arrival = self.buffer.last_put_time
+            self._store_event(tev)
+            self.events_queue.put(tev)
+
+    def wait_for_prices(self, timeout):
+        """
+        Blocks until a price update arrives from the stream,
+        or for at most timeout seconds.
+        """
+        return self.buffer.wait(timeout)
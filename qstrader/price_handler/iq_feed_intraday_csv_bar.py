@@ -1,9 +1,9 @@
 import os
 
-import pandas as pd
-
 from ..price_parser import PriceParser
 from .base import AbstractBarPriceHandler
+from .csv_index import read_csv_range
+from .iterator.merge import MergedTickerRowIterator
 from ..event import BarEvent
 
 
@@ -18,23 +18,29 @@ class IQFeedIntradayCsvBarPriceHandler(AbstractBarPriceHandler):
     def __init__(
         self, csv_dir, events_queue,
         init_tickers=None,
-        start_date=None, end_date=None
+        start_date=None, end_date=None,
+        price_cache=None
     ):
         """
         Takes the CSV directory, the events queue and a possible
         list of initial ticker symbols then creates an (optional)
         list of ticker subscriptions and associated prices.
+
+        price_cache is an optional CsvPriceCache used to read the
+        CSV files, in which case the prices of tickers_data are
+        held as PriceParser integers.
         """
         self.csv_dir = csv_dir
+        self.price_cache = price_cache
         self.events_queue = events_queue
         self.continue_backtest = True
         self.tickers = {}
         self.tickers_data = {}
+        self.start_date = start_date
+        self.end_date = end_date
         if init_tickers is not None:
             for ticker in init_tickers:
                 self.subscribe_ticker(ticker)
-        self.start_date = start_date
-        self.end_date = end_date
         self.bar_stream = self._merge_sort_ticker_data()
 
     def _open_ticker_price_csv(self, ticker):
@@ -45,41 +51,43 @@ class IQFeedIntradayCsvBarPriceHandler(AbstractBarPriceHandler):
         """
         ticker_path = os.path.join(self.csv_dir, "%s.csv" % ticker)
 
-        self.tickers_data[ticker] = pd.read_csv(
-            ticker_path,
+        # OpenInterest is not used by the BarEvents
+        read_csv_kwargs = dict(
             names=[
                 "Date", "Open", "Low", "High",
                 "Close", "Volume", "OpenInterest"
             ],
+            usecols=["Date", "Open", "Low", "High", "Close", "Volume"],
             index_col="Date", parse_dates=True
         )
+        if self.price_cache is not None:
+            self.tickers_data[ticker] = self.price_cache.read_csv(
+                ticker_path, ("Open", "Low", "High", "Close"),
+                **read_csv_kwargs
+            )
+        else:
+            self.tickers_data[ticker] = read_csv_range(
+                ticker_path, self.start_date, self.end_date,
+                **read_csv_kwargs
+            )
         self.tickers_data[ticker]["Ticker"] = ticker
 
     def _merge_sort_ticker_data(self):
         """
-        Concatenates all of the separate equities DataFrames
-        into a single DataFrame that is time ordered, allowing tick
-        data events to be added to the queue in a chronological fashion.
+        Merges all of the separate equities DataFrames into a
+        single stream that is time ordered, allowing tick data
+        events to be added to the queue in a chronological fashion.
+        Bars with the same timestamp are streamed in ticker order.
+
+        The rows of each ticker are merged lazily with a k-way
+        merge, rather than concatenating and sorting every frame.
 
         Note that this is an idealised situation, utilised solely for
         backtesting. In live trading ticks may arrive "out of order".
         """
-        df = pd.concat(self.tickers_data.values()).sort_index()
-        start = None
-        end = None
-        if self.start_date is not None:
-            start = df.index.searchsorted(self.start_date)
-        if self.end_date is not None:
-            end = df.index.searchsorted(self.end_date)
-        # Determine how to slice
-        if start is None and end is None:
-            return df.iterrows()
-        elif start is not None and end is None:
-            return df.ix[start:].iterrows()
-        elif start is None and end is not None:
-            return df.ix[:end].iterrows()
-        else:
-            return df.ix[start:end].iterrows()
+        return MergedTickerRowIterator(
+            self.tickers_data, self.start_date, self.end_date
+        )
 
     def subscribe_ticker(self, ticker):
         """
@@ -91,7 +99,7 @@ class IQFeedIntradayCsvBarPriceHandler(AbstractBarPriceHandler):
                 dft = self.tickers_data[ticker]
                 row0 = dft.iloc[0]
 
-                close = PriceParser.parse(row0["Close"])
+                close = PriceParser.parse_scalar(row0["Close"])
 
                 ticker_prices = {
                     "close": close,
@@ -115,11 +123,11 @@ class IQFeedIntradayCsvBarPriceHandler(AbstractBarPriceHandler):
         Obtain all elements of the bar from a row of dataframe
         and return a BarEvent
         """
-        open_price = PriceParser.parse(row["Open"])
-        low_price = PriceParser.parse(row["Low"])
-        high_price = PriceParser.parse(row["High"])
-        close_price = PriceParser.parse(row["Close"])
-        adj_close_price = PriceParser.parse(row["Close"])
+        open_price = PriceParser.parse_scalar(row["Open"])
+        low_price = PriceParser.parse_scalar(row["Low"])
+        high_price = PriceParser.parse_scalar(row["High"])
+        close_price = PriceParser.parse_scalar(row["Close"])
+        adj_close_price = PriceParser.parse_scalar(row["Close"])
         volume = int(row["Volume"])
         bev = BarEvent(
             ticker, index, period, open_price,
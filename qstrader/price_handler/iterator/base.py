@@ -18,11 +18,11 @@ class AbstractBarEventIterator(AbstractPriceEventIterator):
         and return a BarEvent
         """
         try:
-            open_price = PriceParser.parse(row["Open"])
-            high_price = PriceParser.parse(row["High"])
-            low_price = PriceParser.parse(row["Low"])
-            close_price = PriceParser.parse(row["Close"])
-            adj_close_price = PriceParser.parse(row["Adj Close"])
+            open_price = PriceParser.parse_scalar(row["Open"])
+            high_price = PriceParser.parse_scalar(row["High"])
+            low_price = PriceParser.parse_scalar(row["Low"])
+            close_price = PriceParser.parse_scalar(row["Close"])
+            adj_close_price = PriceParser.parse_scalar(row["Adj Close"])
             volume = int(row["Volume"])
 
             # Create the tick event for the queue
@@ -43,8 +43,8 @@ class AbstractTickEventIterator(AbstractPriceEventIterator):
         and return a TickEvent
         """
         try:
-            bid = PriceParser.parse(row["Bid"])
-            ask = PriceParser.parse(row["Ask"])
+            bid = PriceParser.parse_scalar(row["Bid"])
+            ask = PriceParser.parse_scalar(row["Ask"])
             tev = TickEvent(ticker, index, bid, ask)
             return tev
         except ValueError:
@@ -0,0 +1,3 @@
+# flake8: noqa
+
+from .bar import ColumnarBarEventIterator, ColumnarBarBatchIterator
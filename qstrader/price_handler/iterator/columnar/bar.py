@@ -0,0 +1,140 @@
+import numpy as np
+
+from ..base import AbstractBarEventIterator
+from ....event import BarEvent, BarBatchEvent
+from ....price_parser import PriceParser
+
+
+class ColumnarBarEventIterator(AbstractBarEventIterator):
+    """
+    ColumnarBarEventIterator is designed to stream BarEvents from a
+    time-ordered, merged DataFrame of Open-High-Low-Close-Volume
+    (OHLCV) bars containing an additional "Ticker" column, such as
+    the one built by YahooDailyCsvBarPriceHandler.
+
+    Rather than calling DataFrame.iterrows() and parsing every price
+    of every row, the frame is converted once into contiguous integer
+    NumPy arrays (one per column, plus integer ticker codes) and the
+    BarEvents are created by position. The emitted BarEvents are
+    identical to those created from the equivalent rows.
+
+    If recycle is True a single BarEvent object is re-initialised
+    in place for every bar instead of allocating a new one. This is
+    only safe when every bar has been fully consumed before the next
+    one is requested (as in the backtest loop, which empties the
+    events queue before streaming the next bar) and no component
+    keeps a reference to the event.
+    """
+    def __init__(self, df, period, adj_close_col="Adj Close", recycle=False):
+        """
+        Takes the merged Pandas DataFrame, the period of the bars
+        in seconds and the name of the adjusted close column
+        (None if the source does not provide one).
+        """
+        self.period = period
+        self.recycle = recycle
+        self._event = None
+        self.times = df.index
+        self.tickers_lst, self.ticker_codes = self._encode_tickers(df["Ticker"])
+        self.open_prices = self._parse_column(df["Open"])
+        self.high_prices = self._parse_column(df["High"])
+        self.low_prices = self._parse_column(df["Low"])
+        self.close_prices = self._parse_column(df["Close"])
+        if adj_close_col is not None:
+            self.adj_close_prices = self._parse_column(df[adj_close_col])
+        else:
+            self.adj_close_prices = None
+        self.volumes = np.ascontiguousarray(df["Volume"].values, dtype=np.int64)
+        self._length = len(df)
+        self._pos = 0
+
+    def _encode_tickers(self, tickers):
+        """
+        Converts the column of ticker symbols into a list of unique
+        tickers and an array of integer codes into that list.
+        """
+        tickers_lst, codes = np.unique(
+            tickers.values.astype(str), return_inverse=True
+        )
+        tickers_lst = [str(ticker) for ticker in tickers_lst]
+        return tickers_lst, np.ascontiguousarray(codes, dtype=np.int64)
+
+    def _parse_column(self, column):
+        """
+        Converts a column of prices into a contiguous array of
+        the integer representation used by the PriceParser.
+        """
+        return np.ascontiguousarray(PriceParser.parse_array(column.values))
+
+    def __len__(self):
+        return self._length
+
+    def __next__(self):
+        i = self._pos
+        if i >= self._length:
+            raise StopIteration
+        self._pos = i + 1
+        if self.adj_close_prices is not None:
+            adj_close_price = int(self.adj_close_prices[i])
+        else:
+            adj_close_price = None
+        args = (
+            self.tickers_lst[self.ticker_codes[i]], self.times[i],
+            self.period, int(self.open_prices[i]),
+            int(self.high_prices[i]), int(self.low_prices[i]),
+            int(self.close_prices[i]), int(self.volumes[i]),
+            adj_close_price
+        )
+        if not self.recycle:
+            return BarEvent(*args)
+        if self._event is None:
+            self._event = BarEvent(*args)
+        else:
+            BarEvent.__init__(self._event, *args)
+        return self._event
+
+
+class ColumnarBarBatchIterator(ColumnarBarEventIterator):
+    """
+    ColumnarBarBatchIterator streams the same integer NumPy arrays
+    as ColumnarBarEventIterator, but emits a single BarBatchEvent
+    per timestamp containing the bars of every ticker with data
+    at that timestamp, in ticker order.
+
+    The arrays of each BarBatchEvent are views onto the arrays
+    of the iterator, so no prices are copied.
+    """
+    def __init__(self, df, period, adj_close_col="Adj Close"):
+        super(ColumnarBarBatchIterator, self).__init__(
+            df, period, adj_close_col=adj_close_col
+        )
+        self.tickers_arr = np.array(self.tickers_lst, dtype=object)
+        # Positions at which the timestamp changes
+        times = np.asarray(self.times)
+        changes = np.flatnonzero(times[1:] != times[:-1]) + 1
+        if self._length > 0:
+            self.bounds = np.concatenate(([0], changes, [self._length]))
+        else:
+            self.bounds = np.array([0])
+        self._batch = 0
+
+    def __len__(self):
+        return len(self.bounds) - 1
+
+    def __next__(self):
+        b = self._batch
+        if b >= len(self.bounds) - 1:
+            raise StopIteration
+        self._batch = b + 1
+        start, end = self.bounds[b], self.bounds[b + 1]
+        if self.adj_close_prices is not None:
+            adj_close_prices = self.adj_close_prices[start:end]
+        else:
+            adj_close_prices = None
+        return BarBatchEvent(
+            self.times[start], self.period,
+            self.tickers_arr[self.ticker_codes[start:end]].tolist(),
+            self.open_prices[start:end], self.high_prices[start:end],
+            self.low_prices[start:end], self.close_prices[start:end],
+            self.volumes[start:end], adj_close_prices
+        )
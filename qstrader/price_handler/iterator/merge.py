@@ -0,0 +1,119 @@
+import heapq
+from operator import itemgetter
+
+from .base import AbstractPriceEventIterator
+
+
+class MergedTickerRowIterator(AbstractPriceEventIterator):
+    """
+    MergedTickerRowIterator lazily merges the time-ordered
+    DataFrames of each ticker into a single stream of (index, row)
+    pairs, as DataFrame.iterrows() would yield from the concatenated
+    frame sorted by timestamp and then by ticker.
+
+    Rather than concatenating every frame and sorting the result,
+    the rows of each ticker are merged with a heap-based k-way
+    merge, which only holds the next row of each ticker.
+    """
+    def __init__(self, tickers_data, start_date=None, end_date=None):
+        """
+        Takes a dictionary of DataFrames, keyed by ticker and
+        indexed by timestamp, and an optional date range within
+        which rows are streamed (start_date <= timestamp < end_date).
+        """
+        streams = []
+        for ticker in sorted(tickers_data):
+            df = tickers_data[ticker]
+            if not df.index.is_monotonic_increasing:
+                df = df.sort_index(kind="mergesort")
+            start = None
+            end = None
+            if start_date is not None:
+                start = df.index.searchsorted(start_date)
+            if end_date is not None:
+                end = df.index.searchsorted(end_date)
+            streams.append(self._ticker_rows(ticker, df.iloc[start:end]))
+        self._rows = heapq.merge(*streams, key=itemgetter(0, 1))
+
+    @staticmethod
+    def _ticker_rows(ticker, df):
+        for index, row in df.iterrows():
+            yield index, ticker, row
+
+    def __next__(self):
+        index, ticker, row = next(self._rows)
+        return index, row
+
+
+class DynamicTickerRowIterator(AbstractPriceEventIterator):
+    """
+    DynamicTickerRowIterator merges the rows of a changing set of
+    tickers into a single stream of (index, row) pairs, in
+    (timestamp, then ticker) order, like MergedTickerRowIterator.
+
+    Tickers may be added and removed while the stream is being
+    consumed. Each ticker is added as a source, a callable which
+    takes the last timestamp streamed (or None) and returns an
+    iterator of the time-ordered (index, row) pairs of the ticker
+    after that timestamp. A source is only called once the next
+    row is requested, so that no data is read before it is used,
+    and the heap holds just the next row of each ticker.
+    """
+    def __init__(self):
+        self.last_index = None
+        self._heap = []
+        self._rows = {}
+        self._pending = {}
+        self._counter = 0
+
+    def add_ticker(self, ticker, source):
+        """
+        Adds a ticker to the stream, from the next row onwards.
+        """
+        self.remove_ticker(ticker)
+        self._pending[ticker] = source
+
+    def remove_ticker(self, ticker):
+        """
+        Removes a ticker from the stream, closing its rows
+        so that its source releases any data and open files.
+        """
+        self._pending.pop(ticker, None)
+        rows = self._rows.pop(ticker, None)
+        if rows is not None:
+            if hasattr(rows, "close"):
+                rows.close()
+            self._heap = [entry for entry in self._heap if entry[1] != ticker]
+            heapq.heapify(self._heap)
+
+    def __contains__(self, ticker):
+        return ticker in self._rows or ticker in self._pending
+
+    def _push(self, ticker):
+        """
+        Pushes the next row of the ticker onto the heap, or
+        drops the ticker once its rows are exhausted.
+        """
+        try:
+            index, row = next(self._rows[ticker])
+        except StopIteration:
+            del self._rows[ticker]
+            return
+        # The counter breaks ties, so that rows are never compared
+        self._counter += 1
+        heapq.heappush(self._heap, (index, ticker, self._counter, row))
+
+    def __next__(self):
+        if self._pending:
+            for ticker in sorted(self._pending):
+                self._rows[ticker] = iter(
+                    self._pending[ticker](self.last_index)
+                )
+                self._push(ticker)
+            self._pending.clear()
+        if not self._heap:
+            raise StopIteration
+        index, ticker, counter, row = heapq.heappop(self._heap)
+        self._push(ticker)
+        self.last_index = index
+        return index, row
@@ -0,0 +1,125 @@
+from __future__ import print_function
+
+import heapq
+
+import pandas as pd
+
+from .base import AbstractTickPriceHandler
+from .tick_store import TickStore
+from ..event import TickEvent
+
+
+class MemmapTickPriceHandler(AbstractTickPriceHandler):
+    """
+    MemmapTickPriceHandler streams the ticks of each requested
+    financial instrument from a TickStore to the provided events
+    queue as TickEvents.
+
+    Rather than loading, concatenating and sorting every tick
+    (as HistoricCSVTickPriceHandler does), the memory-mapped ticks
+    of each ticker are read a block at a time and merged with a
+    k-way heap merge, so memory use stays flat regardless of the
+    length of the history. Ticks with the same time are streamed
+    in ticker order.
+    """
+    def __init__(
+        self, store_dir, events_queue, init_tickers=None,
+        start_date=None, end_date=None, block_size=4096
+    ):
+        """
+        Takes the TickStore directory, the events queue, a possible
+        list of initial ticker symbols, an optional date range and
+        the number of ticks read from each ticker at a time.
+        """
+        self.store = TickStore(store_dir)
+        self.events_queue = events_queue
+        self.start_date = start_date
+        self.end_date = end_date
+        self.block_size = block_size
+        self.continue_backtest = True
+        self.tickers = {}
+        self.tickers_data = {}
+        if init_tickers is not None:
+            for ticker in init_tickers:
+                self.subscribe_ticker(ticker)
+        self.tick_stream = self._merge_sort_ticker_data()
+
+    def _date_range(self, ticks):
+        """
+        Returns the first and last (exclusive) positions of the
+        ticks within the date range, via binary searches.
+        """
+        start = 0
+        end = len(ticks)
+        if self.start_date is not None:
+            start = ticks["time"].searchsorted(pd.Timestamp(self.start_date).value)
+        if self.end_date is not None:
+            end = ticks["time"].searchsorted(pd.Timestamp(self.end_date).value)
+        return start, end
+
+    def _ticker_ticks(self, ticker, ticks):
+        """
+        Yields (time, ticker, bid, ask) tuples for the ticks of
+        a ticker within the date range, a block at a time.
+        """
+        start, end = self._date_range(ticks)
+        for block_start in range(start, end, self.block_size):
+            block = ticks[block_start:min(block_start + self.block_size, end)]
+            for time, bid, ask in zip(
+                block["time"].tolist(), block["bid"].tolist(),
+                block["ask"].tolist()
+            ):
+                yield time, ticker, bid, ask
+
+    def _merge_sort_ticker_data(self):
+        """
+        Merges the time-ordered ticks of every ticker into a single
+        time-ordered stream, holding only one block per ticker.
+        """
+        return heapq.merge(*[
+            self._ticker_ticks(ticker, ticks)
+            for ticker, ticks in sorted(self.tickers_data.items())
+        ])
+
+    def subscribe_ticker(self, ticker):
+        """
+        Subscribes the price handler to a new ticker symbol.
+        """
+        if ticker not in self.tickers:
+            if ticker not in self.store:
+                print(
+                    "Could not subscribe ticker %s "
+                    "as no ticks are stored for pricing." % ticker
+                )
+                return
+            ticks = self.store.open(ticker)
+            if len(ticks) == 0:
+                print(
+                    "Could not subscribe ticker %s "
+                    "as no ticks are stored for pricing." % ticker
+                )
+                return
+            self.tickers_data[ticker] = ticks
+            self.tickers[ticker] = {
+                "bid": int(ticks["bid"][0]),
+                "ask": int(ticks["ask"][0]),
+                "timestamp": pd.Timestamp(int(ticks["time"][0]))
+            }
+        else:
+            print(
+                "Could not subscribe ticker %s "
+                "as is already subscribed." % ticker
+            )
+
+    def stream_next(self):
+        """
+        Place the next TickEvent onto the event queue.
+        """
+        try:
+            time, ticker, bid, ask = next(self.tick_stream)
+        except StopIteration:
+            self.continue_backtest = False
+            return
+        tev = TickEvent(ticker, pd.Timestamp(time), bid, ask)
+        self._store_event(tev)
+        self.events_queue.put(tev)
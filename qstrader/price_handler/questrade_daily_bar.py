@@ -1,9 +1,9 @@
-import psycopg2
-import os
 import pandas as pd
 
 from ..price_parser import PriceParser
 from .base import AbstractBarPriceHandler
+from .iterator.merge import MergedTickerRowIterator
+from .sql_loader import SqlBarLoader, BAR_COLUMNS
 from ..event import BarEvent
 
 
@@ -18,92 +18,69 @@ class QuestradeDatabaseBarPriceHandler(AbstractBarPriceHandler):
         self, events_queue,
         init_tickers=None,
         start_date=None, end_date=None,
-        calc_returns=False
+        calc_returns=False, config=None, loader=None
     ):
         """
-        Takes the CSV directory, the events queue and a possible
-        list of initial ticker symbols then creates an (optional)
-        list of ticker subscriptions and associated prices.
+        Takes the events queue and a possible list of initial
+        ticker symbols then creates an (optional) list of ticker
+        subscriptions and associated prices.
+
+        The candles are read by the SqlBarLoader loader, which
+        defaults to the Postgres database of the settings config
+        (see postgres_pool). The initial tickers are loaded
+        with a single query, restricted to the date range.
         """
         self.events_queue = events_queue
         self.continue_backtest = True
         self.tickers = {}
         self.tickers_data = {}
+        self.start_date = start_date
+        self.end_date = end_date
+        if loader is None:
+            loader = SqlBarLoader.from_config(config)
+        self.loader = loader
         if init_tickers is not None:
+            self._open_ticker_prices(init_tickers)
             for ticker in init_tickers:
                 self.subscribe_ticker(ticker)
-        self.start_date = start_date
-        self.end_date = end_date
         self.bar_stream = self._merge_sort_ticker_data()
         self.calc_returns = calc_returns
         if self.calc_returns:
             self.close_returns = []
 
-    def _open_ticker_price(self, ticker):
+    def _open_ticker_prices(self, tickers):
+        """
+        Loads the candles of the tickers from the database with
+        a single query, storing them as pandas DataFrames in a
+        dictionary. Tickers without candles get an empty DataFrame,
+        so that they are not queried again on subscription.
         """
-        Opens the database containing the equities, 
-        converting them into a pandas DataFrame, stored in a dictionary.
-        """     
         try:
-            connection = psycopg2.connect(user = "postgres",
-                                        password = "r7v56cwF",
-                                        host = "127.0.0.1",
-                                        port = "5432",
-                                        database = "my_awesome_project")
-
-            query = '''
-            SELECT start_date, open_price, high_price, low_price, close_price, volume, symbol_symbols_id
-            FROM "trading_app_candles"
-            WHERE symbol_symbols_id = %(ticker)s
-            '''
-            params = {
-                "ticker":ticker
-            }
-
-            self.tickers_data[ticker] = pd.read_sql_query(query,con=connection, index_col=['start_date'], params=params, parse_dates=True)
-            self.tickers_data[ticker].index = pd.to_datetime(self.tickers_data[ticker].index)
-            self.tickers_data[ticker].index.name = "Date"
-            self.tickers_data[ticker].columns = [
-            "Open", "High", "Low",
-            "Close", "Volume", "Ticker"
-            ]
-
-        except (Exception, psycopg2.Error) as error :
-            print ("Error while connecting to PostgreSQL", error)
-        finally:
-            #closing database connection.
-            if(connection):
-                connection.close()
+            data = self.loader.load(tickers, self.start_date, self.end_date)
+        except Exception as error:
+            print("Error while loading prices from the database", error)
+            return
+        for ticker in tickers:
+            self.tickers_data[ticker] = data.get(
+                ticker, pd.DataFrame(columns=BAR_COLUMNS)
+            )
 
     def _merge_sort_ticker_data(self):
         """
-        Concatenates all of the separate equities DataFrames
-        into a single DataFrame that is time ordered, allowing tick
-        data events to be added to the queue in a chronological fashion.
+        Merges all of the separate equities DataFrames into a
+        single stream that is time ordered, allowing tick data
+        events to be added to the queue in a chronological fashion.
+        Bars with the same timestamp are streamed in ticker order.
+
+        The rows of each ticker are merged lazily with a k-way
+        merge, rather than concatenating and sorting every frame.
 
         Note that this is an idealised situation, utilised solely for
         backtesting. In live trading ticks may arrive "out of order".
         """
-        df = pd.concat(self.tickers_data.values()).sort_index()
-        start = None
-        end = None
-        if self.start_date is not None:
-            start = df.index.searchsorted(self.start_date)
-        if self.end_date is not None:
-            end = df.index.searchsorted(self.end_date)
-        # This is added so that the ticker events are
-        # always deterministic, otherwise unit test values
-        # will differ
-        df['colFromIndex'] = df.index
-        df = df.sort_values(by=["colFromIndex", "Ticker"])
-        if start is None and end is None:
-            return df.iterrows()
-        elif start is not None and end is None:
-            return df.ix[start:].iterrows()
-        elif start is None and end is not None:
-            return df.ix[:end].iterrows()
-        else:
-            return df.ix[start:end].iterrows()
+        return MergedTickerRowIterator(
+            self.tickers_data, self.start_date, self.end_date
+        )
 
     def subscribe_ticker(self, ticker):
         """
@@ -111,11 +88,12 @@ class QuestradeDatabaseBarPriceHandler(AbstractBarPriceHandler):
         """
         if ticker not in self.tickers:
             try:
-                self._open_ticker_price(ticker)
+                if ticker not in self.tickers_data:
+                    self._open_ticker_prices([ticker])
                 dft = self.tickers_data[ticker]
                 row0 = dft.iloc[0]
 
-                close = PriceParser.parse(row0["Close"])
+                close = PriceParser.parse_scalar(row0["Close"])
 
                 ticker_prices = {
                     "close": close,
@@ -123,7 +101,8 @@ class QuestradeDatabaseBarPriceHandler(AbstractBarPriceHandler):
                 }
                 self.tickers[ticker] = ticker_prices
 
-            except IndexError:
+            except (IndexError, KeyError):
+                self.tickers_data.pop(ticker, None)
                 print(
                     "Could not subscribe ticker %s "
                     "as no data found for pricing." % ticker
@@ -139,10 +118,10 @@ class QuestradeDatabaseBarPriceHandler(AbstractBarPriceHandler):
         Obtain all elements of the bar from a row of dataframe
         and return a BarEvent
         """
-        open_price = PriceParser.parse(row["Open"])
-        high_price = PriceParser.parse(row["High"])
-        low_price = PriceParser.parse(row["Low"])
-        close_price = PriceParser.parse(row["Close"])
+        open_price = PriceParser.parse_scalar(row["Open"])
+        high_price = PriceParser.parse_scalar(row["High"])
+        low_price = PriceParser.parse_scalar(row["Low"])
+        close_price = PriceParser.parse_scalar(row["Close"])
         volume = int(row["Volume"])
         bev = BarEvent(
             ticker, index, period, open_price,
@@ -173,6 +152,7 @@ class QuestradeDatabaseBarPriceHandler(AbstractBarPriceHandler):
             self.close_returns.append(self.tickers[ticker]["close_ret"])
         self.tickers[ticker]["close"] = event.close_price
         self.tickers[ticker]["timestamp"] = event.time
+        self._record_history(event)
 
     def stream_next(self):
         """
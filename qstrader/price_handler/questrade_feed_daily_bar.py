@@ -1,11 +1,13 @@
-import psycopg2
-import os
-import pandas as pd
+import threading
 from datetime import date
+
+import pandas as pd
 from qtrade import Questrade
 
 from ..price_parser import PriceParser
 from .base import AbstractBarPriceHandler
+from .fetcher import ConcurrentFetcher
+from .iterator.merge import MergedTickerRowIterator
 from ..event import BarEvent
 
 
@@ -20,39 +22,78 @@ class QuestradeBarPriceHandler(AbstractBarPriceHandler):
         self, events_queue,
         init_tickers=None,
         start_date=None, end_date=None,
-        calc_returns=False
+        calc_returns=False, fetcher=None,
+        token_yaml="../access_token.yml", candle_store=None
     ):
         """
         Takes the Questrade API, the events queue and a possible
         list of initial ticker symbols then creates an (optional)
         list of ticker subscriptions and associated prices.
+
+        The candles are retrieved by the ConcurrentFetcher fetcher,
+        which defaults to fetching from a single Questrade client
+        (authorised by token_yaml) with up to eight concurrent
+        requests. The initial tickers are fetched concurrently.
+
+        candle_store is an optional CandleStore, in which the default
+        fetcher keeps the downloaded candles, so that later runs only
+        download the candles which are not yet stored.
         """
         self.events_queue = events_queue
         self.continue_backtest = True
         self.tickers = {}
         self.tickers_data = {}
+        self.start_date = start_date
+        self.end_date = end_date
+        self.token_yaml = token_yaml
+        self._provider = None
+        self._provider_lock = threading.Lock()
+        if fetcher is None:
+            fetch = self._fetch_history
+            if candle_store is not None:
+                fetch = candle_store.cached(fetch)
+            fetcher = ConcurrentFetcher(fetch)
+        self.fetcher = fetcher
         if init_tickers is not None:
+            self._open_ticker_prices(init_tickers)
             for ticker in init_tickers:
                 self.subscribe_ticker(ticker)
-        self.start_date = start_date
-        self.end_date = end_date
         self.bar_stream = self._merge_sort_ticker_data()
         self.calc_returns = calc_returns
         if self.calc_returns:
             self.close_returns = []
 
-    def _open_ticker_price(self, ticker):
+    def _history_dates(self):
+        """
+        Returns the first and last dates of the candles requested
+        from the API, covering the date range of the backtest or
+        else all of the history up to today.
         """
-        Call the API and retrieve the containing the equities ticks, 
-        converting them into a pandas DataFrame, stored in a dictionary.
-        """     
-        provider = Questrade(token_yaml="../access_token.yml")
-        # retrieve all the history
         initial_date = "1950-01-01"
         end_date = date.today().strftime("%Y-%m-%d")
-        data = provider.get_symbol_historical_data(ticker, initial_date, end_date, "OneDay")
+        if self.start_date is not None:
+            initial_date = pd.Timestamp(self.start_date).strftime("%Y-%m-%d")
+        if self.end_date is not None:
+            end_date = pd.Timestamp(self.end_date).strftime("%Y-%m-%d")
+        return initial_date, end_date
+
+    def _fetch_history(self, ticker, initial_date, end_date):
+        """
+        Call the API and retrieve the daily candles of a ticker,
+        sharing a single Questrade client between every request.
+        """
+        with self._provider_lock:
+            if self._provider is None:
+                self._provider = Questrade(token_yaml=self.token_yaml)
+        return self._provider.get_symbol_historical_data(
+            ticker, initial_date, end_date, "OneDay"
+        )
 
-        #print(self.start_date is None)
+    def _history_frame(self, ticker, data):
+        """
+        Converts the candles retrieved from the API into a
+        pandas DataFrame, indexed by date.
+        """
         # column names
         columns = [
             "Start","End","Low",
@@ -63,46 +104,44 @@ class QuestradeBarPriceHandler(AbstractBarPriceHandler):
             "Start", "Open", "High", "Low",
             "Close", "Volume"
         ]
-        
-        self.tickers_data[ticker] = pd.DataFrame(data)
-        print(self.tickers_data[ticker], ticker)
-        self.tickers_data[ticker].columns = columns
-        self.tickers_data[ticker]= self.tickers_data[ticker].drop(["End", "VWAP"], axis=1)
-        self.tickers_data[ticker] = self.tickers_data[ticker][new_columns]
-        self.tickers_data[ticker].Start = pd.to_datetime(self.tickers_data[ticker].Start, utc=True)
-        self.tickers_data[ticker] = self.tickers_data[ticker].set_index('Start')
-        self.tickers_data[ticker].index.name = "Date"
-        self.tickers_data[ticker]['Ticker'] = ticker
+        df = pd.DataFrame(data)
+        df.columns = columns
+        df = df.drop(["End", "VWAP"], axis=1)
+        df = df[new_columns]
+        df.Start = pd.to_datetime(df.Start, utc=True)
+        df = df.set_index('Start')
+        df.index.name = "Date"
+        df['Ticker'] = ticker
+        return df
+
+    def _open_ticker_prices(self, tickers):
+        """
+        Retrieves the candles of the tickers concurrently,
+        converting them into pandas DataFrames, stored in a
+        dictionary.
+        """
+        initial_date, end_date = self._history_dates()
+        history = self.fetcher.fetch_many(tickers, initial_date, end_date)
+        for ticker, data in history.items():
+            if len(data) > 0:
+                self.tickers_data[ticker] = self._history_frame(ticker, data)
 
     def _merge_sort_ticker_data(self):
         """
-        Concatenates all of the separate equities DataFrames
-        into a single DataFrame that is time ordered, allowing tick
-        data events to be added to the queue in a chronological fashion.
+        Merges all of the separate equities DataFrames into a
+        single stream that is time ordered, allowing tick data
+        events to be added to the queue in a chronological fashion.
+        Bars with the same timestamp are streamed in ticker order.
+
+        The rows of each ticker are merged lazily with a k-way
+        merge, rather than concatenating and sorting every frame.
 
         Note that this is an idealised situation, utilised solely for
         backtesting. In live trading ticks may arrive "out of order".
         """
-        df = pd.concat(self.tickers_data.values()).sort_index()
-        start = None
-        end = None
-        if self.start_date is not None:
-            start = df.index.searchsorted(self.start_date)
-        if self.end_date is not None:
-            end = df.index.searchsorted(self.end_date)
-        # This is added so that the ticker events are
-        # always deterministic, otherwise unit test values
-        # will differ
-        df['colFromIndex'] = df.index
-        df = df.sort_values(by=["colFromIndex", "Ticker"])
-        if start is None and end is None:
-            return df.iterrows()
-        elif start is not None and end is None:
-            return df.iloc[start:].iterrows()
-        elif start is None and end is not None:
-            return df.iloc[:end].iterrows()
-        else:
-            return df.iloc[start:end].iterrows()
+        return MergedTickerRowIterator(
+            self.tickers_data, self.start_date, self.end_date
+        )
 
     def subscribe_ticker(self, ticker):
         """
@@ -110,11 +149,12 @@ class QuestradeBarPriceHandler(AbstractBarPriceHandler):
         """
         if ticker not in self.tickers:
             try:
-                self._open_ticker_price(ticker)
+                if ticker not in self.tickers_data:
+                    self._open_ticker_prices([ticker])
                 dft = self.tickers_data[ticker]
                 row0 = dft.iloc[0]
 
-                close = PriceParser.parse(row0["Close"])
+                close = PriceParser.parse_scalar(row0["Close"])
 
                 ticker_prices = {
                     "close": close,
@@ -122,7 +162,7 @@ class QuestradeBarPriceHandler(AbstractBarPriceHandler):
                 }
                 self.tickers[ticker] = ticker_prices
 
-            except IndexError:
+            except (IndexError, KeyError):
                 print(
                     "Could not subscribe ticker %s "
                     "as no data found for pricing." % ticker
@@ -138,10 +178,10 @@ class QuestradeBarPriceHandler(AbstractBarPriceHandler):
         Obtain all elements of the bar from a row of dataframe
         and return a BarEvent
         """
-        open_price = PriceParser.parse(row["Open"])
-        high_price = PriceParser.parse(row["High"])
-        low_price = PriceParser.parse(row["Low"])
-        close_price = PriceParser.parse(row["Close"])
+        open_price = PriceParser.parse_scalar(row["Open"])
+        high_price = PriceParser.parse_scalar(row["High"])
+        low_price = PriceParser.parse_scalar(row["Low"])
+        close_price = PriceParser.parse_scalar(row["Close"])
         volume = int(row["Volume"])
         bev = BarEvent(
             ticker, index, period, open_price,
@@ -172,6 +212,7 @@ class QuestradeBarPriceHandler(AbstractBarPriceHandler):
             self.close_returns.append(self.tickers[ticker]["close_ret"])
         self.tickers[ticker]["close"] = event.close_price
         self.tickers[ticker]["timestamp"] = event.time
+        self._record_history(event)
 
     def stream_next(self):
         """
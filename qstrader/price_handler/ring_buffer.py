@@ -0,0 +1,115 @@
+import threading
+import time
+from collections import deque
+
+
+class TickRingBuffer(object):
+    """
+    TickRingBuffer hands price events from the thread of a live
+    price stream (the producer) to the trading loop (the consumer)
+    without either of them taking a lock.
+
+    Every ticker has its own bounded deque, whose append and
+    popleft are atomic in CPython. When the buffer of a ticker is
+    full its oldest update is discarded, conflating the pending
+    updates of the ticker towards the latest quote, rather than
+    losing the latest quotes of every other ticker.
+
+    The buffer counts the updates received, delivered and
+    conflated, and measures the latency of each update between
+    being put by the producer and taken by the consumer. The
+    conflation count assumes a single producer, and may overcount
+    if the consumer takes an update while it is being conflated.
+
+    The consumer may block in wait() until an update is put,
+    rather than polling the buffer.
+    """
+    def __init__(self, maxlen=1024, clock=time.monotonic):
+        """
+        Parameters:
+        maxlen - The maximum number of pending updates per ticker
+        clock - The monotonic clock used to measure the latency
+        """
+        self.maxlen = maxlen
+        self.clock = clock
+        self.buffers = {}
+        self.received = 0
+        self.delivered = 0
+        self.conflated = 0
+        self.total_latency = 0.0
+        self.max_latency = 0.0
+        self.last_put_time = None
+        self.ready = threading.Event()
+
+    def put(self, ticker, event):
+        """
+        Adds the update of the ticker, called from the producer.
+        """
+        buffer = self.buffers.get(ticker)
+        if buffer is None:
+            buffer = self.buffers.setdefault(ticker, deque(maxlen=self.maxlen))
+        if len(buffer) == self.maxlen:
+            self.conflated += 1
+        buffer.append((self.clock(), event))
+        self.received += 1
+        self.ready.set()
+
+    def get(self):
+        """
+        Returns the pending update which was put first, over every
+        ticker, or None if there are no pending updates. Called
+        from the consumer.
+        """
+        first = None
+        for buffer in list(self.buffers.values()):
+            try:
+                head = buffer[0]
+            except IndexError:
+                continue
+            if first is None or head[0] < first[1][0]:
+                first = (buffer, head)
+        if first is None:
+            return None
+        # The head may have been conflated since it was looked at,
+        # so the update actually taken is the one delivered
+        put_time, event = first[0].popleft()
+        self.last_put_time = put_time
+        latency = self.clock() - put_time
+        self.delivered += 1
+        self.total_latency += latency
+        if latency > self.max_latency:
+            self.max_latency = latency
+        return event
+
+    def wait(self, timeout=None):
+        """
+        Blocks until there is a pending update, or for at most
+        timeout seconds, returning whether there is one.
+        Called from the consumer.
+        """
+        if len(self):
+            return True
+        self.ready.clear()
+        # An update put before the clear must not be missed
+        if len(self):
+            return True
+        return self.ready.wait(timeout)
+
+    def __len__(self):
+        return sum(len(buffer) for buffer in list(self.buffers.values()))
+
+    def stats(self):
+        """
+        Returns the counters and the mean and maximum latency
+        (in seconds) of the delivered updates.
+        """
+        return {
+            "received": self.received,
+            "delivered": self.delivered,
+            "conflated": self.conflated,
+            "pending": len(self),
+            "mean_latency": (
+                self.total_latency / self.delivered if self.delivered else 0.0
+            ),
+            "max_latency": self.max_latency,
+        }
@@ -0,0 +1,169 @@
+import os
+import threading
+
+import pandas as pd
+
+from .. import settings
+
+
+BAR_COLUMNS = ["Open", "High", "Low", "Close", "Volume", "Ticker"]
+
+
+class ConnectionPool(object):
+    """
+    ConnectionPool keeps up to maxconn idle DB-API connections,
+    created on demand by the connect callable, so that loading
+    the prices of many tickers (or price handlers) does not pay
+    for a new connection each time.
+    """
+    def __init__(self, connect, maxconn=4):
+        self.connect = connect
+        self.maxconn = maxconn
+        self._idle = []
+        self._lock = threading.Lock()
+
+    def getconn(self):
+        with self._lock:
+            if self._idle:
+                return self._idle.pop()
+        return self.connect()
+
+    def putconn(self, connection):
+        with self._lock:
+            if len(self._idle) < self.maxconn:
+                self._idle.append(connection)
+                return
+        connection.close()
+
+    def closeall(self):
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for connection in idle:
+            connection.close()
+
+
+# The Postgres connection pools, keyed by database and user
+_postgres_pools = {}
+_postgres_pools_lock = threading.Lock()
+
+
+def postgres_pool(config=None, maxconn=4):
+    """
+    Returns the shared ConnectionPool of the Postgres database of
+    the settings (DB_HOST, DB_PORT, DB_NAME, DB_USER), taking any
+    missing setting from settings.DEFAULT. The password is read
+    from the QSTRADER_DB_PASSWORD environment variable whenever a
+    connection is made, so it is never kept in the settings.
+
+    psycopg2 is only imported once a connection is needed.
+    """
+    db = {
+        key: settings.DEFAULT[key]
+        for key in ("DB_HOST", "DB_PORT", "DB_NAME", "DB_USER")
+    }
+    if config is not None:
+        db.update((key, config[key]) for key in db if key in config)
+    key = (db["DB_HOST"], str(db["DB_PORT"]), db["DB_NAME"], db["DB_USER"])
+    with _postgres_pools_lock:
+        if key not in _postgres_pools:
+            def connect():
+                import psycopg2
+                return psycopg2.connect(
+                    host=db["DB_HOST"], port=str(db["DB_PORT"]),
+                    dbname=db["DB_NAME"], user=db["DB_USER"],
+                    password=os.environ.get("QSTRADER_DB_PASSWORD")
+                )
+            _postgres_pools[key] = ConnectionPool(connect, maxconn)
+        return _postgres_pools[key]
+
+
+class SqlBarLoader(object):
+    """
+    SqlBarLoader reads the daily candles of many tickers from
+    the candles table of the Questrade database with a single
+    query, using a pooled connection. The date range is applied
+    by the database, rather than after loading every candle.
+
+    The loader only relies upon the DB-API, so that it can be
+    tested against SQLite, whose placeholder is "?" rather than
+    the "%s" of psycopg2.
+    """
+    QUERY = (
+        'SELECT start_date, open_price, high_price, low_price, '
+        'close_price, volume, symbol_symbols_id '
+        'FROM "trading_app_candles" '
+        'WHERE symbol_symbols_id IN (%(tickers)s)%(dates)s '
+        'ORDER BY symbol_symbols_id, start_date'
+    )
+
+    def __init__(self, pool, placeholder="%s", arraysize=10000):
+        """
+        Parameters:
+        pool - A pool of connections, with getconn() and putconn()
+        placeholder - The parameter placeholder of the DB-API driver
+        arraysize - The number of rows fetched from the cursor at a time
+        """
+        self.pool = pool
+        self.placeholder = placeholder
+        self.arraysize = arraysize
+
+    @classmethod
+    def from_config(cls, config=None):
+        """
+        Creates a loader of the Postgres database of the settings.
+        """
+        return cls(postgres_pool(config))
+
+    def _query(self, tickers, start_date, end_date):
+        params = list(tickers)
+        dates = ""
+        if start_date is not None:
+            dates += " AND start_date >= %s" % self.placeholder
+            params.append(pd.Timestamp(start_date).to_pydatetime())
+        if end_date is not None:
+            dates += " AND start_date < %s" % self.placeholder
+            params.append(pd.Timestamp(end_date).to_pydatetime())
+        query = self.QUERY % {
+            "tickers": ", ".join([self.placeholder] * len(tickers)),
+            "dates": dates
+        }
+        return query, params
+
+    def load(self, tickers, start_date=None, end_date=None):
+        """
+        Returns a dictionary of DataFrames of the candles of each
+        ticker within the date range (start_date <= date < end_date),
+        indexed by date and with the columns of BAR_COLUMNS.
+        Tickers without any candles are left out.
+        """
+        tickers = list(tickers)
+        if not tickers:
+            return {}
+        query, params = self._query(tickers, start_date, end_date)
+        connection = self.pool.getconn()
+        try:
+            cursor = connection.cursor()
+            try:
+                cursor.execute(query, params)
+                rows = []
+                while True:
+                    batch = cursor.fetchmany(self.arraysize)
+                    if not batch:
+                        break
+                    rows.extend(batch)
+            finally:
+                cursor.close()
+        finally:
+            # End the read transaction before the connection is reused
+            try:
+                connection.rollback()
+            finally:
+                self.pool.putconn(connection)
+        df = pd.DataFrame.from_records(
+            rows, columns=["Date"] + BAR_COLUMNS
+        )
+        df.index = pd.DatetimeIndex(pd.to_datetime(df.pop("Date")), name="Date")
+        return {
+            ticker: ticker_df
+            for ticker, ticker_df in df.groupby("Ticker", sort=False)
+        }
@@ -0,0 +1,142 @@
+import glob
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from ..price_parser import PriceParser
+
+
+# Fixed-width record of a single tick
+TICK_DTYPE = np.dtype([
+    ("time", "<i8"),       # Nanoseconds since the epoch (UTC)
+    ("bid", "<i8"),        # PriceParser integer price
+    ("ask", "<i8"),        # PriceParser integer price
+    ("ticker_id", "<i8"),  # Index of the ticker in the store
+])
+
+# Time format of the CSV files of generate_simulated_prices
+SIMULATED_TIME_FORMAT = "%d.%m.%Y %H:%M:%S.%f"
+
+
+class TickStore(object):
+    """
+    TickStore holds the ticks of each ticker as a binary file
+    of fixed-width TICK_DTYPE records, in time order, which can
+    be memory-mapped and streamed without loading it into memory.
+
+    The store is written once from the tick CSV files (of
+    "Ticker,Time,Bid,Ask" rows, as created by
+    generate_simulated_prices), reading them in chunks so that
+    memory use does not depend upon the length of the history.
+    """
+    def __init__(self, store_dir):
+        self.store_dir = store_dir
+        if not os.path.isdir(store_dir):
+            os.makedirs(store_dir)
+        self.meta_path = os.path.join(store_dir, "meta.json")
+        if os.path.exists(self.meta_path):
+            with open(self.meta_path) as meta_file:
+                self.meta = json.load(meta_file)
+        else:
+            self.meta = {"tickers": [], "counts": {}}
+
+    def _save_meta(self):
+        with open(self.meta_path + ".tmp", "w") as meta_file:
+            json.dump(self.meta, meta_file)
+        os.replace(self.meta_path + ".tmp", self.meta_path)
+
+    def _ticker_path(self, ticker):
+        return os.path.join(self.store_dir, "%s.ticks" % ticker)
+
+    @property
+    def tickers(self):
+        return list(self.meta["tickers"])
+
+    def ticker_id(self, ticker):
+        return self.meta["tickers"].index(ticker)
+
+    def __contains__(self, ticker):
+        return ticker in self.meta["counts"]
+
+    def write_csv(
+        self, ticker, csv_paths,
+        time_format=SIMULATED_TIME_FORMAT, chunksize=100000
+    ):
+        """
+        Writes (or overwrites) the ticks of a ticker from its
+        time-ordered CSV files, reading chunksize rows at a time.
+        The existing ticks are only replaced once every CSV file
+        has been written successfully.
+
+        Parameters:
+        ticker - The ticker symbol, e.g. 'GOOG'.
+        csv_paths - The CSV files of the ticker, in time order
+        time_format - The strptime format of the Time column, or
+            None to parse the times with dayfirst=True
+        chunksize - The number of CSV rows parsed at a time
+        """
+        if ticker not in self.meta["tickers"]:
+            self.meta["tickers"].append(ticker)
+        ticker_id = self.ticker_id(ticker)
+        count = 0
+        last_time = None
+        ticks_path = self._ticker_path(ticker)
+        with open(ticks_path + ".tmp", "wb") as ticks_file:
+            for csv_path in csv_paths:
+                for chunk in pd.read_csv(
+                    csv_path, header=0, chunksize=chunksize,
+                    names=("Ticker", "Time", "Bid", "Ask")
+                ):
+                    if len(chunk) == 0:
+                        continue
+                    if time_format is not None:
+                        times = pd.to_datetime(chunk["Time"], format=time_format)
+                    else:
+                        times = pd.to_datetime(chunk["Time"], dayfirst=True)
+                    records = np.empty(len(chunk), dtype=TICK_DTYPE)
+                    records["time"] = times.values.astype("datetime64[ns]").view(np.int64)
+                    records["bid"] = PriceParser.parse_array(chunk["Bid"].values)
+                    records["ask"] = PriceParser.parse_array(chunk["Ask"].values)
+                    records["ticker_id"] = ticker_id
+                    if np.any(np.diff(records["time"]) < 0) or (
+                        last_time is not None and records["time"][0] < last_time
+                    ):
+                        raise ValueError(
+                            "Ticks of %s in %s are not in time order" % (
+                                ticker, csv_path
+                            )
+                        )
+                    last_time = records["time"][-1]
+                    records.tofile(ticks_file)
+                    count += len(records)
+        os.replace(ticks_path + ".tmp", ticks_path)
+        self.meta["counts"][ticker] = count
+        self._save_meta()
+
+    def write_csv_dir(self, csv_dir, tickers, **kwargs):
+        """
+        Writes the ticks of each ticker from either the file
+        TICKER.csv, or the daily files TICKER_YYYYMMDD.csv, of
+        the CSV data directory.
+        """
+        for ticker in tickers:
+            csv_paths = sorted(
+                glob.glob(os.path.join(csv_dir, "%s_*.csv" % ticker))
+            )
+            if not csv_paths:
+                csv_paths = [os.path.join(csv_dir, "%s.csv" % ticker)]
+            self.write_csv(ticker, csv_paths, **kwargs)
+
+    def open(self, ticker):
+        """
+        Returns the read-only memory-mapped ticks of a ticker.
+        """
+        count = self.meta["counts"][ticker]
+        if count == 0:
+            return np.empty(0, dtype=TICK_DTYPE)
+        return np.memmap(
+            self._ticker_path(ticker), dtype=TICK_DTYPE,
+            mode="r", shape=(count,)
+        )
@@ -1,9 +1,17 @@
+import functools
 import os
 
 import pandas as pd
 
 from ..price_parser import PriceParser
 from .base import AbstractBarPriceHandler
+from .csv_index import CsvDateIndex, read_csv_range
+from .iterator.columnar import (
+    ColumnarBarEventIterator, ColumnarBarBatchIterator
+)
+from .iterator.merge import (
+    MergedTickerRowIterator, DynamicTickerRowIterator
+)
 from ..event import BarEvent
 
 
@@ -18,87 +26,296 @@ class YahooDailyCsvBarPriceHandler(AbstractBarPriceHandler):
         self, csv_dir, events_queue,
         init_tickers=None,
         start_date=None, end_date=None,
-        calc_adj_returns=False
+        calc_adj_returns=False, columnar=False,
+        recycle_events=False, batch_bars=False,
+        preloaded_data=None, price_cache=None,
+        lazy=False, chunksize=10000, index_dir=None
     ):
         """
         Takes the CSV directory, the events queue and a possible
         list of initial ticker symbols then creates an (optional)
         list of ticker subscriptions and associated prices.
+
+        If columnar is True the merged bars are converted once
+        into integer NumPy arrays and streamed by position,
+        rather than row-by-row via DataFrame.iterrows(). In
+        columnar mode recycle_events re-uses a single BarEvent
+        object for every bar (see ColumnarBarEventIterator).
+
+        If batch_bars is True the bars of all tickers sharing a
+        timestamp are streamed together as a single BarBatchEvent
+        (see ColumnarBarBatchIterator).
+
+        preloaded_data is an optional dictionary of DataFrames,
+        keyed by ticker and as returned by read_ticker_csv, which
+        are used (read-only) instead of re-reading the CSV files.
+        This allows many price handlers to share the same data.
+
+        price_cache is an optional CsvPriceCache used to read the
+        CSV files, in which case the prices of tickers_data are
+        held as PriceParser integers.
+
+        If lazy is True no data is read until it is streamed and
+        tickers may be subscribed and unsubscribed while the
+        backtest is running. The CSV file of each ticker is read
+        chunksize rows at a time, in (ascending) date order, and
+        is closed when the ticker is unsubscribed. A ticker
+        subscribed during the backtest streams from the bar after
+        the current timestamp, and its prices are not available
+        until its first bar has been streamed.
+
+        index_dir is an optional directory of the CsvDateIndex
+        files used to read date ranges without a price_cache,
+        by default the directory of the price_cache, if any,
+        otherwise a directory of the system temporary directory.
         """
+        if lazy and (columnar or batch_bars):
+            raise ValueError(
+                "lazy loading streams rows, so cannot be combined "
+                "with columnar or batch_bars"
+            )
         self.csv_dir = csv_dir
+        self.columnar = columnar
+        self.recycle_events = recycle_events
+        self.batch_bars = batch_bars
+        self.preloaded_data = preloaded_data
+        self.price_cache = price_cache
+        if index_dir is None and price_cache is not None:
+            index_dir = price_cache.cache_dir
+        self.index_dir = index_dir
+        self.lazy = lazy
+        self.chunksize = chunksize
         self.events_queue = events_queue
         self.continue_backtest = True
         self.tickers = {}
         self.tickers_data = {}
+        self.start_date = start_date
+        self.end_date = end_date
+        self.bar_stream = None
         if init_tickers is not None:
             for ticker in init_tickers:
                 self.subscribe_ticker(ticker)
-        self.start_date = start_date
-        self.end_date = end_date
         self.bar_stream = self._merge_sort_ticker_data()
         self.calc_adj_returns = calc_adj_returns
         if self.calc_adj_returns:
             self.adj_close_returns = []
 
+    READ_CSV_KWARGS = dict(
+        header=0, parse_dates=True,
+        index_col=0, names=(
+            "Date", "Open", "High", "Low",
+            "Close", "Adj Close", "Volume"
+        )
+    )
+
+    @staticmethod
+    def read_ticker_csv(
+        csv_dir, ticker, price_cache=None, start_date=None, end_date=None,
+        index_dir=None
+    ):
+        """
+        Reads the CSV file of a ticker from the CSV data
+        directory into a pandas DataFrame, with an additional
+        "Ticker" column, optionally via a CsvPriceCache.
+
+        Without a cache, only the rows covering the date range
+        (if any) are read, via the CsvDateIndex of the file. These
+        may include a few rows either side of the date range. The
+        index is saved to index_dir, if given.
+        """
+        ticker_path = os.path.join(csv_dir, "%s.csv" % ticker)
+        read_csv_kwargs = YahooDailyCsvBarPriceHandler.READ_CSV_KWARGS
+        if price_cache is not None:
+            df = price_cache.read_csv(
+                ticker_path,
+                ("Open", "High", "Low", "Close", "Adj Close"),
+                **read_csv_kwargs
+            )
+        else:
+            df = read_csv_range(
+                ticker_path, start_date, end_date, index_dir,
+                **read_csv_kwargs
+            )
+        df["Ticker"] = ticker
+        return df
+
+    @staticmethod
+    def read_ticker_csv_chunks(
+        csv_dir, ticker, chunksize, start_date=None, end_date=None,
+        index_dir=None
+    ):
+        """
+        Reads the CSV file of a ticker from the CSV data
+        directory chunksize rows at a time, yielding a DataFrame
+        per chunk with an additional "Ticker" column. The file
+        is closed once the generator is exhausted or closed.
+
+        Reading starts (and stops) close to the date range, if
+        any, via the CsvDateIndex of the file, saved to index_dir
+        if given.
+        """
+        ticker_path = os.path.join(csv_dir, "%s.csv" % ticker)
+        read_csv_kwargs = YahooDailyCsvBarPriceHandler.READ_CSV_KWARGS
+        reader = None
+        if start_date is not None or end_date is not None:
+            reader = CsvDateIndex(ticker_path, index_dir=index_dir).read_csv(
+                start_date, end_date, chunksize=chunksize, **read_csv_kwargs
+            )
+        if reader is None:
+            reader = pd.io.parsers.read_csv(
+                ticker_path, chunksize=chunksize, **read_csv_kwargs
+            )
+        try:
+            for chunk in reader:
+                chunk["Ticker"] = ticker
+                yield chunk
+        finally:
+            reader.close()
+
     def _open_ticker_price_csv(self, ticker):
         """
         Opens the CSV files containing the equities ticks from
         the specified CSV data directory, converting them into
         them into a pandas DataFrame, stored in a dictionary.
         """
-        ticker_path = os.path.join(self.csv_dir, "%s.csv" % ticker)
-        self.tickers_data[ticker] = pd.io.parsers.read_csv(
-            ticker_path, header=0, parse_dates=True,
-            index_col=0, names=(
-                "Date", "Open", "High", "Low",
-                "Close", "Adj Close", "Volume"
-            )
+        if self.preloaded_data is not None and ticker in self.preloaded_data:
+            self.tickers_data[ticker] = self.preloaded_data[ticker]
+            return
+        self.tickers_data[ticker] = self.read_ticker_csv(
+            self.csv_dir, ticker, self.price_cache,
+            self.start_date, self.end_date, self.index_dir
         )
-        self.tickers_data[ticker]["Ticker"] = ticker
         print(self.tickers_data[ticker])
 
     def _merge_sort_ticker_data(self):
         """
-        Concatenates all of the separate equities DataFrames
-        into a single DataFrame that is time ordered, allowing tick
-        data events to be added to the queue in a chronological fashion.
+        Merges all of the separate equities DataFrames into a
+        single stream that is time ordered, allowing tick data
+        events to be added to the queue in a chronological fashion.
+        Bars with the same timestamp are always streamed in ticker
+        order, so that the ticker events are deterministic.
+
+        The rows of each ticker are merged lazily with a k-way
+        merge. The columnar iterators need a single frame, which
+        is concatenated in ticker order and then stably sorted once
+        by timestamp.
+
+        In lazy mode the rows of each ticker are only read as they
+        are merged, and tickers can be added and removed later on.
 
         Note that this is an idealised situation, utilised solely for
         backtesting. In live trading ticks may arrive "out of order".
         """
-        df = pd.concat(self.tickers_data.values()).sort_index()
+        if self.lazy:
+            bar_stream = DynamicTickerRowIterator()
+            for ticker in self.tickers:
+                bar_stream.add_ticker(ticker, self._lazy_source(ticker))
+            return bar_stream
+        if not (self.batch_bars or self.columnar):
+            return MergedTickerRowIterator(
+                self.tickers_data, self.start_date, self.end_date
+            )
+        df = pd.concat([
+            self.tickers_data[ticker] for ticker in sorted(self.tickers_data)
+        ])
+        df = df.iloc[df.index.argsort(kind="stable")]
         start = None
         end = None
         if self.start_date is not None:
             start = df.index.searchsorted(self.start_date)
         if self.end_date is not None:
             end = df.index.searchsorted(self.end_date)
-        # This is added so that the ticker events are
-        # always deterministic, otherwise unit test values
-        # will differ
-        df['colFromIndex'] = df.index
-        df = df.sort_values(by=["colFromIndex", "Ticker"])
-        if start is None and end is None:
-            return df.iterrows()
-        elif start is not None and end is None:
-            return df.ix[start:].iterrows()
-        elif start is None and end is not None:
-            return df.ix[:end].iterrows()
+        df = df.iloc[start:end]
+        if self.batch_bars:
+            return ColumnarBarBatchIterator(df, 86400)
+        return ColumnarBarEventIterator(
+            df, 86400, recycle=self.recycle_events
+        )
+
+    def _lazy_source(self, ticker):
+        return functools.partial(self._lazy_ticker_rows, ticker)
+
+    def _lazy_ticker_rows(self, ticker, after=None):
+        """
+        Yields the (index, row) pairs of a ticker within the date
+        range, and after the given timestamp, reading its CSV file
+        a chunk at a time.
+        """
+        if self.preloaded_data is not None and ticker in self.preloaded_data:
+            chunks = [self.preloaded_data[ticker]]
+        elif self.price_cache is not None:
+            chunks = [
+                self.read_ticker_csv(self.csv_dir, ticker, self.price_cache)
+            ]
         else:
-            return df.ix[start:end].iterrows()
+            start_date = self.start_date
+            if after is not None and (start_date is None or after > start_date):
+                start_date = after
+            chunks = self.read_ticker_csv_chunks(
+                self.csv_dir, ticker, self.chunksize,
+                start_date, self.end_date, self.index_dir
+            )
+        last_index = None
+        for chunk in chunks:
+            if len(chunk) == 0:
+                continue
+            if not chunk.index.is_monotonic_increasing or (
+                last_index is not None and chunk.index[0] < last_index
+            ):
+                raise ValueError(
+                    "Bars of %s are not in date order" % ticker
+                )
+            last_index = chunk.index[-1]
+            start = 0
+            end = len(chunk)
+            if self.start_date is not None:
+                start = chunk.index.searchsorted(self.start_date)
+            if after is not None:
+                start = max(start, chunk.index.searchsorted(after, "right"))
+            if self.end_date is not None:
+                end = chunk.index.searchsorted(self.end_date)
+            for index, row in chunk.iloc[start:end].iterrows():
+                yield index, row
+            if end < len(chunk):
+                break
+
+    def _subscribe_lazy_ticker(self, ticker):
+        """
+        Subscribes a ticker without reading any of its data,
+        adding it to the bar stream if this is already running.
+        """
+        if (
+            self.preloaded_data is None or ticker not in self.preloaded_data
+        ) and not os.path.exists(
+            os.path.join(self.csv_dir, "%s.csv" % ticker)
+        ):
+            print(
+                "Could not subscribe ticker %s "
+                "as no data CSV found for pricing." % ticker
+            )
+            return
+        self.tickers[ticker] = {
+            "close": None,
+            "adj_close": None,
+            "timestamp": None
+        }
+        if self.bar_stream is not None:
+            self.bar_stream.add_ticker(ticker, self._lazy_source(ticker))
 
     def subscribe_ticker(self, ticker):
         """
         Subscribes the price handler to a new ticker symbol.
         """
-        if ticker not in self.tickers:
+        if ticker not in self.tickers and self.lazy:
+            self._subscribe_lazy_ticker(ticker)
+        elif ticker not in self.tickers:
             try:
                 self._open_ticker_price_csv(ticker)
                 dft = self.tickers_data[ticker]
                 row0 = dft.iloc[0]
 
-                close = PriceParser.parse(row0["Close"])
-                adj_close = PriceParser.parse(row0["Adj Close"])
+                close = PriceParser.parse_scalar(row0["Close"])
+                adj_close = PriceParser.parse_scalar(row0["Adj Close"])
 
                 ticker_prices = {
                     "close": close,
@@ -117,16 +334,25 @@ class YahooDailyCsvBarPriceHandler(AbstractBarPriceHandler):
                 "as is already subscribed." % ticker
             )
 
+    def unsubscribe_ticker(self, ticker):
+        """
+        Unsubscribes the price handler from a current ticker
+        symbol, removing it from the bar stream in lazy mode.
+        """
+        if self.lazy and self.bar_stream is not None:
+            self.bar_stream.remove_ticker(ticker)
+        super(YahooDailyCsvBarPriceHandler, self).unsubscribe_ticker(ticker)
+
     def _create_event(self, index, period, ticker, row):
         """
         Obtain all elements of the bar from a row of dataframe
         and return a BarEvent
         """
-        open_price = PriceParser.parse(row["Open"])
-        high_price = PriceParser.parse(row["High"])
-        low_price = PriceParser.parse(row["Low"])
-        close_price = PriceParser.parse(row["Close"])
-        adj_close_price = PriceParser.parse(row["Adj Close"])
+        open_price = PriceParser.parse_scalar(row["Open"])
+        high_price = PriceParser.parse_scalar(row["High"])
+        low_price = PriceParser.parse_scalar(row["Low"])
+        close_price = PriceParser.parse_scalar(row["Close"])
+        adj_close_price = PriceParser.parse_scalar(row["Adj Close"])
         volume = int(row["Volume"])
         bev = BarEvent(
             ticker, index, period, open_price,
@@ -145,12 +371,16 @@ class YahooDailyCsvBarPriceHandler(AbstractBarPriceHandler):
         # percentage returns in a list
         # TODO: Make this faster
         if self.calc_adj_returns:
-            prev_adj_close = self.tickers[ticker][
-                "adj_close"
-            ] / float(PriceParser.PRICE_MULTIPLIER)
             cur_adj_close = event.adj_close_price / float(
                 PriceParser.PRICE_MULTIPLIER
             )
+            if self.tickers[ticker]["adj_close"] is None:
+                # The first bar of a lazily subscribed ticker
+                prev_adj_close = cur_adj_close
+            else:
+                prev_adj_close = self.tickers[ticker][
+                    "adj_close"
+                ] / float(PriceParser.PRICE_MULTIPLIER)
             self.tickers[ticker][
                 "adj_close_ret"
             ] = cur_adj_close / prev_adj_close - 1.0
@@ -158,21 +388,51 @@ class YahooDailyCsvBarPriceHandler(AbstractBarPriceHandler):
         self.tickers[ticker]["close"] = event.close_price
         self.tickers[ticker]["adj_close"] = event.adj_close_price
         self.tickers[ticker]["timestamp"] = event.time
+        self._record_history(event)
+
+    def _store_batch_event(self, event):
+        """
+        Store closing prices and adjusted closing prices
+        of every ticker in a BarBatchEvent
+        """
+        if self.calc_adj_returns:
+            for bev in event:
+                self._store_event(bev)
+        else:
+            super(YahooDailyCsvBarPriceHandler, self)._store_batch_event(event)
 
     def stream_next(self):
         """
-        Place the next BarEvent onto the event queue.
+        Place the next BarEvent (or BarBatchEvent) onto the
+        event queue.
         """
-        try:
-            index, row = next(self.bar_stream)
-        except StopIteration:
-            self.continue_backtest = False
+        if self.batch_bars:
+            try:
+                bev = next(self.bar_stream)
+            except StopIteration:
+                self.continue_backtest = False
+                return
+            self._store_batch_event(bev)
+            self.events_queue.put(bev)
             return
-        # Obtain all elements of the bar from the dataframe
-        ticker = row["Ticker"]
-        period = 86400  # Seconds in a day
-        # Create the tick event for the queue
-        bev = self._create_event(index, period, ticker, row)
+        if self.columnar:
+            # The columnar stream creates the BarEvent itself
+            try:
+                bev = next(self.bar_stream)
+            except StopIteration:
+                self.continue_backtest = False
+                return
+        else:
+            try:
+                index, row = next(self.bar_stream)
+            except StopIteration:
+                self.continue_backtest = False
+                return
+            # Obtain all elements of the bar from the dataframe
+            ticker = row["Ticker"]
+            period = 86400  # Seconds in a day
+            # Create the tick event for the queue
+            bev = self._create_event(index, period, ticker, row)
         # Store event
         self._store_event(bev)
         # Send event to queue
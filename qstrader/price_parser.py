@@ -1,13 +1,20 @@
 from __future__ import division
+import numbers
+
 from multipledispatch import dispatch
 from .compat import PY2
 import numpy as np
+import pandas as pd
 
 if PY2:
     int_t = (int, long, np.int64)
 else:
     int_t = (int, np.int64)
 
+# Every integer type, signed or unsigned, including all of the NumPy
+# integer types, as the "iu" dtype kinds of the array methods
+integral_t = (numbers.Integral, np.integer)
+
 
 class PriceParser(object):
     """
@@ -64,3 +71,80 @@ class PriceParser(object):
     @dispatch(float, int)
     def display(x, dp):  # flake8: noqa
         return round(x, dp)
+
+    """Array Methods. Convert whole columns at once, without per-value dispatch."""
+
+    @staticmethod
+    def parse_array(x):
+        """
+        Parses a NumPy array, pandas Series or sequence of prices
+        into an int64 array (or Series) of integer prices.
+
+        Integer input is passed through unchanged, as with parse(),
+        while floating point (or string) input is multiplied out
+        and truncated in the same manner as parse().
+        """
+        if isinstance(x, pd.Series):
+            return pd.Series(
+                PriceParser.parse_array(x.values),
+                index=x.index, name=x.name
+            )
+        values = np.asarray(x)
+        if values.dtype.kind == "O":
+            values = np.array(values.tolist())
+        if values.dtype.kind in "iu":
+            return values.astype(np.int64, copy=False)
+        values = values.astype(np.float64)
+        if np.isnan(values).any():
+            raise ValueError("cannot convert float NaN to integer")
+        return (values * PriceParser.PRICE_MULTIPLIER).astype(np.int64)
+
+    @staticmethod
+    def display_array(x, dp=2):
+        """
+        Displays a NumPy array, pandas Series or sequence of prices
+        as a float64 array (or Series) rounded to dp decimal places.
+
+        Integer input is divided by the PRICE_MULTIPLIER, whereas
+        floating point input is simply rounded, as with display().
+        Values lying exactly on a rounding boundary may differ in
+        the final decimal place from display(), which rounds the
+        shortest decimal representation of each value.
+        """
+        if isinstance(x, pd.Series):
+            return pd.Series(
+                PriceParser.display_array(x.values, dp),
+                index=x.index, name=x.name
+            )
+        values = np.asarray(x)
+        if values.dtype.kind == "O":
+            values = np.array(values.tolist())
+        if values.dtype.kind in "iu":
+            values = values / PriceParser.PRICE_MULTIPLIER
+        return np.round(values.astype(np.float64, copy=False), dp)
+
+    """Scalar Methods. Equivalent to parse/display, without dispatch overhead,
+    and so used for the prices of every event, order and fill."""
+
+    @staticmethod
+    def parse_scalar(x):
+        """
+        Parses a single price. Integers (of any integer type, as
+        parse_array) are passed through and floats (or strings)
+        are multiplied out.
+        """
+        if isinstance(x, integral_t):
+            return x
+        if isinstance(x, str):
+            x = float(x)
+        return int(x * PriceParser.PRICE_MULTIPLIER)
+
+    @staticmethod
+    def display_scalar(x, dp=2):
+        """
+        Displays a single price rounded to dp decimal places,
+        dividing integers (of any integer type) by the multiplier.
+        """
+        if isinstance(x, integral_t):
+            return round(x / PriceParser.PRICE_MULTIPLIER, dp)
+        return round(x, dp)
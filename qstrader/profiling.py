@@ -1,4 +1,7 @@
 import time
+from collections import deque
+
+import numpy as np
 
 
 def speed(ticks, t0):
@@ -9,3 +12,49 @@ def s_speed(time_event, ticks, t0):
     sp = speed(ticks, t0)
     s_typ = time_event.typename + "S"
     return "%d %s processed @ %f %s/s" % (ticks, s_typ, sp, s_typ)
+
+
+class LatencyStats(object):
+    """
+    LatencyStats accumulates latencies (in seconds), keeping the
+    most recent maxlen of them for the percentiles.
+    """
+    def __init__(self, name, maxlen=10000):
+        self.name = name
+        self.samples = deque(maxlen=maxlen)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def record(self, latency):
+        self.samples.append(latency)
+        self.count += 1
+        self.total += latency
+        if latency > self.max:
+            self.max = latency
+
+    def summary(self):
+        """
+        Returns the count, mean, median, 99th percentile
+        and maximum of the latencies.
+        """
+        if self.count == 0:
+            return {"count": 0, "mean": 0.0, "p50": 0.0, "p99": 0.0, "max": 0.0}
+        p50, p99 = np.percentile(np.array(self.samples), [50, 99])
+        return {
+            "count": self.count,
+            "mean": self.total / self.count,
+            "p50": float(p50),
+            "p99": float(p99),
+            "max": self.max,
+        }
+
+    def __str__(self):
+        summary = self.summary()
+        return (
+            "%s: %d, mean %0.3fms, p50 %0.3fms, p99 %0.3fms, max %0.3fms" % (
+                self.name, summary["count"], summary["mean"] * 1000.0,
+                summary["p50"] * 1000.0, summary["p99"] * 1000.0,
+                summary["max"] * 1000.0
+            )
+        )
@@ -28,7 +28,11 @@ def from_env(key, default_value=None, root=ENV_VAR_ROOT):
 
 DEFAULT = munchify({
     "CSV_DATA_DIR": from_env("CSV_DATA_DIR", "~/data"),
-    "OUTPUT_DIR": from_env("OUTPUT_DIR", "~/out")
+    "OUTPUT_DIR": from_env("OUTPUT_DIR", "~/out"),
+    "DB_HOST": from_env("DB_HOST", "127.0.0.1"),
+    "DB_PORT": from_env("DB_PORT", "5432"),
+    "DB_NAME": from_env("DB_NAME", "my_awesome_project"),
+    "DB_USER": from_env("DB_USER", "postgres")
 })
 
 
@@ -1,6 +1,9 @@
 from math import floor
 
+import numpy as np
+
 from .base import AbstractSignalSizer
+from qstrader.event import SignalEvent
 from qstrader.price_parser import PriceParser
 
 
@@ -35,7 +38,7 @@ class LiquidateRebalanceSignalSizer(AbstractSignalSizer):
             cur_quantity = portfolio.positions[ticker].quantity
             if cur_quantity > 0:
                 signal.action = "SLD"
-                signal.quantity = cur_quantity
+                signal.suggested_quantity = cur_quantity
             else:
                 signal.action = "BOT"
                 signal.suggested_quantity = cur_quantity
@@ -44,8 +47,8 @@ class LiquidateRebalanceSignalSizer(AbstractSignalSizer):
             # Determine total portfolio value, work out dollar weight
             # and finally determine integer quantity of shares to purchase
             price = portfolio.price_handler.tickers[ticker]["close"]
-            price = PriceParser.display(price)
-            equity = PriceParser.display(portfolio.equity)
+            price = PriceParser.display_scalar(price)
+            equity = PriceParser.display_scalar(portfolio.equity)
             dollar_weight = weight * equity
             weighted_quantity = int(floor(dollar_weight / price))
             signal.suggested_quantity = weighted_quantity
@@ -80,8 +83,8 @@ class RebalanceSignalSizer(AbstractSignalSizer):
         # Determine total portfolio value, work out dollar weight
         # and finally determine integer quantity of shares to purchase
         price = portfolio.price_handler.tickers[ticker]["close"]
-        price = PriceParser.display(price)
-        equity = PriceParser.display(portfolio.equity)
+        price = PriceParser.display_scalar(price)
+        equity = PriceParser.display_scalar(portfolio.equity)
         dollar_weight = weight * equity
         weighted_quantity = int(floor(dollar_weight / price))
 
@@ -98,3 +101,132 @@ class RebalanceSignalSizer(AbstractSignalSizer):
             signal.suggested_quantity = weighted_quantity
 
         return signal
+
+
+class PortfolioRebalanceSignalSizer(AbstractSignalSizer):
+    """
+    Rebalances the whole Portfolio to a vector of target weights
+    at once, rather than one ticker at a time.
+
+    The share deltas of every ticker are computed together against
+    a single snapshot of the Portfolio equity, so that the result
+    does not depend upon the order in which the tickers are sized,
+    nor upon fills landing mid-rebalance. Tickers held but without
+    a weight are liquidated.
+
+    The sells come first, and their proceeds fund the buys, which
+    are made in the order of the weights while the cash lasts, the
+    first which cannot be bought in full taking what remains.
+
+    The commission of the trades is only accounted for if given a
+    commission function of arrays of quantities and (integer)
+    prices, such as calculate_ib_commission_array.
+    """
+    def __init__(self, ticker_weights, commission=None):
+        """
+        Parameters:
+        ticker_weights - The dictionary of the target weight of
+            each ticker, as a fraction of the equity
+        commission - Optional function returning the commissions
+            of arrays of quantities and prices
+        """
+        self.ticker_weights = ticker_weights
+        self.commission = commission
+
+    def _commissions(self, quantities, prices):
+        if self.commission is None:
+            return np.zeros(len(quantities), dtype=np.int64)
+        return np.asarray(self.commission(quantities, prices), dtype=np.int64)
+
+    def _affordable(self, cash, price):
+        """
+        Returns the largest whole number of shares at the price
+        which may be bought with the cash, including commission.
+        """
+        quantity = max(int(cash // price), 0)
+        while quantity > 0 and (
+            quantity * price +
+            self._commissions(np.array([quantity]), np.array([price]))[0]
+        ) > cash:
+            quantity -= 1
+        return quantity
+
+    def size_portfolio(self, portfolio, tickers=None):
+        """
+        Returns the list of sized SignalEvents rebalancing the
+        Portfolio to the target weights, the sells ("SLD") first
+        and then the buys ("BOT"). Tickers without a trade are
+        omitted.
+
+        If tickers is given only those tickers are traded (e.g.
+        those with a current price), still to their weight of the
+        whole equity, and the positions of any others are left as
+        they are.
+        """
+        if tickers is None:
+            tickers = list(self.ticker_weights)
+            tickers += [
+                t for t in portfolio.positions if t not in self.ticker_weights
+            ]
+        else:
+            tickers = list(tickers)
+        if not tickers:
+            return []
+        weights = np.array([self.ticker_weights.get(t, 0.0) for t in tickers])
+        quotes = np.array(
+            [portfolio._get_bid_ask(t) for t in tickers], dtype=np.int64
+        )
+        bids, asks = quotes[:, 0], quotes[:, 1]
+        # The signed quantity held, negative for a short position
+        quantities = np.array([
+            portfolio.positions[t].net if t in portfolio.positions else 0
+            for t in tickers
+        ], dtype=np.int64)
+
+        # Every target is sized against the same equity snapshot
+        equity = PriceParser.display_scalar(portfolio.equity)
+        targets = np.floor(
+            weights * equity / PriceParser.display_array(asks)
+        ).astype(np.int64)
+        deltas = targets - quantities
+
+        sells = np.flatnonzero(deltas < 0)
+        cash = portfolio.cur_cash + int(
+            np.dot(-deltas[sells], bids[sells]) -
+            self._commissions(-deltas[sells], bids[sells]).sum()
+        )
+
+        buys = np.flatnonzero(deltas > 0)
+        cost = np.cumsum(
+            deltas[buys] * asks[buys] +
+            self._commissions(deltas[buys], asks[buys])
+        )
+        short = np.flatnonzero(cost > cash)
+        if len(short) > 0:
+            first = short[0]
+            remaining = cash - (cost[first - 1] if first > 0 else 0)
+            deltas[buys[first]] = self._affordable(remaining, asks[buys[first]])
+            deltas[buys[first + 1:]] = 0
+            buys = buys[deltas[buys] > 0]
+
+        signals = [
+            SignalEvent(tickers[i], "SLD", int(-deltas[i])) for i in sells
+        ]
+        signals += [
+            SignalEvent(tickers[i], "BOT", int(deltas[i])) for i in buys
+        ]
+        return signals
+
+    def size_signal(self, portfolio, signal):
+        """
+        Sizes the signal of a single ticker as its part of the
+        rebalance of the whole Portfolio, setting its action to
+        "SLD" or "BOT" (with a quantity of zero if there is no
+        trade to make).
+        """
+        signal.suggested_quantity = 0
+        for sized in self.size_portfolio(portfolio):
+            if sized.ticker == signal.ticker:
+                signal.action = sized.action
+                signal.suggested_quantity = sized.suggested_quantity
+        return signal
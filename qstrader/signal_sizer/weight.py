@@ -20,8 +20,8 @@ class WeightSignalSizer(AbstractSignalSizer):
             # Determine current cash available in the portfolio, work out dollar weight
             # and finally determine integer quantity of shares to purchase
             price = portfolio.price_handler.tickers[ticker]["close"]
-            price = PriceParser.display(price)
-            cur_cash = PriceParser.display(portfolio.cur_cash)
+            price = PriceParser.display_scalar(price)
+            cur_cash = PriceParser.display_scalar(portfolio.cur_cash)
             position_list = portfolio.positions
             for key, values in position_list.items():
                 weight[key] = 0
@@ -60,11 +60,11 @@ class WeightComplexSignalSizer(AbstractSignalSizer):
         weight = self.ticker_weights[ticker]
         # Determine total portfolio value, work out dollar weight
         # and finally determine integer quantity of shares to purchase
-        price = PriceParser.display(
+        price = PriceParser.display_scalar(
             portfolio.price_handler.tickers[ticker]["close"]
             )
-        equity = PriceParser.display(portfolio.equity)
-        cur_cash = PriceParser.display(portfolio.cur_cash)
+        equity = PriceParser.display_scalar(portfolio.equity)
+        cur_cash = PriceParser.display_scalar(portfolio.cur_cash)
         dollar_weight = weight * equity
         weighted_quantity = int(floor(dollar_weight / price))
         allowed_quantity = int(floor(cur_cash / price))
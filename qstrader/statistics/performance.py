@@ -1,5 +1,3 @@
-from itertools import groupby
-
 import numpy as np
 import pandas as pd
 from scipy.stats import linregress
@@ -10,7 +8,7 @@ def aggregate_returns(returns, convert_to):
     Aggregates returns by day, week, month, or year.
     """
     def cumulate_returns(x):
-        return np.exp(np.log(1 + x).cumsum())[-1] - 1
+        return np.exp(np.log(1 + x).cumsum()).iloc[-1] - 1
 
     if convert_to == 'weekly':
         return returns.groupby(
@@ -39,7 +37,7 @@ def create_cagr(equity, periods=252):
     periods - Daily (252), Hourly (252*6.5), Minutely(252*6.5*60) etc.
     """
     years = len(equity) / float(periods)
-    return (equity[-1] ** (1.0 / years)) - 1.0
+    return (equity.iloc[-1] ** (1.0 / years)) - 1.0
 
 
 def create_sharpe_ratio(returns, periods=252):
@@ -66,37 +64,92 @@ def create_sortino_ratio(returns, periods=252):
     return np.sqrt(periods) * (np.mean(returns)) / np.std(returns[returns < 0])
 
 
-def create_drawdowns(returns):
+def create_drawdowns(returns, episodes=False):
     """
     Calculate the largest peak-to-trough drawdown of the equity curve
     as well as the duration of the drawdown. Requires that the
     pnl_returns is a pandas Series.
 
+    The high water mark is the running maximum of the curve (from
+    its second value onwards, floored at zero) and the duration is
+    the length of the longest run of periods spent under it.
+
     Parameters:
     equity - A pandas Series representing period percentage returns.
+    episodes - Whether to also return a DataFrame with a row per
+        drawdown episode (see _drawdown_episodes).
 
     Returns:
-    drawdown, drawdown_max, duration
+    drawdown, drawdown_max, duration[, episodes]
     """
-    # Calculate the cumulative returns curve
-    # and set up the High Water Mark
     idx = returns.index
-    hwm = np.zeros(len(idx))
+    values = np.asarray(returns, dtype=np.float64)
 
-    # Create the high water mark
-    for t in range(1, len(idx)):
-        hwm[t] = max(hwm[t - 1], returns.iloc[t])
+    # Create the high water mark, skipping missing values
+    hwm = np.zeros(len(values))
+    if len(values) > 1:
+        hwm[1:] = np.fmax.accumulate(np.fmax(values[1:], 0.0))
 
     # Calculate the drawdown and duration statistics
-    perf = pd.DataFrame(index=idx)
-    perf["Drawdown"] = (hwm - returns) / hwm
-    perf["Drawdown"].iloc[0] = 0.0
-    perf["DurationCheck"] = np.where(perf["Drawdown"] == 0, 0, 1)
-    duration = max(
-        sum(1 for i in g if i == 1)
-        for k, g in groupby(perf["DurationCheck"])
-    )
-    return perf["Drawdown"], np.max(perf["Drawdown"]), duration
+    with np.errstate(divide="ignore", invalid="ignore"):
+        drawdown = (hwm - values) / hwm
+    if len(drawdown) > 0:
+        drawdown[0] = 0.0
+    drawdown = pd.Series(drawdown, index=idx, name="Drawdown")
+
+    # Run-length encode the underwater (non-zero drawdown) periods
+    underwater = np.concatenate(([False], drawdown.values != 0, [False]))
+    changes = np.diff(underwater.astype(np.int8))
+    starts = np.flatnonzero(changes == 1)
+    ends = np.flatnonzero(changes == -1)
+    duration = int((ends - starts).max()) if len(starts) > 0 else 0
+
+    if episodes:
+        return drawdown, drawdown.max(), duration, _drawdown_episodes(
+            drawdown, starts, ends
+        )
+    return drawdown, drawdown.max(), duration
+
+
+def _drawdown_episodes(drawdown, starts, ends):
+    """
+    Returns a DataFrame describing each drawdown episode, given the
+    positions at which each run of underwater periods starts and
+    ends (exclusive), with the columns:
+
+    start - The first period under the high water mark
+    trough - The period of the deepest drawdown of the episode
+    recovery - The first period back at the high water mark
+        (missing if the curve has not yet recovered)
+    drawdown - The deepest drawdown of the episode
+    duration - The number of periods spent under water
+    """
+    idx = drawdown.index
+    values = drawdown.values
+    lengths = ends - starts
+    if len(starts) == 0:
+        troughs = starts
+        depths = np.zeros(0)
+    else:
+        # Label each underwater period with its episode and sort by
+        # episode, then deepest drawdown, then earliest period
+        positions = np.flatnonzero(values != 0)
+        episode = np.repeat(np.arange(len(starts)), lengths)
+        depth = values[positions]
+        depth = np.where(np.isnan(depth), -np.inf, depth)
+        order = np.lexsort((positions, -depth, episode))
+        first = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+        troughs = positions[order][first]
+        depths = values[troughs]
+    recovered = ends < len(idx)
+    recovery = idx.take(np.minimum(ends, len(idx) - 1)).where(recovered)
+    return pd.DataFrame({
+        "start": idx.take(starts),
+        "trough": idx.take(troughs),
+        "recovery": recovery,
+        "drawdown": depths,
+        "duration": lengths,
+    }, columns=["start", "trough", "recovery", "drawdown", "duration"])
 
 
 def rsquared(x, y):
@@ -0,0 +1,114 @@
+import numpy as np
+import pandas as pd
+
+from ..price_parser import PriceParser
+
+
+class EquityRecorder(object):
+    """
+    EquityRecorder records a time series of integer (PriceParser)
+    values, such as the equity of a Portfolio, in preallocated
+    NumPy buffers which double in size when full.
+
+    Only one value is kept per distinct timestamp: recording a
+    value for the same timestamp as the previous one overwrites
+    it, so that updating once per ticker of a multi-ticker bar
+    still results in a single point per timestamp.
+
+    Timestamps are stored as int64 nanoseconds since the epoch
+    (in UTC for timezone-aware timestamps, whose timezone is
+    restored when the series is built).
+    """
+    def __init__(self, capacity=1024):
+        self.capacity = capacity
+        self.times = np.empty(capacity, dtype=np.int64)
+        self.values = np.empty(capacity, dtype=np.int64)
+        self.length = 0
+        self.tz = None
+        self._last_timestamp = None
+
+    def __len__(self):
+        return self.length
+
+    def _grow(self):
+        """
+        Doubles the capacity of the buffers.
+        """
+        self.capacity *= 2
+        times = np.empty(self.capacity, dtype=np.int64)
+        times[:self.length] = self.times[:self.length]
+        self.times = times
+        values = np.empty(self.capacity, dtype=np.int64)
+        values[:self.length] = self.values[:self.length]
+        self.values = values
+
+    def record(self, timestamp, value):
+        """
+        Records the value at the timestamp, overwriting the
+        previously recorded value if the timestamp is unchanged.
+        """
+        if self.length > 0 and timestamp == self._last_timestamp:
+            self.values[self.length - 1] = value
+            return
+        if self.length == self.capacity:
+            self._grow()
+        ts = pd.Timestamp(timestamp)
+        if self.length == 0:
+            self.tz = ts.tz
+        self.times[self.length] = ts.value
+        self.values[self.length] = value
+        self.length += 1
+        self._last_timestamp = timestamp
+
+    def record_array(self, index, values):
+        """
+        Records a whole series of values at once, given a
+        DatetimeIndex of (distinct, ascending) timestamps
+        following any previously recorded ones.
+        """
+        index = pd.DatetimeIndex(index)
+        count = len(index)
+        if count == 0:
+            return
+        while self.length + count > self.capacity:
+            self._grow()
+        if self.length == 0:
+            self.tz = index.tz
+        self._last_timestamp = index[-1]
+        if index.tz is not None:
+            index = index.tz_convert("UTC").tz_localize(None)
+        times = index.values.astype("datetime64[ns]").view(np.int64)
+        self.times[self.length:self.length + count] = times
+        self.values[self.length:self.length + count] = values
+        self.length += count
+
+    def index(self):
+        """
+        Returns the recorded timestamps as a DatetimeIndex.
+        """
+        index = pd.DatetimeIndex(
+            self.times[:self.length].view("datetime64[ns]")
+        )
+        if self.tz is not None:
+            index = index.tz_localize("UTC").tz_convert(self.tz)
+        return index
+
+    def series(self, display=True):
+        """
+        Returns the recorded values as a time-ordered Series.
+
+        If display is True the values are converted into floats
+        via PriceParser.display_array, otherwise the Series holds
+        the integer values as a view onto the buffer.
+
+        Should timestamps have been recorded out of order, the
+        last value recorded for each timestamp is kept.
+        """
+        times = self.times[:self.length]
+        values = self.values[:self.length]
+        if display:
+            values = PriceParser.display_array(values)
+        series = pd.Series(values, index=self.index(), copy=False)
+        if np.any(times[1:] <= times[:-1]):
+            series = series.groupby(level=0).last()
+        return series
@@ -38,7 +38,7 @@ class SimpleStatistics(AbstractStatistics):
         # Initialize timeseries. Correct timestamp not available yet.
         self.timeseries = ["0000-00-00 00:00:00"]
         # Initialize in order for first-step calculations to be correct.
-        current_equity = PriceParser.display(portfolio_handler.portfolio.equity)
+        current_equity = PriceParser.display_scalar(portfolio_handler.portfolio.equity)
         self.hwm = [current_equity]
         self.equity.append(current_equity)
 
@@ -48,7 +48,7 @@ class SimpleStatistics(AbstractStatistics):
         """
         if timestamp != self.timeseries[-1]:
             # Retrieve equity value of Portfolio
-            current_equity = PriceParser.display(portfolio_handler.portfolio.equity)
+            current_equity = PriceParser.display_scalar(portfolio_handler.portfolio.equity)
             self.equity.append(current_equity)
             self.timeseries.append(timestamp)
 
@@ -1,4 +1,5 @@
 from .base import AbstractStatistics
+from .recorder import EquityRecorder
 from ..price_parser import PriceParser
 
 from matplotlib.ticker import FuncFormatter
@@ -43,21 +44,21 @@ class TearsheetStatistics(AbstractStatistics):
         self.benchmark = benchmark
         self.periods = periods
         self.rolling_sharpe = rolling_sharpe
-        self.equity = {}
-        self.equity_benchmark = {}
+        self.equity = EquityRecorder()
+        self.equity_benchmark = EquityRecorder()
         self.log_scale = False
 
     def update(self, timestamp, portfolio_handler):
         """
         Update equity curve and benchmark equity curve that must be tracked
-        over time.
+        over time. Only the latest values for each timestamp are kept.
         """
-        self.equity[timestamp] = PriceParser.display(
-            self.portfolio_handler.portfolio.equity
+        self.equity.record(
+            timestamp, self.portfolio_handler.portfolio.equity
         )
         if self.benchmark is not None:
-            self.equity_benchmark[timestamp] = PriceParser.display(
-                self.price_handler.get_last_close(self.benchmark)
+            self.equity_benchmark.record(
+                timestamp, self.price_handler.get_last_close(self.benchmark)
             )
 
     def get_results(self):
@@ -65,7 +66,7 @@ class TearsheetStatistics(AbstractStatistics):
         Return a dict with all important results & stats.
         """
         # Equity
-        equity_s = pd.Series(self.equity).sort_index()
+        equity_s = self.equity.series()
 
         # Returns
         returns_s = equity_s.pct_change().fillna(0.0)
@@ -80,7 +81,9 @@ class TearsheetStatistics(AbstractStatistics):
         cum_returns_s = np.exp(np.log(1 + returns_s).cumsum())
 
         # Drawdown, max drawdown, max drawdown duration
-        dd_s, max_dd, dd_dur = perf.create_drawdowns(cum_returns_s)
+        dd_s, max_dd, dd_dur, dd_episodes = perf.create_drawdowns(
+            cum_returns_s, episodes=True
+        )
 
         statistics = {}
 
@@ -93,6 +96,7 @@ class TearsheetStatistics(AbstractStatistics):
         statistics["max_drawdown"] = max_dd
         statistics["max_drawdown_pct"] = max_dd
         statistics["max_drawdown_duration"] = dd_dur
+        statistics["drawdown_episodes"] = dd_episodes
         statistics["equity"] = equity_s
         statistics["returns"] = returns_s
         statistics["rolling_sharpe"] = rolling_sharpe_s
@@ -104,7 +108,7 @@ class TearsheetStatistics(AbstractStatistics):
 
         # Benchmark statistics if benchmark ticker specified
         if self.benchmark is not None:
-            equity_b = pd.Series(self.equity_benchmark).sort_index()
+            equity_b = self.equity_benchmark.series()
             returns_b = equity_b.pct_change().fillna(0.0)
             rolling_b = returns_b.rolling(window=self.periods)
             rolling_sharpe_b = np.sqrt(self.periods) * (
@@ -128,33 +132,23 @@ class TearsheetStatistics(AbstractStatistics):
         Retrieve the list of closed Positions objects from the portfolio
         and reformat into a pandas dataframe to be returned
         """
-        def x(p):
-            return PriceParser.display(p)
-
         pos = self.portfolio_handler.portfolio.closed_positions
-        a = []
-        for p in pos:
-            a.append(p.__dict__)
-        if len(a) == 0:
+        if len(pos) == 0:
             # There are no closed positions
             return None
         else:
-            df = pd.DataFrame(a)
-            df['avg_bot'] = df['avg_bot'].apply(x)
-            df['avg_price'] = df['avg_price'].apply(x)
-            df['avg_sld'] = df['avg_sld'].apply(x)
-            df['cost_basis'] = df['cost_basis'].apply(x)
-            df['init_commission'] = df['init_commission'].apply(x)
-            df['init_price'] = df['init_price'].apply(x)
-            df['market_value'] = df['market_value'].apply(x)
-            df['net'] = df['net'].apply(x)
-            df['net_incl_comm'] = df['net_incl_comm'].apply(x)
-            df['net_total'] = df['net_total'].apply(x)
-            df['realised_pnl'] = df['realised_pnl'].apply(x)
-            df['total_bot'] = df['total_bot'].apply(x)
-            df['total_commission'] = df['total_commission'].apply(x)
-            df['total_sld'] = df['total_sld'].apply(x)
-            df['unrealised_pnl'] = df['unrealised_pnl'].apply(x)
+            if hasattr(pos, "to_frame"):
+                # Closed positions stored in a ClosedPositionBook
+                df = pos.to_frame()
+            else:
+                df = pd.DataFrame([p.__dict__ for p in pos])
+            for col in (
+                'avg_bot', 'avg_price', 'avg_sld', 'cost_basis',
+                'init_commission', 'init_price', 'market_value', 'net',
+                'net_incl_comm', 'net_total', 'realised_pnl', 'total_bot',
+                'total_commission', 'total_sld', 'unrealised_pnl'
+            ):
+                df[col] = PriceParser.display_array(df[col])
             df['trade_pct'] = (df['avg_sld'] / df['avg_bot'] - 1.0)
             return df
 
@@ -350,12 +344,13 @@ class TearsheetStatistics(AbstractStatistics):
         y_axis_formatter = FuncFormatter(format_perc)
         ax.yaxis.set_major_formatter(FuncFormatter(y_axis_formatter))
 
-        tot_ret = cum_returns[-1] - 1.0
+        tot_ret = cum_returns.iloc[-1] - 1.0
         cagr = perf.create_cagr(cum_returns, self.periods)
         sharpe = perf.create_sharpe_ratio(returns, self.periods)
         sortino = perf.create_sortino_ratio(returns, self.periods)
         rsq = perf.rsquared(range(cum_returns.shape[0]), cum_returns)
-        dd, dd_max, dd_dur = perf.create_drawdowns(cum_returns)
+        dd_max = stats["max_drawdown_pct"]
+        dd_dur = stats["max_drawdown_duration"]
 
         ax.text(0.25, 8.9, 'Total Return', fontsize=8)
         ax.text(7.50, 8.9, '{:.0%}'.format(tot_ret), fontweight='bold', horizontalalignment='right', fontsize=8)
@@ -388,12 +383,13 @@ class TearsheetStatistics(AbstractStatistics):
         if self.benchmark is not None:
             returns_b = stats['returns_b']
             equity_b = stats['cum_returns_b']
-            tot_ret_b = equity_b[-1] - 1.0
+            tot_ret_b = equity_b.iloc[-1] - 1.0
             cagr_b = perf.create_cagr(equity_b)
             sharpe_b = perf.create_sharpe_ratio(returns_b)
             sortino_b = perf.create_sortino_ratio(returns_b)
             rsq_b = perf.rsquared(range(equity_b.shape[0]), equity_b)
-            dd_b, dd_max_b, dd_dur_b = perf.create_drawdowns(equity_b)
+            dd_max_b = stats["max_drawdown_pct_b"]
+            dd_dur_b = stats["max_drawdown_duration_b"]
 
             ax.text(9.75, 8.9, '{:.0%}'.format(tot_ret_b), fontweight='bold', horizontalalignment='right', fontsize=8)
             ax.text(9.75, 7.9, '{:.2%}'.format(cagr_b), fontweight='bold', horizontalalignment='right', fontsize=8)
@@ -12,10 +12,19 @@ class AbstractStrategy(object):
 
     This is designed to work both with historic and live data as
     the Strategy object is agnostic to data location.
+
+    Strategies setting batch_events to True are sent BarBatchEvents
+    whole, rather than as the individual BarEvents they contain.
+
+    Strategies setting indicators to an IndicatorRegistry have its
+    indicators updated with every bar before receiving the bar.
     """
 
     __metaclass__ = ABCMeta
 
+    batch_events = False
+    indicators = None
+
     @abstractmethod
     def calculate_signals(self, event):
         """
@@ -0,0 +1,189 @@
+from __future__ import print_function
+
+import contextlib
+import itertools
+import multiprocessing
+import os
+
+import numpy as np
+import pandas as pd
+
+from .compliance.base import AbstractCompliance
+from .dispatcher import BacktestEventQueue
+from .price_handler.yahoo_daily_csv_bar import YahooDailyCsvBarPriceHandler
+from .trading_session import TradingSession
+
+
+def parameter_grid(param_grid):
+    """
+    Expands a dictionary of lists of parameter values into the
+    list of every combination of them, as dictionaries, e.g.:
+
+    {"a": [1, 2], "b": [3]} -> [{"a": 1, "b": 3}, {"a": 2, "b": 3}]
+    """
+    names = list(param_grid)
+    return [
+        dict(zip(names, values))
+        for values in itertools.product(*(param_grid[n] for n in names))
+    ]
+
+
+class SweepCompliance(AbstractCompliance):
+    """
+    Discards every trade, so that the runs of a sweep do not
+    all write to the same trade log in the output directory.
+    """
+    def record_trade(self, fill):
+        pass
+
+
+# The ParameterSweep of the current worker process
+_worker_sweep = None
+
+
+def _init_worker(sweep):
+    global _worker_sweep
+    _worker_sweep = sweep
+
+
+def _run_worker(params):
+    return _worker_sweep.run_params(params)
+
+
+class ParameterSweep(object):
+    """
+    ParameterSweep backtests a strategy over every combination of
+    a grid of parameters on the same Yahoo daily CSV price data,
+    returning a DataFrame of the statistics of every run.
+
+    The CSV files are read only once, in the parent process,
+    and shared read-only with the worker processes of a
+    multiprocessing Pool. On platforms supporting "fork" the
+    data (and the strategy factory) are inherited by the workers
+    without being copied or pickled, otherwise the strategy
+    factory must be a picklable (module-level) callable.
+
+    The strategy factory is called with the events queue of the
+    run and the parameters of the run as keyword arguments, e.g.
+
+    def factory(events_queue, short_window, long_window):
+        return MovingAverageCrossStrategy(
+            "AAPL", events_queue, short_window, long_window
+        )
+    """
+    def __init__(
+        self, config, strategy_factory, param_grid, tickers,
+        equity=500000.0, start_date=None, end_date=None,
+        processes=None, title=None, benchmark=None,
+        session_kwargs=None, quiet=True
+    ):
+        """
+        Parameters:
+        config - The settings (CSV_DATA_DIR, OUTPUT_DIR)
+        strategy_factory - Callable creating the strategy of a run
+        param_grid - Dictionary of lists of parameter values
+        tickers - The tickers to load and backtest over
+        equity - The initial equity of every run
+        start_date, end_date - The date range of every run
+        processes - The number of worker processes (defaults to
+            the number of CPUs, 1 runs every backtest inline)
+        title, benchmark - Passed to every TradingSession
+        session_kwargs - Further keyword arguments for every
+            TradingSession (e.g. risk_manager), which must not
+            keep any state between runs
+        quiet - Whether to discard the output printed by each run
+        """
+        self.config = config
+        self.strategy_factory = strategy_factory
+        self.params = parameter_grid(param_grid)
+        self.tickers = tickers
+        self.equity = equity
+        self.start_date = start_date
+        self.end_date = end_date
+        self.processes = processes
+        self.title = title if title is not None else ["Parameter Sweep"]
+        self.benchmark = benchmark
+        self.session_kwargs = session_kwargs or {}
+        self.quiet = quiet
+        self.tickers_data = self._load_data()
+
+    def _load_data(self):
+        """
+        Reads the CSV file of every ticker (and the benchmark) once,
+        within the date range of the sweep.
+        """
+        tickers = list(self.tickers)
+        if self.benchmark is not None and self.benchmark not in tickers:
+            tickers.append(self.benchmark)
+        return {
+            ticker: YahooDailyCsvBarPriceHandler.read_ticker_csv(
+                self.config.CSV_DATA_DIR, ticker,
+                start_date=self.start_date, end_date=self.end_date
+            )
+            for ticker in tickers
+        }
+
+    def run_params(self, params):
+        """
+        Backtests the strategy with a single set of parameters,
+        returning the parameters along with the scalar results.
+        """
+        if self.quiet:
+            with open(os.devnull, "w") as devnull:
+                with contextlib.redirect_stdout(devnull):
+                    return self._run_params(params)
+        return self._run_params(params)
+
+    def _run_params(self, params):
+        events_queue = BacktestEventQueue()
+        price_handler = YahooDailyCsvBarPriceHandler(
+            self.config.CSV_DATA_DIR, events_queue, list(self.tickers_data),
+            start_date=self.start_date, end_date=self.end_date,
+            columnar=True, preloaded_data=self.tickers_data
+        )
+        strategy = self.strategy_factory(events_queue, **params)
+        session = TradingSession(
+            self.config, strategy, self.tickers, self.equity,
+            self.start_date, self.end_date, events_queue,
+            price_handler=price_handler, compliance=SweepCompliance(),
+            title=self.title, benchmark=self.benchmark,
+            **self.session_kwargs
+        )
+        results = session.start_trading(testing=True)
+        return self._summarise(params, results, session)
+
+    def _summarise(self, params, results, session):
+        """
+        Keeps the scalar results of a run, together with the
+        total return, final equity and number of closed trades.
+        """
+        row = dict(params)
+        for key, value in results.items():
+            if np.isscalar(value):
+                row[key] = value
+        row["total_return"] = results["cum_returns"].iloc[-1] - 1.0
+        row["final_equity"] = results["equity"].iloc[-1]
+        row["trades"] = len(session.portfolio_handler.portfolio.closed_positions)
+        return row
+
+    def _pool_context(self):
+        if "fork" in multiprocessing.get_all_start_methods():
+            return multiprocessing.get_context("fork")
+        return multiprocessing.get_context()
+
+    def run(self):
+        """
+        Runs the backtest of every set of parameters, returning
+        a DataFrame with a row per set of parameters (in grid
+        order) and a column per parameter and statistic.
+        """
+        if self.processes == 1:
+            rows = [self.run_params(params) for params in self.params]
+        else:
+            context = self._pool_context()
+            with context.Pool(
+                self.processes, initializer=_init_worker,
+                initargs=(self,)
+            ) as pool:
+                rows = pool.map(_run_worker, self.params, chunksize=1)
+        return pd.DataFrame(rows)
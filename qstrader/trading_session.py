@@ -1,11 +1,14 @@
 from __future__ import print_function
+import time
 from datetime import datetime
 from .compat import queue
+from .dispatcher import BacktestEventQueue, EventDispatcher
 from .event import EventType
 from .price_handler.yahoo_daily_csv_bar import YahooDailyCsvBarPriceHandler
 from .price_handler.questrade_daily_bar import QuestradeDatabaseBarPriceHandler
 from .price_handler.questrade_feed_daily_bar import QuestradeBarPriceHandler
 from .price_parser import PriceParser
+from .profiling import LatencyStats
 from .risk_manager.example import ExampleRiskManager
 from .portfolio_handler import PortfolioHandler
 from .compliance.example import ExampleCompliance
@@ -17,6 +20,24 @@ class TradingSession(object):
     """
     Enscapsulates the settings and components for
     carrying out either a backtest or live trading session.
+
+    Backtests may be given a BacktestEventQueue instead of a
+    queue.Queue as events_queue, in which case the session is
+    driven by a single-threaded dispatch loop that neither
+    acquires locks nor relies upon queue.Empty exceptions.
+
+    Live sessions block in the price handler while there are
+    neither events nor new prices, waking at least every max_wait
+    seconds to check for the end_session_time. The latency from
+    the arrival of each quote to its dispatch, and to the emission
+    of any signals, is recorded in self.latency.
+
+    If history_length is given, the bars of the last history_length
+    timestamps are kept by the (bar) price handler as its history,
+    a PriceHistory shared by the strategy and signal sizers.
+
+    If position_book is True the Positions of the (default)
+    PortfolioHandler are stored in an array-backed PositionBook.
     """
     def __init__(
         self, config, strategy, tickers,
@@ -25,7 +46,8 @@ class TradingSession(object):
         price_handler=None, portfolio_handler=None,
         compliance=None, execution_handler=None, risk_manager=None,
         statistics=None, sentiment_handler=None,
-        title=None, benchmark=None
+        title=None, benchmark=None, max_wait=1.0,
+        history_length=None, position_book=False
     ):
         """
         Set up the backtest variables according to
@@ -34,7 +56,7 @@ class TradingSession(object):
         self.config = config
         self.strategy = strategy
         self.tickers = tickers
-        self.equity = PriceParser.parse(equity)
+        self.equity = PriceParser.parse_scalar(equity)
         self.start_date = start_date
         self.end_date = end_date
         self.events_queue = events_queue
@@ -48,12 +70,23 @@ class TradingSession(object):
         self.title = title
         self.benchmark = benchmark
         self.session_type = session_type
+        self.end_session_time = end_session_time
+        self.max_wait = max_wait
+        self.history_length = history_length
+        self.position_book = position_book
         self._config_session()
         self.cur_time = None
+        self._quote_arrival = None
+        self.latency = {
+            "quote_to_dispatch": LatencyStats("Quote to dispatch"),
+            "quote_to_signal": LatencyStats("Quote to signal"),
+        }
 
         if self.session_type == "live":
             if self.end_session_time is None:
                 raise Exception("Must specify an end_session_time when live trading")
+            if isinstance(self.events_queue, BacktestEventQueue):
+                raise Exception("Must use a thread-safe queue.Queue when live trading")
 
     def _config_session(self):
         """
@@ -64,9 +97,13 @@ class TradingSession(object):
             self.price_handler = QuestradeDatabaseBarPriceHandler(
                 self.events_queue, self.tickers, 
                 start_date=self.start_date,
-                end_date=self.end_date
+                end_date=self.end_date,
+                config=self.config
             )
 
+        if self.history_length is not None and self.price_handler.isbar():
+            self.price_handler.enable_history(self.history_length)
+
         if self.risk_manager is None:
             self.risk_manager = ExampleRiskManager()
 
@@ -75,7 +112,8 @@ class TradingSession(object):
                 self.equity,
                 self.events_queue,
                 self.price_handler,
-                self.risk_manager
+                self.risk_manager,
+                position_book=self.position_book
             )
 
         if self.compliance is None:
@@ -94,6 +132,87 @@ class TradingSession(object):
                 self.title, self.benchmark
             )
 
+        self.dispatcher = EventDispatcher()
+        self.dispatcher.register(EventType.TICK, self._on_price_event)
+        self.dispatcher.register(EventType.BAR, self._on_price_event)
+        self.dispatcher.register(EventType.BAR_BATCH, self._on_bar_batch_event)
+        self.dispatcher.register(EventType.SENTIMENT, self._on_sentiment_event)
+        self.dispatcher.register(EventType.SIGNAL, self.portfolio_handler.on_signal)
+        self.dispatcher.register(EventType.ORDER, self.execution_handler.execute_order)
+        self.dispatcher.register(
+            EventType.ORDER_BATCH, self.execution_handler.execute_order_batch
+        )
+        self.dispatcher.register(EventType.FILL, self.portfolio_handler.on_fill)
+
+    def _on_price_event(self, event):
+        """
+        Updates the strategy, portfolio and statistics
+        upon receipt of a TickEvent or BarEvent.
+        """
+        self.cur_time = event.time
+        # Generate any sentiment events here
+        if self.sentiment_handler is not None:
+            self.sentiment_handler.stream_next(
+                stream_date=self.cur_time
+            )
+        self._update_indicators(event)
+        if self._quote_arrival is not None:
+            self._on_live_price_event(event)
+        else:
+            self.strategy.calculate_signals(event, self.portfolio_handler)
+        self.portfolio_handler.update_portfolio_value(event.ticker)
+        self.statistics.update(event.time, self.portfolio_handler)
+
+    def _update_indicators(self, event):
+        """
+        Updates the indicators subscribed to by the strategy (if
+        any) with the bar, before the strategy receives it.
+        """
+        indicators = getattr(self.strategy, "indicators", None)
+        if indicators is not None:
+            indicators.update(event)
+
+    def _on_live_price_event(self, event):
+        """
+        Calls the strategy upon a live quote, recording the latency
+        from its arrival to its dispatch and to any signals.
+        """
+        arrival = self._quote_arrival
+        self._quote_arrival = None
+        self.latency["quote_to_dispatch"].record(time.monotonic() - arrival)
+        queued = self.events_queue.qsize()
+        self.strategy.calculate_signals(event, self.portfolio_handler)
+        if self.events_queue.qsize() > queued:
+            self.latency["quote_to_signal"].record(time.monotonic() - arrival)
+
+    def _on_bar_batch_event(self, event):
+        """
+        Updates the strategy, portfolio and statistics once
+        upon receipt of a BarBatchEvent.
+
+        Strategies which set batch_events to True receive the
+        BarBatchEvent itself, otherwise they are sent each of
+        its BarEvents in turn.
+        """
+        self.cur_time = event.time
+        # Generate any sentiment events here
+        if self.sentiment_handler is not None:
+            self.sentiment_handler.stream_next(
+                stream_date=self.cur_time
+            )
+        for bar in event:
+            self._update_indicators(bar)
+        if getattr(self.strategy, "batch_events", False):
+            self.strategy.calculate_signals(event, self.portfolio_handler)
+        else:
+            for bar in event:
+                self.strategy.calculate_signals(bar, self.portfolio_handler)
+        self.portfolio_handler.update_portfolio_value()
+        self.statistics.update(event.time, self.portfolio_handler)
+
+    def _on_sentiment_event(self, event):
+        self.strategy.calculate_signals(event)
+
     def _continue_loop_condition(self):
         if self.session_type == "backtest":
             return self.price_handler.continue_backtest
@@ -113,37 +232,68 @@ class TradingSession(object):
         else:
             print("Running Realtime Session until %s" % self.end_session_time)
 
+        if isinstance(self.events_queue, BacktestEventQueue):
+            self._run_dispatch_loop()
+            return
+
+        if self.session_type != "backtest":
+            self._run_live_loop()
+            return
+
         while self._continue_loop_condition():
             try:
                 event = self.events_queue.get(False)
-                #print(event)
             except queue.Empty:
                 self.price_handler.stream_next()
             else:
                 if event is not None:
-                    if (
-                        event.type == EventType.TICK or
-                        event.type == EventType.BAR
-                    ):
-                        self.cur_time = event.time
-                        # Generate any sentiment events here
-                        if self.sentiment_handler is not None:
-                            self.sentiment_handler.stream_next(
-                                stream_date=self.cur_time
-                            )
-                        self.strategy.calculate_signals(event, self.portfolio_handler)
-                        self.portfolio_handler.update_portfolio_value()
-                        self.statistics.update(event.time, self.portfolio_handler)
-                    elif event.type == EventType.SENTIMENT:
-                        self.strategy.calculate_signals(event)
-                    elif event.type == EventType.SIGNAL:
-                        self.portfolio_handler.on_signal(event)
-                    elif event.type == EventType.ORDER:
-                        self.execution_handler.execute_order(event)
-                    elif event.type == EventType.FILL:
-                        self.portfolio_handler.on_fill(event)
-                    else:
-                        raise NotImplemented("Unsupported event.type '%s'" % event.type)
+                    self.dispatcher.dispatch(event)
+
+    def _run_live_loop(self):
+        """
+        Carries out a live session until the end_session_time. Once
+        every event has been dispatched and the price handler has
+        no new prices, the loop blocks in the price handler (for at
+        most max_wait seconds, or until the end of the session)
+        rather than spinning.
+        """
+        events_queue = self.events_queue
+        price_handler = self.price_handler
+        while self._continue_loop_condition():
+            try:
+                event = events_queue.get(False)
+            except queue.Empty:
+                price_handler.stream_next()
+                if events_queue.empty():
+                    remaining = (
+                        self.end_session_time - datetime.now()
+                    ).total_seconds()
+                    if remaining > 0:
+                        price_handler.wait_for_prices(
+                            min(self.max_wait, remaining)
+                        )
+                else:
+                    self._quote_arrival = getattr(
+                        price_handler, "last_arrival", None
+                    ) or time.monotonic()
+            else:
+                if event is not None:
+                    self.dispatcher.dispatch(event)
+        for latency in self.latency.values():
+            print(latency)
+
+    def _run_dispatch_loop(self):
+        """
+        Carries out the backtest on a single thread by streaming
+        the next price event only once every event generated by
+        the previous one has been dispatched. This processes
+        events in the same order as the polling loop.
+        """
+        price_handler = self.price_handler
+        dispatch_pending = self.dispatcher.dispatch_pending
+        while price_handler.continue_backtest:
+            price_handler.stream_next()
+            dispatch_pending(self.events_queue)
 
     def start_trading(self, testing=False):
         """
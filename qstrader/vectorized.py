@@ -0,0 +1,261 @@
+import numpy as np
+import pandas as pd
+
+from .execution_handler.ib_simulated import IBSimulatedExecutionHandler
+from .portfolio_handler import PortfolioHandler
+from .position import Position
+from .price_handler.yahoo_daily_csv_bar import YahooDailyCsvBarPriceHandler
+from .price_parser import PriceParser
+from .statistics.tearsheet import TearsheetStatistics
+
+
+class TargetWeightBacktest(object):
+    """
+    TargetWeightBacktest backtests a long-only strategy given purely
+    as a matrix of target weights (rebalance dates x tickers), such
+    as a monthly rebalance, without the per-bar event loop.
+
+    On each rebalance date the Portfolio is rebalanced at the close
+    to the target weights of the current equity, rounded down to
+    whole shares as by the RebalanceSignalSizer. Every ticker is
+    sold down before any ticker is bought, and purchases are limited
+    by the cash available (including their commission), as by the
+    WeightComplexSignalSizer. Fills are at the close, with the
+    commission of the IBSimulatedExecutionHandler.
+
+    Only the (few) trades are accounted one at a time, with the same
+    Position objects as the event-driven Portfolio. The equity of
+    every other bar follows from the holdings and close prices with
+    vectorised NumPy operations, and the results are those of the
+    TearsheetStatistics of a TradingSession.
+
+    A rebalance date on which there is no bar is carried forward to
+    the next bar. Tickers missing from a row of weights are sold,
+    while tickers without a price yet are not bought.
+    """
+    def __init__(
+        self, config, weights, equity,
+        start_date=None, end_date=None,
+        title=None, benchmark=None, periods=252,
+        tickers_data=None
+    ):
+        """
+        Parameters:
+        config - The settings (CSV_DATA_DIR)
+        weights - DataFrame of the target weights, indexed by
+            rebalance date and with a column per ticker
+        equity - The initial cash
+        start_date, end_date - The date range of the bars
+            (start_date <= date < end_date)
+        title, benchmark - As for a TradingSession
+        periods - The number of bars per year, for the statistics
+        tickers_data - Optional dictionary of DataFrames, keyed by
+            ticker and as returned by read_ticker_csv, which are
+            used (read-only) instead of reading the CSV files
+        """
+        if (weights.fillna(0.0).values < 0.0).any():
+            raise ValueError("target weights must not be negative")
+        self.config = config
+        self.weights = weights.sort_index()
+        self.tickers = list(weights.columns)
+        self.equity = PriceParser.parse_scalar(equity)
+        self.start_date = start_date
+        self.end_date = end_date
+        self.title = title if title is not None else ["Target Weights"]
+        self.benchmark = benchmark
+        self.periods = periods
+        self.tickers_data = tickers_data if tickers_data is not None else {}
+        self.portfolio_handler = PortfolioHandler(self.equity, None, None, None)
+        self.statistics = TearsheetStatistics(
+            self.config, self.portfolio_handler,
+            self.title, self.benchmark, self.periods
+        )
+
+    def _read_closes(self, tickers):
+        """
+        Returns a DataFrame of the close prices of the tickers over
+        the union of their dates, with the last close carried forward.
+        """
+        closes = {}
+        for ticker in tickers:
+            df = self.tickers_data.get(ticker)
+            if df is None:
+                df = YahooDailyCsvBarPriceHandler.read_ticker_csv(
+                    self.config.CSV_DATA_DIR, ticker,
+                    start_date=self.start_date, end_date=self.end_date
+                )
+            if not df.index.is_monotonic_increasing:
+                df = df.sort_index()
+            start, end = 0, len(df)
+            if self.start_date is not None:
+                start = df.index.searchsorted(self.start_date)
+            if self.end_date is not None:
+                end = df.index.searchsorted(self.end_date)
+            closes[ticker] = df["Close"].iloc[start:end]
+        return pd.DataFrame(closes, columns=tickers).ffill()
+
+    def _rebalance_rows(self, dates):
+        """
+        Returns the positions within dates of the bars on which
+        the Portfolio is rebalanced, and the target weights of each.
+        """
+        rows = dates.searchsorted(self.weights.index)
+        valid = rows < len(dates)
+        rows = rows[valid]
+        targets = self.weights.fillna(0.0).values[valid]
+        if len(rows) == 0:
+            return rows, targets
+        # Only the last weights carried forward to a bar are kept
+        last = np.append(rows[1:] != rows[:-1], True)
+        return rows[last], targets[last]
+
+    def _transact(self, positions, closed, action, tickers, quantities, prices):
+        """
+        Fills the trades of a rebalance at once, returning their
+        total cash flow, and accounts each of them in its Position.
+        """
+        if len(quantities) == 0:
+            return 0
+        commissions = IBSimulatedExecutionHandler.calculate_ib_commission_array(
+            quantities, prices
+        )
+        values = quantities * prices
+        for ticker, quantity, price, commission in zip(
+            tickers, quantities.tolist(), prices.tolist(), commissions.tolist()
+        ):
+            position = positions.get(ticker)
+            if position is None:
+                positions[ticker] = Position(
+                    action, ticker, quantity, price, commission, price, price
+                )
+                continue
+            position.transact_shares(action, quantity, price, commission)
+            position.update_market_value(price, price)
+            if position.quantity == 0:
+                closed.append(positions.pop(ticker))
+        if action == "BOT":
+            return -int(values.sum() + commissions.sum())
+        return int(values.sum() - commissions.sum())
+
+    @staticmethod
+    def _affordable(cash, price):
+        """
+        Returns the largest whole number of shares at the price
+        which may be bought with the cash, including commission.
+        """
+        quantity = max(int(cash // price), 0)
+        while quantity > 0 and (
+            quantity * price +
+            IBSimulatedExecutionHandler.calculate_ib_commission_array(
+                quantity, price
+            ) > cash
+        ):
+            quantity -= 1
+        return quantity
+
+    def run(self):
+        """
+        Runs the backtest, returning the results of its
+        TearsheetStatistics.
+        """
+        tickers = list(self.tickers)
+        if self.benchmark is not None and self.benchmark not in tickers:
+            tickers.append(self.benchmark)
+        closes = self._read_closes(tickers)
+        dates = closes.index
+        prices = closes[self.tickers]
+        available = prices.notna().values
+        prices = PriceParser.parse_array(prices.fillna(0.0).values)
+        display_prices = PriceParser.display_array(prices)
+
+        rows, targets = self._rebalance_rows(dates)
+        names = np.array(self.tickers, dtype=object)
+        portfolio = self.portfolio_handler.portfolio
+        positions = {}
+        closed = []
+        cash = self.equity
+        quantities = np.zeros(len(self.tickers), dtype=np.int64)
+
+        # The holdings, and the equity other than their market value,
+        # after each rebalance (the first row being the initial cash)
+        holdings = np.zeros((len(rows) + 1, len(self.tickers)), dtype=np.int64)
+        offsets = np.full(len(rows) + 1, self.equity, dtype=np.int64)
+
+        for i, (row, weights) in enumerate(zip(rows, targets)):
+            price = prices[row]
+            equity = offsets[i] + int(np.dot(quantities, price))
+            equity = PriceParser.display_scalar(equity)
+            target = np.zeros(len(self.tickers), dtype=np.int64)
+            held = available[row]
+            target[held] = np.floor(
+                weights[held] * equity / display_prices[row][held]
+            )
+            delta = target - quantities
+
+            sells = delta < 0
+            cash += self._transact(
+                positions, closed, "SLD", names[sells],
+                -delta[sells], price[sells]
+            )
+
+            buys = np.flatnonzero(delta > 0)
+            # Buy in ticker order while the cash lasts, the first
+            # ticker which cannot be bought in full taking the rest
+            cost = np.cumsum(
+                delta[buys] * price[buys] +
+                IBSimulatedExecutionHandler.calculate_ib_commission_array(
+                    delta[buys], price[buys]
+                )
+            )
+            short = np.flatnonzero(cost > cash)
+            if len(short) > 0:
+                first = short[0]
+                ticker = buys[first]
+                delta[ticker] = self._affordable(
+                    cash - (cost[first - 1] if first > 0 else 0), price[ticker]
+                )
+                delta[buys[first + 1:]] = 0
+                buys = buys[delta[buys] > 0]
+            cash += self._transact(
+                positions, closed, "BOT", names[buys],
+                delta[buys], price[buys]
+            )
+
+            quantities = np.array(
+                [positions[t].quantity if t in positions else 0
+                 for t in self.tickers], dtype=np.int64
+            )
+            holdings[i + 1] = quantities
+            offsets[i + 1] = self.equity + sum(
+                p.realised_pnl for p in closed
+            ) + sum(
+                p.realised_pnl - p.cost_basis for p in positions.values()
+            )
+
+        # The equity of every bar, from the holdings after the
+        # latest rebalance on or before it
+        latest = np.searchsorted(rows, np.arange(len(dates)), side="right")
+        equity = offsets[latest] + np.einsum(
+            "ij,ij->i", holdings[latest], prices
+        )
+
+        for ticker, position in positions.items():
+            price = prices[-1][self.tickers.index(ticker)]
+            position.update_market_value(price, price)
+        portfolio.positions = positions
+        portfolio.closed_positions = closed
+        portfolio.cur_cash = cash
+        portfolio.realised_pnl = sum(p.realised_pnl for p in closed)
+        portfolio.unrealised_pnl = sum(
+            p.unrealised_pnl for p in positions.values()
+        )
+        portfolio.equity = int(equity[-1]) if len(equity) else self.equity
+
+        self.statistics.equity.record_array(dates, equity)
+        if self.benchmark is not None:
+            self.statistics.equity_benchmark.record_array(
+                dates, PriceParser.parse_array(
+                    closes[self.benchmark].fillna(0.0).values
+                )
+            )
+        return self.statistics.get_results()
@@ -0,0 +1,90 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+import pandas as pd
+
+from qstrader.compat import queue
+from qstrader.price_handler.candle_store import CandleStore
+from qstrader.price_handler.fetcher import ConcurrentFetcher
+from qstrader.price_handler.questrade_feed_daily_bar import (
+    QuestradeBarPriceHandler
+)
+
+
+class TestCandleStore(unittest.TestCase):
+    """
+    Test that the CandleStore only downloads the candles of the
+    dates which it does not hold yet, and returns the same
+    candles as downloading the full range.
+    """
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.db_path = os.path.join(self.tmp_dir, "candles.db")
+        self.calls = []
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def fetch(self, ticker, start, end):
+        self.calls.append((ticker, start, end))
+        days = pd.bdate_range(start, end, tz="UTC")
+        return [
+            {
+                "start": day.isoformat(), "end": day.isoformat(),
+                "low": 9.0, "high": 11.0, "open": 10.0,
+                "close": 10.0 + day.day / 100.0, "volume": 100, "VWAP": 10.0
+            }
+            for day in days
+        ]
+
+    def test_incremental_top_up(self):
+        store = CandleStore(self.db_path)
+        candles = store.history("SPY", "2020-01-01", "2020-01-31", self.fetch)
+        self.assertEqual(len(candles), 23)
+        self.assertEqual(self.calls, [("SPY", "2020-01-01", "2020-01-31")])
+
+        # A new store over the same file reads without downloading
+        store = CandleStore(self.db_path)
+        self.assertEqual(
+            store.history("SPY", "2020-01-06", "2020-01-10", self.fetch),
+            candles[3:8]
+        )
+        self.assertEqual(len(self.calls), 1)
+
+        # Later dates only download from the last stored date
+        candles = store.history("SPY", "2020-01-01", "2020-02-07", self.fetch)
+        self.assertEqual(self.calls[1], ("SPY", "2020-01-31", "2020-02-07"))
+        # Earlier dates only download up to the first stored date
+        candles = store.history("SPY", "2019-12-23", "2020-02-07", self.fetch)
+        self.assertEqual(self.calls[2], ("SPY", "2019-12-23", "2020-01-01"))
+        self.assertEqual(len(self.calls), 3)
+        self.assertEqual(store.coverage("SPY"), ("2019-12-23", "2020-02-07"))
+        self.assertEqual(
+            candles, self.fetch("SPY", "2019-12-23", "2020-02-07")
+        )
+
+    def test_price_handler(self):
+        store = CandleStore(self.db_path)
+        for _ in range(2):
+            events_queue = queue.Queue()
+            price_handler = QuestradeBarPriceHandler(
+                events_queue, ["SPY", "AGG"],
+                start_date=pd.Timestamp("2020-01-06", tz="UTC"),
+                end_date=pd.Timestamp("2020-01-11", tz="UTC"),
+                fetcher=ConcurrentFetcher(store.cached(self.fetch))
+            )
+            bars = []
+            while price_handler.continue_backtest:
+                price_handler.stream_next()
+                while not events_queue.empty():
+                    bars.append(events_queue.get(False))
+            self.assertEqual(len(bars), 10)
+            self.assertEqual(bars[-1].close_price, 101000000)
+        # The second run was read from the store
+        self.assertEqual(len(self.calls), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
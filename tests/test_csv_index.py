@@ -0,0 +1,140 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+import pandas as pd
+
+from qstrader import settings
+from qstrader.price_handler.csv_index import CsvDateIndex, read_csv_range
+from qstrader.price_handler.yahoo_daily_csv_bar import (
+    YahooDailyCsvBarPriceHandler
+)
+
+
+class TestCsvDateIndex(unittest.TestCase):
+    """
+    Test that the rows of a date range read via a CsvDateIndex
+    are exactly those of the full CSV file within the date range.
+    """
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.csv_path = os.path.join(self.tmp_dir, "SPY.csv")
+        shutil.copy(
+            os.path.join(settings.TEST.CSV_DATA_DIR, "SPY.csv"), self.csv_path
+        )
+        self.read_csv_kwargs = YahooDailyCsvBarPriceHandler.READ_CSV_KWARGS
+        self.full = pd.read_csv(self.csv_path, **self.read_csv_kwargs)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def _trim(self, df, start_date, end_date):
+        start = 0 if start_date is None else df.index.searchsorted(start_date)
+        end = len(df) if end_date is None else df.index.searchsorted(end_date)
+        return df.iloc[start:end]
+
+    def test_date_ranges(self):
+        csv_index = CsvDateIndex(self.csv_path, stride=50)
+        for start_date, end_date in [
+            (None, None),
+            ("2010-01-01", "2011-01-01"),
+            ("2019-12-30", None),
+            (None, "1993-02-03"),
+            ("1993-01-29", "1993-01-30"),
+            ("2010-06-15", "2010-06-16"),
+            ("2030-01-01", None),
+        ]:
+            start_date = None if start_date is None else pd.Timestamp(start_date)
+            end_date = None if end_date is None else pd.Timestamp(end_date)
+            df = csv_index.read_csv(
+                start_date, end_date, **self.read_csv_kwargs
+            )
+            self.assertTrue(self._trim(df, start_date, end_date).equals(
+                self._trim(self.full, start_date, end_date)
+            ))
+        # Only the rows near the date range are parsed
+        df = csv_index.read_csv(
+            pd.Timestamp("2010-01-01"), pd.Timestamp("2011-01-01"),
+            **self.read_csv_kwargs
+        )
+        self.assertLessEqual(len(df), 252 + 2 * 50)
+
+    def test_chunks(self):
+        csv_index = CsvDateIndex(self.csv_path, stride=50)
+        chunks = csv_index.read_csv(
+            pd.Timestamp("2010-01-01"), pd.Timestamp("2011-01-01"),
+            chunksize=100, **self.read_csv_kwargs
+        )
+        df = pd.concat(list(chunks))
+        self.assertTrue(
+            self._trim(df, pd.Timestamp("2010-01-01"), pd.Timestamp("2011-01-01")).equals(
+                self._trim(self.full, pd.Timestamp("2010-01-01"), pd.Timestamp("2011-01-01"))
+            )
+        )
+
+    def test_saved_and_rebuilt(self):
+        csv_index = CsvDateIndex(self.csv_path, stride=50)
+        self.assertTrue(os.path.exists(csv_index.index_path))
+        self.assertEqual(len(csv_index.offsets), (len(self.full) + 49) // 50)
+        # Truncate the file to its first 100 rows
+        with open(self.csv_path) as csv_file:
+            lines = csv_file.readlines()[:101]
+        with open(self.csv_path, "w") as csv_file:
+            csv_file.writelines(lines)
+        csv_index = CsvDateIndex(self.csv_path, stride=50)
+        self.assertEqual(len(csv_index.offsets), 2)
+
+    def test_unwritable_index_dir(self):
+        """
+        Test that an index which cannot be saved (here as its
+        directory would be within a file) is kept in memory.
+        """
+        index_dir = os.path.join(self.csv_path, "index")
+        csv_index = CsvDateIndex(self.csv_path, stride=50, index_dir=index_dir)
+        self.assertFalse(os.path.exists(csv_index.index_path))
+        df = csv_index.read_csv(
+            pd.Timestamp("2010-01-01"), pd.Timestamp("2011-01-01"),
+            **self.read_csv_kwargs
+        )
+        self.assertTrue(
+            self._trim(df, pd.Timestamp("2010-01-01"), pd.Timestamp("2011-01-01")).equals(
+                self._trim(self.full, pd.Timestamp("2010-01-01"), pd.Timestamp("2011-01-01"))
+            )
+        )
+
+    def test_handler_index_dir(self):
+        """
+        Test that the price handler saves the indices of its date
+        ranges to its index_dir, rather than the data directory.
+        """
+        index_dir = os.path.join(self.tmp_dir, "index")
+        price_handler = YahooDailyCsvBarPriceHandler(
+            self.tmp_dir, None, ["SPY"],
+            start_date=pd.Timestamp("2010-01-01"),
+            end_date=pd.Timestamp("2011-01-01"), index_dir=index_dir
+        )
+        self.assertIn("SPY", price_handler.tickers)
+        self.assertEqual(len(os.listdir(index_dir)), 1)
+        self.assertEqual(
+            sorted(os.listdir(self.tmp_dir)), ["SPY.csv", "index"]
+        )
+
+    def test_unordered_file_read_in_full(self):
+        with open(self.csv_path) as csv_file:
+            lines = csv_file.readlines()
+        with open(self.csv_path, "w") as csv_file:
+            csv_file.writelines(lines[:1] + lines[:0:-1])
+        csv_index = CsvDateIndex(self.csv_path, stride=50)
+        self.assertFalse(csv_index.ordered)
+        self.assertIsNone(csv_index.read_csv(
+            pd.Timestamp("2010-01-01"), **self.read_csv_kwargs
+        ))
+        df = read_csv_range(
+            self.csv_path, pd.Timestamp("2010-01-01"), **self.read_csv_kwargs
+        )
+        self.assertEqual(len(df), len(self.full))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,173 @@
+import datetime
+import shutil
+import tempfile
+import unittest
+
+from munch import munchify
+
+from qstrader.compat import queue
+from qstrader.dispatcher import BacktestEventQueue, EventDispatcher
+from qstrader.event import EventType, OrderEvent, SentimentEvent, SignalEvent
+from qstrader.price_handler.yahoo_daily_csv_bar import YahooDailyCsvBarPriceHandler
+from qstrader.signal_sizer.naive import NaiveSignalSizer
+from qstrader.strategy.base import AbstractStrategy
+from qstrader.trading_session import TradingSession
+from qstrader import settings
+
+
+class TestBacktestEventQueue(unittest.TestCase):
+    def test_fifo(self):
+        events_queue = BacktestEventQueue()
+        self.assertTrue(events_queue.empty())
+        events_queue.put(1)
+        events_queue.put(2)
+        self.assertEqual(events_queue.qsize(), 2)
+        self.assertEqual(len(events_queue), 2)
+        self.assertEqual(events_queue.get(False), 1)
+        self.assertEqual(events_queue.get(), 2)
+        self.assertTrue(events_queue.empty())
+
+    def test_get_empty(self):
+        events_queue = BacktestEventQueue()
+        with self.assertRaises(queue.Empty):
+            events_queue.get(False)
+
+
+class TestEventDispatcher(unittest.TestCase):
+    def setUp(self):
+        self.seen = []
+        self.events_queue = BacktestEventQueue()
+        self.dispatcher = EventDispatcher()
+        self.dispatcher.register(EventType.SIGNAL, self.on_signal)
+        self.dispatcher.register(EventType.ORDER, self.seen.append)
+
+    def on_signal(self, event):
+        self.seen.append(event)
+        self.events_queue.put(
+            OrderEvent(event.ticker, event.action, event.suggested_quantity)
+        )
+
+    def test_dispatch_pending(self):
+        """
+        Events placed onto the queue by handlers are
+        dispatched in the same pass.
+        """
+        self.events_queue.put(SignalEvent("SPY", "BOT", 100))
+        self.events_queue.put(None)
+        self.events_queue.put(SignalEvent("AGG", "SLD", 50))
+        self.dispatcher.dispatch_pending(self.events_queue)
+        self.assertTrue(self.events_queue.empty())
+        self.assertEqual(
+            [(e.typename, e.ticker) for e in self.seen], [
+                ("SIGNAL", "SPY"), ("SIGNAL", "AGG"),
+                ("ORDER", "SPY"), ("ORDER", "AGG")
+            ]
+        )
+
+    def test_unsupported_event(self):
+        with self.assertRaises(NotImplementedError):
+            self.dispatcher.dispatch(SentimentEvent(None, "SPY", 1.0))
+
+
+class AlternatingStrategy(AbstractStrategy):
+    """
+    Buys the ticker on the first bar of every month and
+    sells it again on the first bar of the following one.
+    """
+    def __init__(self, ticker, events_queue):
+        self.ticker = ticker
+        self.events_queue = events_queue
+        self.invested = False
+        self.month = None
+
+    def calculate_signals(self, event, portfolio_handler):
+        if event.type == EventType.BAR and event.ticker == self.ticker:
+            if event.time.month != self.month:
+                self.month = event.time.month
+                action = "SLD" if self.invested else "BOT"
+                signal = NaiveSignalSizer(10).size_signal(
+                    portfolio_handler.portfolio,
+                    SignalEvent(self.ticker, action)
+                )
+                self.events_queue.put(signal)
+                self.invested = not self.invested
+
+
+class TestTradingSessionDispatchLoop(unittest.TestCase):
+    """
+    Test that a backtest driven by a BacktestEventQueue
+    produces exactly the same equity curve as one polling
+    a queue.Queue.
+    """
+    def setUp(self):
+        self.out_dir = tempfile.mkdtemp()
+        self.config = munchify({
+            "CSV_DATA_DIR": settings.TEST.CSV_DATA_DIR,
+            "OUTPUT_DIR": self.out_dir
+        })
+
+    def tearDown(self):
+        shutil.rmtree(self.out_dir)
+
+    def _run(self, events_queue, batch_bars=False):
+        tickers = ["SPY", "AGG"]
+        price_handler = YahooDailyCsvBarPriceHandler(
+            self.config.CSV_DATA_DIR, events_queue, tickers,
+            start_date=datetime.datetime(2010, 1, 1),
+            end_date=datetime.datetime(2011, 1, 1),
+            columnar=True, batch_bars=batch_bars
+        )
+        strategy = AlternatingStrategy("SPY", events_queue)
+        session = TradingSession(
+            self.config, strategy, tickers, 10000.0,
+            None, None, events_queue, price_handler=price_handler,
+            title=["Dispatch"]
+        )
+        session._run_session()
+        return session
+
+    def test_same_results(self):
+        polled = self._run(queue.Queue())
+        dispatched = self._run(BacktestEventQueue())
+        self.assertTrue(
+            polled.statistics.equity.series().equals(
+                dispatched.statistics.equity.series()
+            )
+        )
+        self.assertEqual(
+            len(polled.portfolio_handler.portfolio.closed_positions), 6
+        )
+        self.assertEqual(
+            polled.portfolio_handler.portfolio.cur_cash,
+            dispatched.portfolio_handler.portfolio.cur_cash
+        )
+
+    def test_bar_batches(self):
+        """
+        Streaming one BarBatchEvent per day should give the
+        same results as streaming one BarEvent per ticker.
+        """
+        bars = self._run(BacktestEventQueue())
+        batches = self._run(BacktestEventQueue(), batch_bars=True)
+        self.assertTrue(
+            bars.statistics.equity.series().equals(
+                batches.statistics.equity.series()
+            )
+        )
+        self.assertEqual(
+            bars.portfolio_handler.portfolio.cur_cash,
+            batches.portfolio_handler.portfolio.cur_cash
+        )
+
+    def test_live_requires_queue(self):
+        with self.assertRaisesRegex(Exception, "queue.Queue"):
+            TradingSession(
+                self.config, None, [], 10000.0, None, None,
+                BacktestEventQueue(), session_type="live",
+                end_session_time=datetime.datetime.now(),
+                title=["Live"]
+            )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,60 @@
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from qstrader.price_parser import PriceParser
+from qstrader.statistics.recorder import EquityRecorder
+
+
+class TestEquityRecorder(unittest.TestCase):
+    """
+    Test that the EquityRecorder keeps the latest value for
+    each timestamp, exactly as the dictionary of equity values
+    previously used by TearsheetStatistics.
+    """
+    def setUp(self):
+        self.recorder = EquityRecorder(capacity=2)
+        self.times = pd.date_range("2016-01-01", periods=5, freq="D")
+
+    def test_record_once_per_timestamp(self):
+        equity = {}
+        for i, time in enumerate(self.times):
+            for j in range(3):
+                value = PriceParser.parse(1000.0 + 10 * i + j)
+                self.recorder.record(time, value)
+                equity[time] = PriceParser.display(value)
+        self.assertEqual(len(self.recorder), 5)
+        self.assertGreaterEqual(self.recorder.capacity, 5)
+        self.assertTrue(
+            self.recorder.series().equals(pd.Series(equity).sort_index())
+        )
+
+    def test_integer_series_is_a_view(self):
+        for i, time in enumerate(self.times):
+            self.recorder.record(time, PriceParser.parse(100.0 + i))
+        series = self.recorder.series(display=False)
+        self.assertEqual(series.dtype, np.int64)
+        self.assertTrue(
+            np.shares_memory(series.values, self.recorder.values)
+        )
+
+    def test_timezone_aware(self):
+        times = self.times.tz_localize("US/Eastern")
+        for i, time in enumerate(times):
+            self.recorder.record(time, PriceParser.parse(100.0 + i))
+        series = self.recorder.series()
+        self.assertTrue(series.index.equals(times))
+        self.assertEqual(series.iloc[-1], 104.0)
+
+    def test_out_of_order(self):
+        for i in (0, 2, 1, 2):
+            self.recorder.record(self.times[i], PriceParser.parse(100.0 + i))
+        self.recorder.record(self.times[2], PriceParser.parse(200.0))
+        series = self.recorder.series()
+        self.assertEqual(list(series.index), list(self.times[:3]))
+        self.assertEqual(list(series), [100.0, 101.0, 200.0])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,83 @@
+import pickle
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from qstrader.event import (
+    EventType, TickEvent, BarEvent, BarBatchEvent, SignalEvent,
+    OrderEvent, FillEvent, SentimentEvent
+)
+
+
+class TestSlottedEvents(unittest.TestCase):
+    """
+    Test that the events are compact (slotted) objects which
+    still behave as the original attribute-based events.
+    """
+    def setUp(self):
+        self.time = pd.Timestamp("2016-02-01")
+        self.events = [
+            TickEvent("GOOG", self.time, 100, 101),
+            BarEvent("GOOG", self.time, 86400, 1, 2, 3, 4, 5, 6),
+            SignalEvent("GOOG", "BOT", 100),
+            OrderEvent("GOOG", "BOT", 100),
+            FillEvent(self.time, "GOOG", "BOT", 100, "ARCA", 1, 2),
+            SentimentEvent(self.time, "GOOG", 1.5),
+        ]
+
+    def test_event_types(self):
+        self.assertEqual(
+            [e.type for e in self.events], [
+                EventType.TICK, EventType.BAR, EventType.SIGNAL,
+                EventType.ORDER, EventType.FILL, EventType.SENTIMENT
+            ]
+        )
+        self.assertEqual(self.events[1].typename, "BAR")
+
+    def test_no_instance_dict(self):
+        for event in self.events:
+            self.assertFalse(hasattr(event, "__dict__"))
+            with self.assertRaises(AttributeError):
+                event.not_an_attribute = 1
+
+    def test_mutable_attributes(self):
+        signal = self.events[2]
+        signal.action = "SLD"
+        signal.suggested_quantity = 50
+        self.assertEqual(signal.action, "SLD")
+        self.assertEqual(signal.suggested_quantity, 50)
+
+    def test_pickle_round_trip(self):
+        bar = pickle.loads(pickle.dumps(self.events[1]))
+        self.assertEqual(str(bar), str(self.events[1]))
+
+    def test_period_readable(self):
+        self.assertEqual(self.events[1].period_readable, "1day")
+        bar = BarEvent("GOOG", self.time, 7, 1, 2, 3, 4, 5)
+        self.assertEqual(bar.period_readable, "7sec")
+        self.assertIsNone(bar.adj_close_price)
+
+
+class TestBarBatchEvent(unittest.TestCase):
+    def test_iterate_bars(self):
+        time = pd.Timestamp("2016-02-01")
+        batch = BarBatchEvent(
+            time, 86400, ["AMZN", "GOOG"],
+            np.array([1, 11]), np.array([2, 12]), np.array([3, 13]),
+            np.array([4, 14]), np.array([5, 15]), None
+        )
+        self.assertEqual(batch.type, EventType.BAR_BATCH)
+        self.assertFalse(hasattr(batch, "__dict__"))
+        self.assertEqual(len(batch), 2)
+        self.assertEqual(
+            [str(bar) for bar in batch], [
+                str(BarEvent("AMZN", time, 86400, 1, 2, 3, 4, 5)),
+                str(BarEvent("GOOG", time, 86400, 11, 12, 13, 14, 15))
+            ]
+        )
+        self.assertIsInstance(list(batch)[1].close_price, int)
+
+
+if __name__ == "__main__":
+    unittest.main()
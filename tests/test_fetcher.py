@@ -0,0 +1,159 @@
+import datetime
+import json
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+from urllib.request import urlopen
+
+import pandas as pd
+
+from qstrader.compat import queue
+from qstrader.price_handler.fetcher import ConcurrentFetcher
+from qstrader.price_handler.questrade_feed_daily_bar import (
+    QuestradeBarPriceHandler
+)
+
+
+class FakeCandleServer(ThreadingHTTPServer):
+    """
+    Serves daily candles in the format of the Questrade API,
+    failing the first request of every ticker and recording the
+    number of requests and the peak number of concurrent requests.
+    """
+    def __init__(self):
+        ThreadingHTTPServer.__init__(
+            self, ("127.0.0.1", 0), FakeCandleHandler
+        )
+        self.lock = threading.Lock()
+        self.requests = {}
+        self.active = 0
+        self.peak = 0
+
+
+class FakeCandleHandler(BaseHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        server = self.server
+        query = parse_qs(urlparse(self.path).query)
+        ticker = query["ticker"][0]
+        with server.lock:
+            server.requests[ticker] = server.requests.get(ticker, 0) + 1
+            first = server.requests[ticker] == 1
+            server.active += 1
+            server.peak = max(server.peak, server.active)
+        time.sleep(0.05)
+        with server.lock:
+            server.active -= 1
+        if first:
+            self.send_response(500)
+            self.end_headers()
+            return
+        days = pd.date_range(query["start"][0], query["end"][0], tz="UTC")
+        candles = [
+            {
+                "start": day.isoformat(), "end": day.isoformat(),
+                "low": 9.0 + i, "high": 11.0 + i, "open": 10.0 + i,
+                "close": 10.5 + i, "volume": 1000, "VWAP": 10.2 + i
+            }
+            for i, day in enumerate(days)
+        ]
+        body = json.dumps(candles).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class TestConcurrentFetcher(unittest.TestCase):
+    """
+    Test the ConcurrentFetcher, and the QuestradeBarPriceHandler
+    using it, against a local fake candle server.
+    """
+    def setUp(self):
+        self.server = FakeCandleServer()
+        self.thread = threading.Thread(
+            target=self.server.serve_forever, kwargs={"poll_interval": 0.05}
+        )
+        self.thread.daemon = True
+        self.thread.start()
+        self.cache_dir = tempfile.mkdtemp()
+        self.tickers = ["T%d" % i for i in range(12)]
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        shutil.rmtree(self.cache_dir)
+
+    def _fetch(self, ticker, start, end):
+        url = "http://127.0.0.1:%d/candles?ticker=%s&start=%s&end=%s" % (
+            self.server.server_address[1], ticker, start, end
+        )
+        with urlopen(url, timeout=5) as response:
+            return json.loads(response.read().decode())
+
+    def _fetcher(self, **kwargs):
+        return ConcurrentFetcher(
+            self._fetch, max_workers=4, backoff=0.01,
+            cache_dir=self.cache_dir, **kwargs
+        )
+
+    def test_concurrent_retried_and_cached(self):
+        fetcher = self._fetcher()
+        history = fetcher.fetch_many(self.tickers, "2020-01-01", "2020-01-10")
+        self.assertEqual(sorted(history), sorted(self.tickers))
+        self.assertEqual(len(history["T0"]), 10)
+        # Every ticker failed once and was retried
+        self.assertEqual(self.server.requests, {t: 2 for t in self.tickers})
+        self.assertGreater(self.server.peak, 1)
+        self.assertLessEqual(self.server.peak, 4)
+        # The responses are now served from the cache
+        self.assertEqual(
+            fetcher.fetch_many(self.tickers, "2020-01-01", "2020-01-10"),
+            history
+        )
+        self.assertEqual(self.server.requests, {t: 2 for t in self.tickers})
+        fetcher.fetch_one("T0", "2020-01-01", "2020-01-05")
+        self.assertEqual(self.server.requests["T0"], 3)
+
+    def test_failures_left_out(self):
+        fetcher = self._fetcher(retries=0)
+        history = fetcher.fetch_many(["T0", "T1"], "2020-01-01", "2020-01-10")
+        self.assertEqual(history, {})
+
+    def test_rate_limit(self):
+        fetcher = self._fetcher(rate=50.0)
+        start = time.monotonic()
+        fetcher.fetch_many(self.tickers[:5], "2020-01-01", "2020-01-02")
+        # Ten requests are spaced 1/50s apart
+        self.assertGreaterEqual(time.monotonic() - start, 9 / 50.0)
+
+    def test_price_handler(self):
+        events_queue = queue.Queue()
+        price_handler = QuestradeBarPriceHandler(
+            events_queue, ["T1", "T0"],
+            start_date=pd.Timestamp("2020-01-02", tz="UTC"),
+            end_date=pd.Timestamp("2020-01-05", tz="UTC"),
+            fetcher=self._fetcher()
+        )
+        self.assertEqual(sorted(price_handler.tickers), ["T0", "T1"])
+        bars = []
+        while price_handler.continue_backtest:
+            price_handler.stream_next()
+            while not events_queue.empty():
+                bars.append(events_queue.get(False))
+        self.assertEqual(
+            [(bar.time.day, bar.ticker) for bar in bars],
+            [(2, "T0"), (2, "T1"), (3, "T0"), (3, "T1"), (4, "T0"), (4, "T1")]
+        )
+        self.assertEqual(bars[0].close_price, 105000000)
+        self.assertIsInstance(bars[0].time, datetime.datetime)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,234 @@
+import datetime
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+import pandas as pd
+from munch import munchify
+
+from qstrader import settings
+from qstrader.dispatcher import BacktestEventQueue
+from qstrader.event import BarEvent, EventType, TickEvent
+from qstrader.indicators import (
+    ATR, Donchian, EMA, IndicatorRegistry, RollingCovariance,
+    RollingMax, RollingMin, RollingStd, SMA
+)
+from qstrader.price_handler.yahoo_daily_csv_bar import YahooDailyCsvBarPriceHandler
+from qstrader.strategy.base import AbstractStrategy
+from qstrader.trading_session import TradingSession
+
+
+def stream(indicator, *series):
+    """
+    Returns the values of the indicator after each update,
+    with NaN while it is not ready.
+    """
+    values = []
+    for args in zip(*series):
+        value = indicator.update(*args)
+        values.append(np.nan if value is None else value)
+    return np.array(values)
+
+
+class TestIndicators(unittest.TestCase):
+    """
+    Test the streaming indicators against the equivalent
+    pandas and NumPy window calculations.
+    """
+    def setUp(self):
+        rnd = np.random.RandomState(42)
+        # Integer (PriceParser) prices around $100, with a long
+        # flat stretch and a jump to test the running updates
+        close = 1000000000 + np.cumsum(
+            rnd.randint(-20000000, 20000000, 500)
+        )
+        close[200:260] = close[200]
+        close[300:] += 5000000000
+        self.close = close
+        self.high = close + rnd.randint(0, 10000000, 500)
+        self.low = close - rnd.randint(0, 10000000, 500)
+
+    def test_sma(self):
+        expected = pd.Series(self.close).rolling(20).mean().values
+        np.testing.assert_allclose(stream(SMA(20), self.close), expected)
+
+    def test_ema(self):
+        close = pd.Series(self.close, dtype=float)
+        seeded = close.copy()
+        seeded.iloc[:10] = np.nan
+        seeded.iloc[9] = close.iloc[:10].mean()
+        expected = seeded.ewm(span=10, adjust=False, ignore_na=True).mean()
+        expected.iloc[:9] = np.nan
+        np.testing.assert_allclose(
+            stream(EMA(10), self.close), expected.values
+        )
+
+    def test_rolling_std(self):
+        close = self.close / 1e7
+        windows = np.lib.stride_tricks.sliding_window_view(close, 30)
+        for ddof in (0, 1):
+            expected = np.concatenate([
+                np.full(29, np.nan), windows.std(axis=1, ddof=ddof)
+            ])
+            np.testing.assert_allclose(
+                stream(RollingStd(30, ddof), close), expected,
+                rtol=1e-9, atol=1e-9
+            )
+        # The flat stretch has no deviation
+        self.assertAlmostEqual(stream(RollingStd(30), close)[259], 0.0)
+
+    def test_rolling_max_min(self):
+        for window in (1, 5, 50):
+            np.testing.assert_array_equal(
+                stream(RollingMax(window), self.close),
+                pd.Series(self.close).rolling(window).max().values
+            )
+            np.testing.assert_array_equal(
+                stream(RollingMin(window), self.close),
+                pd.Series(self.close).rolling(window).min().values
+            )
+
+    def test_atr(self):
+        prev_close = pd.Series(self.close).shift(1)
+        true_range = pd.concat([
+            pd.Series(self.high - self.low),
+            (pd.Series(self.high) - prev_close).abs(),
+            (pd.Series(self.low) - prev_close).abs(),
+        ], axis=1).max(axis=1)
+        expected = [np.nan] * 13 + [true_range.iloc[:14].mean()]
+        for value in true_range.iloc[14:]:
+            expected.append(expected[-1] + (value - expected[-1]) / 14)
+        np.testing.assert_allclose(
+            stream(ATR(14), self.high, self.low, self.close), expected
+        )
+
+    def test_donchian(self):
+        donchian = Donchian(20)
+        for high, low in zip(self.high, self.low):
+            donchian.update(high, low)
+        upper = self.high[-20:].max()
+        lower = self.low[-20:].min()
+        self.assertEqual(donchian.value, (upper, (upper + lower) / 2.0, lower))
+
+    def test_rolling_covariance(self):
+        x = np.diff(np.log(self.close))
+        y = 0.5 * x + np.random.RandomState(1).normal(0, 0.01, len(x))
+        expected = pd.Series(x).rolling(60).cov(pd.Series(y)).values
+        np.testing.assert_allclose(
+            stream(RollingCovariance(60), x, y), expected,
+            rtol=1e-9, atol=1e-15
+        )
+
+    def test_window(self):
+        with self.assertRaises(ValueError):
+            SMA(0)
+        with self.assertRaises(ValueError):
+            RollingStd(1)
+
+
+class TestIndicatorRegistry(unittest.TestCase):
+    """
+    Test that the registry updates the indicators of the
+    ticker of each bar with their fields.
+    """
+    def bar(self, ticker, high, low, close):
+        return BarEvent(
+            ticker, pd.Timestamp("2020-01-02"), 86400,
+            close, high, low, close, 1000
+        )
+
+    def test_update(self):
+        registry = IndicatorRegistry()
+        sma = registry.subscribe("SPY", "sma", SMA(2))
+        atr = registry.subscribe("SPY", "atr", ATR(2))
+        high = registry.subscribe("SPY", "high", RollingMax(2), ["high_price"])
+        other = registry.subscribe("AGG", "sma", SMA(1))
+
+        registry.update(self.bar("SPY", 12, 9, 10))
+        registry.update(self.bar("SPY", 14, 11, 13))
+        registry.update(TickEvent("SPY", pd.Timestamp("2020-01-03"), 1, 2))
+
+        self.assertEqual(registry.value("SPY", "sma"), 11.5)
+        self.assertIs(registry["SPY", "atr"], atr)
+        self.assertEqual(atr.value, 3.5)
+        self.assertEqual(high.value, 14)
+        self.assertEqual(sma.count, 2)
+        self.assertIsNone(other.value)
+        self.assertIn(("AGG", "sma"), registry)
+
+        registry.unsubscribe("SPY", "sma")
+        registry.update(self.bar("SPY", 20, 19, 20))
+        self.assertNotIn(("SPY", "sma"), registry)
+        self.assertEqual(sma.count, 2)
+        self.assertEqual(high.value, 20)
+
+    def test_fields_required(self):
+        with self.assertRaises(ValueError):
+            IndicatorRegistry().subscribe("SPY", "cov", RollingCovariance(10))
+
+
+class RecordingStrategy(AbstractStrategy):
+    """
+    Records the moving average of each ticker as of each bar.
+    """
+    def __init__(self, tickers, window):
+        self.indicators = IndicatorRegistry()
+        for ticker in tickers:
+            self.indicators.subscribe(ticker, "sma", SMA(window))
+        self.values = {ticker: [] for ticker in tickers}
+
+    def calculate_signals(self, event, portfolio_handler):
+        if event.type == EventType.BAR:
+            value = self.indicators.value(event.ticker, "sma")
+            self.values[event.ticker].append(
+                np.nan if value is None else value
+            )
+
+
+class TestSessionIndicators(unittest.TestCase):
+    """
+    Test that the session updates the indicators of a strategy
+    with each bar, before the strategy receives it.
+    """
+    def setUp(self):
+        self.out_dir = tempfile.mkdtemp()
+        self.config = munchify({
+            "CSV_DATA_DIR": settings.TEST.CSV_DATA_DIR,
+            "OUTPUT_DIR": self.out_dir
+        })
+
+    def tearDown(self):
+        shutil.rmtree(self.out_dir)
+
+    def test_session(self):
+        tickers = ["SPY", "AGG"]
+        start_date = datetime.datetime(2010, 1, 1)
+        end_date = datetime.datetime(2011, 1, 1)
+        for batch_bars in (False, True):
+            events_queue = BacktestEventQueue()
+            price_handler = YahooDailyCsvBarPriceHandler(
+                self.config.CSV_DATA_DIR, events_queue, tickers,
+                start_date=start_date, end_date=end_date,
+                columnar=batch_bars, batch_bars=batch_bars
+            )
+            strategy = RecordingStrategy(tickers, 10)
+            session = TradingSession(
+                self.config, strategy, tickers, 10000.0,
+                start_date, end_date, events_queue,
+                price_handler=price_handler, title=["Indicators"]
+            )
+            session._run_session()
+            for ticker in tickers:
+                close = price_handler.tickers_data[ticker]["Close"]
+                close = close.loc[start_date:end_date]
+                expected = pd.Series(
+                    (close.values * 1e7).astype(np.int64)
+                ).rolling(10).mean().values
+                np.testing.assert_allclose(
+                    strategy.values[ticker], expected
+                )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,135 @@
+import datetime
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+
+from munch import munchify
+
+from qstrader.compat import queue
+from qstrader.compliance.base import AbstractCompliance
+from qstrader.event import SignalEvent, TickEvent
+from qstrader.price_handler.base import AbstractTickPriceHandler
+from qstrader.price_handler.ring_buffer import TickRingBuffer
+from qstrader.profiling import LatencyStats
+from qstrader.strategy.base import AbstractStrategy
+from qstrader.trading_session import TradingSession
+from qstrader import settings
+
+
+class FakeStreamPriceHandler(AbstractTickPriceHandler):
+    """
+    Streams the quotes fed by another thread, as a live price
+    handler receiving them from a broker would.
+    """
+    def __init__(self, events_queue, tickers):
+        self.events_queue = events_queue
+        self.continue_backtest = True
+        self.buffer = TickRingBuffer()
+        self.last_arrival = None
+        self.tickers = {ticker: {} for ticker in tickers}
+
+    def feed(self, ticker, bid, ask):
+        self.buffer.put(
+            ticker, TickEvent(ticker, datetime.datetime.now(), bid, ask)
+        )
+
+    def stream_next(self):
+        tev = self.buffer.get()
+        if tev is not None:
+            self.last_arrival = self.buffer.last_put_time
+            self._store_event(tev)
+            self.events_queue.put(tev)
+
+    def wait_for_prices(self, timeout):
+        return self.buffer.wait(timeout)
+
+
+class EveryFifthTickStrategy(AbstractStrategy):
+    def __init__(self, events_queue):
+        self.events_queue = events_queue
+        self.ticks = 0
+
+    def calculate_signals(self, event, agent=None):
+        self.ticks += 1
+        if self.ticks % 5 == 0:
+            self.events_queue.put(SignalEvent(event.ticker, "BOT", 10))
+
+
+class NoCompliance(AbstractCompliance):
+    def record_trade(self, fill):
+        pass
+
+
+class TestLiveSession(unittest.TestCase):
+    """
+    Test that a live session blocks while idle, rather than
+    spinning, and records the latency of every quote.
+    """
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.config = munchify({
+            "CSV_DATA_DIR": settings.TEST.CSV_DATA_DIR,
+            "OUTPUT_DIR": self.tmp_dir
+        })
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_live_loop(self):
+        events_queue = queue.Queue()
+        price_handler = FakeStreamPriceHandler(events_queue, ["GBPUSD"])
+        strategy = EveryFifthTickStrategy(events_queue)
+        session = TradingSession(
+            self.config, strategy, ["GBPUSD"], 100000.0, None, None,
+            events_queue, session_type="live",
+            end_session_time=datetime.datetime.now() + datetime.timedelta(
+                seconds=0.8
+            ),
+            price_handler=price_handler, compliance=NoCompliance(),
+            title=["Live"], max_wait=0.2
+        )
+
+        def stream():
+            for i in range(20):
+                price_handler.feed("GBPUSD", 13000000 + i, 13001000 + i)
+                time.sleep(0.01)
+
+        thread = threading.Thread(target=stream)
+        start = time.time()
+        cpu_start = time.process_time()
+        thread.start()
+        session._run_session()
+        thread.join()
+        cpu = time.process_time() - cpu_start
+        elapsed = time.time() - start
+
+        self.assertEqual(strategy.ticks, 20)
+        self.assertEqual(session.latency["quote_to_dispatch"].count, 20)
+        self.assertEqual(session.latency["quote_to_signal"].count, 4)
+        self.assertEqual(
+            len(session.portfolio_handler.portfolio.positions), 1
+        )
+        self.assertLess(elapsed, 1.5)
+        # A spinning loop would use the CPU for the whole session
+        self.assertLess(cpu, 0.4)
+
+
+class TestLatencyStats(unittest.TestCase):
+    def test_summary(self):
+        latency = LatencyStats("Test", maxlen=3)
+        self.assertEqual(latency.summary()["count"], 0)
+        for value in [0.004, 0.001, 0.002, 0.003]:
+            latency.record(value)
+        summary = latency.summary()
+        self.assertEqual(summary["count"], 4)
+        self.assertAlmostEqual(summary["mean"], 0.0025)
+        self.assertEqual(summary["max"], 0.004)
+        # The percentiles are of the most recent latencies
+        self.assertAlmostEqual(summary["p50"], 0.002)
+        self.assertIn("Test: 4", str(latency))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,125 @@
+import datetime
+import os
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from qstrader.compat import queue
+from qstrader.price_handler.memmap_tick import MemmapTickPriceHandler
+from qstrader.price_handler.tick_store import TickStore, TICK_DTYPE
+from qstrader.price_parser import PriceParser
+
+
+class TestMemmapTickPriceHandler(unittest.TestCase):
+    """
+    Test that ticks written to a TickStore from CSV files are
+    streamed by the MemmapTickPriceHandler in the same (time,
+    then ticker) order, and with the same prices, as merging
+    and sorting the CSV files in pandas.
+    """
+    def setUp(self):
+        self.csv_dir = tempfile.mkdtemp()
+        self.store_dir = os.path.join(self.csv_dir, "store")
+        rnd = np.random.RandomState(42)
+        self.frames = []
+        files = {
+            "GOOG": ["GOOG_20160201.csv", "GOOG_20160202.csv"],
+            "AMZN": ["AMZN.csv"],
+            "MSFT": ["MSFT_20160201.csv"],
+        }
+        for ticker, names in files.items():
+            for day, name in enumerate(names):
+                # Whole-second times so that tickers share timestamps
+                seconds = np.sort(rnd.choice(3600, 200, replace=False))
+                times = pd.Timestamp("2016-02-01") + pd.Timedelta(days=day) + \
+                    pd.to_timedelta(seconds, unit="s")
+                bids = np.round(rnd.uniform(100.0, 110.0, len(times)), 5)
+                df = pd.DataFrame({
+                    "Ticker": ticker,
+                    "Time": times.strftime("%d.%m.%Y %H:%M:%S.%f").str[:-3],
+                    "Bid": ["%0.5f" % bid for bid in bids],
+                    "Ask": ["%0.5f" % (bid + 0.02) for bid in bids],
+                })
+                df.to_csv(os.path.join(self.csv_dir, name), index=False)
+                self.frames.append(pd.DataFrame({
+                    "ticker": ticker, "time": times,
+                    "bid": PriceParser.parse_array(df["Bid"].astype(float).values),
+                    "ask": PriceParser.parse_array(df["Ask"].astype(float).values),
+                }))
+        self.expected = pd.concat(self.frames).sort_values(
+            ["time", "ticker"], kind="mergesort"
+        ).reset_index(drop=True)
+        TickStore(self.store_dir).write_csv_dir(
+            self.csv_dir, ["GOOG", "AMZN", "MSFT"], chunksize=50
+        )
+
+    def tearDown(self):
+        shutil.rmtree(self.csv_dir)
+
+    def _stream_all(self, **kwargs):
+        events_queue = queue.Queue()
+        price_handler = MemmapTickPriceHandler(
+            self.store_dir, events_queue, ["GOOG", "AMZN", "MSFT"], **kwargs
+        )
+        events = []
+        while price_handler.continue_backtest:
+            price_handler.stream_next()
+            while not events_queue.empty():
+                events.append(events_queue.get(False))
+        return price_handler, events
+
+    def test_store(self):
+        store = TickStore(self.store_dir)
+        self.assertEqual(store.tickers, ["GOOG", "AMZN", "MSFT"])
+        ticks = store.open("GOOG")
+        self.assertIsInstance(ticks, np.memmap)
+        self.assertEqual(ticks.dtype, TICK_DTYPE)
+        self.assertEqual(len(ticks), 400)
+        self.assertTrue(np.all(ticks["ticker_id"] == 0))
+        self.assertEqual(
+            os.path.getsize(os.path.join(self.store_dir, "GOOG.ticks")),
+            400 * TICK_DTYPE.itemsize
+        )
+
+    def test_stream_merged_ticks(self):
+        price_handler, events = self._stream_all(block_size=16)
+        self.assertEqual(len(events), len(self.expected))
+        self.assertEqual(
+            [(e.time, e.ticker, e.bid, e.ask) for e in events],
+            list(self.expected[["time", "ticker", "bid", "ask"]].itertuples(
+                index=False, name=None
+            ))
+        )
+        self.assertIsInstance(events[0].bid, int)
+        last = self.expected[self.expected["ticker"] == "GOOG"].iloc[-1]
+        self.assertEqual(
+            price_handler.get_best_bid_ask("GOOG"), (last["bid"], last["ask"])
+        )
+
+    def test_date_range(self):
+        start = datetime.datetime(2016, 2, 1, 0, 30)
+        end = datetime.datetime(2016, 2, 2, 0, 10)
+        price_handler, events = self._stream_all(
+            start_date=start, end_date=end
+        )
+        expected = self.expected[
+            (self.expected["time"] >= start) & (self.expected["time"] < end)
+        ]
+        self.assertEqual(len(events), len(expected))
+        self.assertEqual(events[0].time, expected["time"].iloc[0])
+
+    def test_unordered_csv(self):
+        path = os.path.join(self.csv_dir, "AMZN.csv")
+        df = pd.read_csv(path)
+        df.iloc[::-1].to_csv(path, index=False)
+        with self.assertRaises(ValueError):
+            TickStore(self.store_dir).write_csv("AMZN", [path])
+        # The previously written ticks are left intact
+        self.assertEqual(len(TickStore(self.store_dir).open("AMZN")), 200)
+
+
+if __name__ == "__main__":
+    unittest.main()
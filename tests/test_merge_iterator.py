@@ -0,0 +1,86 @@
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from qstrader.price_handler.iterator.merge import MergedTickerRowIterator
+
+
+class TestMergedTickerRowIterator(unittest.TestCase):
+    """
+    Test that the k-way merge of per-ticker DataFrames streams
+    the same rows, in the same (timestamp, then ticker) order, as
+    concatenating every frame and sorting the result.
+    """
+    def setUp(self):
+        rnd = np.random.RandomState(7)
+        self.tickers_data = {}
+        for ticker in ["MSFT", "AMZN", "GOOG", "AAPL"]:
+            # Few distinct days so that tickers share timestamps
+            days = np.sort(rnd.choice(60, 40, replace=False))
+            index = pd.Timestamp("2016-01-01") + pd.to_timedelta(days, unit="D")
+            df = pd.DataFrame({
+                "Close": np.round(rnd.uniform(10.0, 20.0, len(index)), 2),
+                "Volume": rnd.randint(1, 10000, len(index)),
+            }, index=pd.DatetimeIndex(index, name="Date"))
+            df["Ticker"] = ticker
+            self.tickers_data[ticker] = df
+
+    def _concat_sort(self, start_date=None, end_date=None):
+        df = pd.concat(self.tickers_data.values()).sort_index()
+        start = None
+        end = None
+        if start_date is not None:
+            start = df.index.searchsorted(start_date)
+        if end_date is not None:
+            end = df.index.searchsorted(end_date)
+        df['colFromIndex'] = df.index
+        df = df.sort_values(by=["colFromIndex", "Ticker"])
+        return [
+            (index, row["Ticker"], row["Close"], row["Volume"])
+            for index, row in df.iloc[start:end].iterrows()
+        ]
+
+    def _merged(self, start_date=None, end_date=None):
+        return [
+            (index, row["Ticker"], row["Close"], row["Volume"])
+            for index, row in MergedTickerRowIterator(
+                self.tickers_data, start_date, end_date
+            )
+        ]
+
+    def test_merge_matches_concat_sort(self):
+        merged = self._merged()
+        self.assertEqual(len(merged), 160)
+        self.assertEqual(merged, self._concat_sort())
+
+    def test_date_range(self):
+        start_date = pd.Timestamp("2016-01-10")
+        end_date = pd.Timestamp("2016-02-10")
+        merged = self._merged(start_date, end_date)
+        self.assertEqual(merged, self._concat_sort(start_date, end_date))
+        self.assertTrue(all(
+            start_date <= row[0] < end_date for row in merged
+        ))
+        self.assertEqual(self._merged(start_date), self._concat_sort(start_date))
+        self.assertEqual(
+            self._merged(end_date=end_date),
+            self._concat_sort(end_date=end_date)
+        )
+
+    def test_unsorted_ticker_frame(self):
+        self.tickers_data["GOOG"] = self.tickers_data["GOOG"].iloc[::-1]
+        self.assertEqual(self._merged(), self._concat_sort())
+
+    def test_lazy(self):
+        merged = MergedTickerRowIterator(self.tickers_data)
+        index, row = next(merged)
+        self.assertEqual(index, min(
+            df.index[0] for df in self.tickers_data.values()
+        ))
+        self.assertEqual(len(list(merged)), 159)
+        self.assertRaises(StopIteration, next, merged)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,85 @@
+from itertools import groupby
+import unittest
+
+import numpy as np
+import pandas as pd
+
+import qstrader.statistics.performance as perf
+
+
+def loop_create_drawdowns(returns):
+    """
+    The original loop-based implementation of create_drawdowns,
+    used as the reference for the vectorised one.
+    """
+    idx = returns.index
+    hwm = np.zeros(len(idx))
+    for t in range(1, len(idx)):
+        hwm[t] = max(hwm[t - 1], returns.iloc[t])
+    perf = pd.DataFrame(index=idx)
+    perf["Drawdown"] = (hwm - returns) / hwm
+    perf.loc[perf.index[0], "Drawdown"] = 0.0
+    perf["DurationCheck"] = np.where(perf["Drawdown"] == 0, 0, 1)
+    duration = max(
+        sum(1 for i in g if i == 1)
+        for k, g in groupby(perf["DurationCheck"])
+    )
+    return perf["Drawdown"], np.max(perf["Drawdown"]), duration
+
+
+class TestCreateDrawdowns(unittest.TestCase):
+    """
+    Test that the vectorised create_drawdowns returns the same
+    drawdown series, maximum drawdown and duration as the
+    original loop-based implementation.
+    """
+    def setUp(self):
+        rnd = np.random.RandomState(42)
+        idx = pd.date_range("2010-01-01", periods=2000, freq="D")
+        returns = pd.Series(rnd.normal(0.0003, 0.01, len(idx)), index=idx)
+        self.curve = np.exp(np.log(1 + returns).cumsum())
+
+    def assertMatchesLoop(self, curve):
+        dd, dd_max, dd_dur = perf.create_drawdowns(curve)
+        dd_l, dd_max_l, dd_dur_l = loop_create_drawdowns(curve)
+        pd.testing.assert_series_equal(dd, dd_l)
+        self.assertEqual(dd_max, dd_max_l)
+        self.assertEqual(dd_dur, dd_dur_l)
+
+    def test_matches_loop(self):
+        self.assertMatchesLoop(self.curve)
+        self.assertMatchesLoop(self.curve.iloc[:1])
+        self.assertMatchesLoop(self.curve * 0.0 + 1.0)
+
+    def test_missing_values(self):
+        curve = self.curve.copy()
+        curve.iloc[[1, 10, 11, 500, 1999]] = np.nan
+        self.assertMatchesLoop(curve)
+
+    def test_episodes(self):
+        curve = pd.Series(
+            [1.0, 1.0, 1.1, 1.0, 0.9, 1.0, 1.2, 1.1, 1.15],
+            index=pd.date_range("2016-01-01", periods=9, freq="D")
+        )
+        dd, dd_max, dd_dur, episodes = perf.create_drawdowns(
+            curve, episodes=True
+        )
+        self.assertEqual(dd_dur, 3)
+        idx = curve.index
+        self.assertEqual(list(episodes["start"]), [idx[3], idx[7]])
+        self.assertEqual(list(episodes["trough"]), [idx[4], idx[7]])
+        self.assertEqual(episodes["recovery"].iloc[0], idx[6])
+        self.assertTrue(pd.isnull(episodes["recovery"].iloc[1]))
+        self.assertEqual(list(episodes["duration"]), [3, 2])
+        self.assertAlmostEqual(episodes["drawdown"].max(), dd_max)
+
+        dd, dd_max, dd_dur, episodes = perf.create_drawdowns(
+            self.curve, episodes=True
+        )
+        self.assertEqual(episodes["duration"].max(), dd_dur)
+        self.assertEqual(episodes["drawdown"].max(), dd_max)
+        self.assertEqual(episodes["duration"].sum(), (dd != 0).sum())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -100,5 +100,86 @@ class TestAmazonGooglePortfolio(unittest.TestCase):
         self.assertEqual(PriceParser.display(self.portfolio.realised_pnl), -899.50)
 
 
+class MutablePriceHandlerMock(AbstractTickPriceHandler):
+    def __init__(self):
+        self.prices = {
+            "GOOG": (PriceParser.parse(705.46), PriceParser.parse(705.46)),
+            "AMZN": (PriceParser.parse(564.14), PriceParser.parse(565.14)),
+            "MSFT": (PriceParser.parse(50.28), PriceParser.parse(50.31)),
+        }
+
+    def get_best_bid_ask(self, ticker):
+        return self.prices[ticker]
+
+
+class TestIncrementalPortfolioValuation(unittest.TestCase):
+    """
+    Test that revaluing only the position whose ticker has
+    just ticked keeps the equity and unrealised PnL identical
+    to a full revaluation of every open position.
+    """
+    def setUp(self):
+        self.ph = MutablePriceHandlerMock()
+        self.portfolio = Portfolio(self.ph, PriceParser.parse(500000.00))
+
+    def assertMatchesFullRevaluation(self):
+        equity = self.portfolio.equity
+        unrealised_pnl = self.portfolio.unrealised_pnl
+        self.portfolio._update_portfolio()
+        self.assertEqual(equity, self.portfolio.equity)
+        self.assertEqual(unrealised_pnl, self.portfolio.unrealised_pnl)
+
+    def test_incremental_updates(self):
+        self.portfolio.transact_position(
+            "BOT", "AMZN", 100,
+            PriceParser.parse(566.56), PriceParser.parse(1.00)
+        )
+        self.portfolio.transact_position(
+            "SLD", "GOOG", 200,
+            PriceParser.parse(707.50), PriceParser.parse(1.00)
+        )
+        self.assertMatchesFullRevaluation()
+
+        self.ph.prices["AMZN"] = (
+            PriceParser.parse(570.10), PriceParser.parse(570.30)
+        )
+        self.portfolio._update_position_value("AMZN")
+        self.assertMatchesFullRevaluation()
+
+        # Ticks for tickers which are not held change nothing
+        equity = self.portfolio.equity
+        self.ph.prices["MSFT"] = (
+            PriceParser.parse(51.00), PriceParser.parse(51.02)
+        )
+        self.portfolio._update_position_value("MSFT")
+        self.assertEqual(equity, self.portfolio.equity)
+
+        self.ph.prices["GOOG"] = (
+            PriceParser.parse(690.00), PriceParser.parse(690.10)
+        )
+        self.portfolio._update_position_value("GOOG")
+        self.assertMatchesFullRevaluation()
+
+        self.portfolio.transact_position(
+            "BOT", "GOOG", 50,
+            PriceParser.parse(690.10), PriceParser.parse(1.00)
+        )
+        self.assertMatchesFullRevaluation()
+
+        self.portfolio.transact_position(
+            "SLD", "AMZN", 100,
+            PriceParser.parse(570.10), PriceParser.parse(1.00)
+        )
+        self.assertMatchesFullRevaluation()
+        self.assertEqual(len(self.portfolio.closed_positions), 1)
+        self.assertEqual(
+            self.portfolio.equity,
+            self.portfolio.init_cash + self.portfolio.realised_pnl +
+            self.portfolio.positions["GOOG"].market_value -
+            self.portfolio.positions["GOOG"].cost_basis +
+            self.portfolio.positions["GOOG"].realised_pnl
+        )
+
+
 if __name__ == "__main__":
     unittest.main()
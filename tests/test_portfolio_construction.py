@@ -0,0 +1,180 @@
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from qstrader.event import BarEvent
+from qstrader.portfolio_construction import (
+    EWMeanCovariance, EWMoments, MaxSharpePortfolio
+)
+from qstrader.price_handler.history import PriceHistory
+from qstrader.price_parser import PriceParser
+
+
+def random_prices(days=400, seed=42):
+    rnd = np.random.RandomState(seed)
+    returns = rnd.multivariate_normal(
+        [0.0008, 0.0003, 0.0005],
+        [[1e-4, 2e-5, 3e-5], [2e-5, 4e-5, 1e-5], [3e-5, 1e-5, 2e-4]],
+        days
+    )
+    return pd.DataFrame(
+        100.0 * np.exp(np.cumsum(returns, axis=0)),
+        index=pd.date_range("2015-01-01", periods=days, freq="D"),
+        columns=["SPY", "AGG", "GOOG"]
+    )
+
+
+def record(history, prices, day):
+    for ticker in prices.columns:
+        history.record(BarEvent(
+            ticker, prices.index[day], 86400, None, None, None,
+            PriceParser.parse(float(prices[ticker].iloc[day])), 0
+        ))
+
+
+class TestEWMeanCovariance(unittest.TestCase):
+    """
+    Test the incremental exponentially weighted estimates against
+    pandas over the whole history.
+    """
+    def setUp(self):
+        self.prices = random_prices()
+        self.tickers = list(self.prices.columns)
+
+    def test_moments(self):
+        x = np.random.RandomState(1).normal(size=(100, 3))
+        moments = EWMoments(0.1, 3)
+        for row in x:
+            moments.update(row)
+        frame = pd.DataFrame(x)
+        np.testing.assert_allclose(
+            moments.mean, frame.ewm(alpha=0.1).mean().iloc[-1].values
+        )
+        np.testing.assert_allclose(
+            moments.covariance,
+            frame.ewm(alpha=0.1).cov(bias=True).loc[99].values
+        )
+
+    def test_estimate_from_history(self):
+        history = PriceHistory(50)
+        estimator = EWMeanCovariance(self.tickers, span_mean=100, span_cov=60)
+        for day in range(len(self.prices)):
+            record(history, self.prices, day)
+            # Estimated part way through the bars of the day
+            if day % 30 == 0:
+                estimator.estimate(history)
+        mu, cov = estimator.estimate(history)
+
+        closes = pd.DataFrame(
+            PriceParser.parse_array(self.prices.values) /
+            float(PriceParser.PRICE_MULTIPLIER),
+            columns=self.tickers
+        )
+        returns = closes.pct_change().dropna()
+        expected_mu = (
+            1.0 + returns.ewm(span=100).mean().iloc[-1]
+        ) ** 252 - 1.0
+        expected_cov = returns.ewm(span=60).cov(bias=True).iloc[-3:] * 252
+        np.testing.assert_allclose(mu.values, expected_mu.values)
+        np.testing.assert_allclose(cov.values, expected_cov.values)
+        self.assertEqual(list(cov.columns), self.tickers)
+
+    def test_provisional_row(self):
+        """
+        Test that the latest (partial) row is not consumed, so
+        that its remaining bars are included once they arrive.
+        """
+        history = PriceHistory(10)
+        estimator = EWMeanCovariance(["SPY", "AGG"], 10, 10)
+        prices = self.prices[["SPY", "AGG"]]
+        for day in range(5):
+            record(history, prices, day)
+        mu, cov = estimator.estimate(history)
+        self.assertEqual(estimator.returns_moments.count, 3)
+        self.assertEqual(estimator.cov_moments.count, 3)
+
+        complete = EWMeanCovariance(["SPY", "AGG"], 10, 10)
+        record(history, prices, 5)
+        complete_mu, _ = complete.estimate(history)
+        updated_mu, _ = estimator.estimate(history)
+        np.testing.assert_allclose(updated_mu.values, complete_mu.values)
+
+    def test_too_few_returns(self):
+        history = PriceHistory(10)
+        record(history, self.prices, 0)
+        record(history, self.prices, 1)
+        self.assertEqual(
+            EWMeanCovariance(self.tickers).estimate(history), (None, None)
+        )
+
+    def test_dropped_rows(self):
+        """
+        Test that rows leaving the history before being consumed
+        are refused, rather than silently skipped.
+        """
+        history = PriceHistory(5)
+        estimator = EWMeanCovariance(self.tickers)
+        for day in range(4):
+            record(history, self.prices, day)
+        estimator.estimate(history)
+        for day in range(4, 8):
+            record(history, self.prices, day)
+        estimator.estimate(history)
+        for day in range(8, 20):
+            record(history, self.prices, day)
+        with self.assertRaises(ValueError):
+            estimator.estimate(history)
+
+
+class TestMaxSharpePortfolio(unittest.TestCase):
+    """
+    Test that the weights are solved once per timestamp, and that
+    they maximise the Sharpe ratio.
+    """
+    def test_memoized(self):
+        prices = random_prices(days=100)
+        history = PriceHistory(200)
+        portfolio = MaxSharpePortfolio(list(prices.columns))
+        for day in range(len(prices)):
+            record(history, prices, day)
+            timestamp = prices.index[day]
+            if day % 20 == 19:
+                weights = [
+                    portfolio.weights(history, timestamp)
+                    for ticker in prices.columns
+                ]
+                self.assertTrue(all(w is weights[0] for w in weights))
+                self.assertAlmostEqual(sum(weights[0].values()), 1.0, 4)
+                self.assertTrue(min(weights[0].values()) >= 0.0)
+        self.assertEqual(portfolio.solves, 5)
+
+    def test_tangency(self):
+        """
+        Test that with an interior optimum the weights are those of
+        the tangency portfolio, proportional to inv(cov) (mu - rf).
+        """
+        mu = pd.Series([0.10, 0.06], index=["SPY", "AGG"])
+        cov = pd.DataFrame(
+            [[0.04, 0.002], [0.002, 0.01]], index=mu.index, columns=mu.index
+        )
+        portfolio = MaxSharpePortfolio(["SPY", "AGG"])
+        tangency = np.linalg.solve(cov.values, mu.values - 0.02)
+        tangency /= tangency.sum()
+        weights = portfolio._clean(portfolio._optimise(mu, cov))
+        np.testing.assert_allclose(
+            [weights["SPY"], weights["AGG"]], tangency, atol=1e-3
+        )
+
+    def test_clean(self):
+        portfolio = MaxSharpePortfolio(["SPY", "AGG"], cutoff=0.01)
+        self.assertEqual(
+            portfolio._clean(np.array([0.995, 0.005])),
+            {"SPY": 1.0, "AGG": 0.0}
+        )
+        self.assertIsNone(portfolio._clean(np.array([0.001, 0.001])))
+        self.assertIsNone(portfolio._clean(np.array([np.nan, 0.5])))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,273 @@
+import datetime
+import shutil
+import tempfile
+import unittest
+
+from munch import munchify
+
+from examples.monthly_rebalance_backtest import MonthlyRebalanceStrategy
+from qstrader import settings
+from qstrader.dispatcher import BacktestEventQueue
+from qstrader.event import (
+    BarEvent, EventType, OrderBatchEvent, OrderEvent, SignalEvent
+)
+from qstrader.execution_handler.ib_simulated import IBSimulatedExecutionHandler
+from qstrader.portfolio import Portfolio
+from qstrader.portfolio_handler import PortfolioHandler
+from qstrader.price_handler.base import AbstractTickPriceHandler
+from qstrader.price_handler.yahoo_daily_csv_bar import YahooDailyCsvBarPriceHandler
+from qstrader.price_parser import PriceParser
+from qstrader.risk_manager.example import ExampleRiskManager
+from qstrader.signal_sizer.rebalance import PortfolioRebalanceSignalSizer
+from qstrader.trading_session import TradingSession
+
+
+class PriceHandlerMock(AbstractTickPriceHandler):
+    def __init__(self):
+        self.tickers = {
+            "AAA": {"bid": PriceParser.parse(50.00), "ask": PriceParser.parse(50.00)},
+            "BBB": {"bid": PriceParser.parse(100.00), "ask": PriceParser.parse(100.00)},
+            "CCC": {"bid": PriceParser.parse(20.00), "ask": PriceParser.parse(20.00)},
+        }
+
+    def get_last_timestamp(self, ticker):
+        return datetime.datetime(2020, 1, 31)
+
+
+FILL_ATTRS = (
+    "timestamp", "ticker", "action", "quantity",
+    "exchange", "price", "commission"
+)
+
+
+class TestPortfolioRebalanceSignalSizer(unittest.TestCase):
+    """
+    Test that a rebalance is sized against a single equity
+    snapshot, with the sells first and the buys cash-limited.
+    """
+    def setUp(self):
+        self.portfolio = Portfolio(
+            PriceHandlerMock(), PriceParser.parse(1000.00)
+        )
+        # 10 AAA and 5 CCC at cost, leaving $400 of cash
+        self.portfolio.transact_position(
+            "BOT", "AAA", 10, PriceParser.parse(50.00), 0
+        )
+        self.portfolio.transact_position(
+            "BOT", "CCC", 5, PriceParser.parse(20.00), 0
+        )
+
+    def test_size_portfolio(self):
+        sizer = PortfolioRebalanceSignalSizer({"BBB": 0.6, "AAA": 0.4})
+        signals = sizer.size_portfolio(self.portfolio)
+        self.assertEqual(
+            [(s.ticker, s.action, s.suggested_quantity) for s in signals],
+            [("AAA", "SLD", 2), ("CCC", "SLD", 5), ("BBB", "BOT", 6)]
+        )
+
+    def test_independent_of_order(self):
+        weights = {"AAA": 0.3, "BBB": 0.3, "CCC": 0.4}
+        reordered = {"CCC": 0.4, "BBB": 0.3, "AAA": 0.3}
+        sized = [
+            sorted(
+                (s.ticker, s.action, s.suggested_quantity)
+                for s in PortfolioRebalanceSignalSizer(w).size_portfolio(
+                    self.portfolio
+                )
+            ) for w in (weights, reordered)
+        ]
+        self.assertEqual(sized[0], sized[1])
+
+    def test_cash_limited(self):
+        """
+        Test that the buys, including commission, do not exceed
+        the cash, the first ticker short of it (CCC, after the
+        commission of the sells and of BBB) taking the rest.
+        """
+        sizer = PortfolioRebalanceSignalSizer(
+            {"BBB": 0.5, "CCC": 0.5},
+            IBSimulatedExecutionHandler.calculate_ib_commission_array
+        )
+        signals = sizer.size_portfolio(self.portfolio)
+        self.assertEqual(
+            [(s.ticker, s.action, s.suggested_quantity) for s in signals],
+            [("AAA", "SLD", 10), ("BBB", "BOT", 5), ("CCC", "BOT", 19)]
+        )
+
+    def test_size_signal(self):
+        sizer = PortfolioRebalanceSignalSizer({"BBB": 0.6, "AAA": 0.4})
+        signal = sizer.size_signal(self.portfolio, SignalEvent("CCC", "EXIT"))
+        self.assertEqual((signal.action, signal.suggested_quantity), ("SLD", 5))
+
+    def test_short_position(self):
+        """
+        Test that a freshly opened short position, whose quantity
+        is unsigned, is sized from its (signed) net holding.
+        """
+        self.portfolio.transact_position(
+            "SLD", "BBB", 2, PriceParser.parse(100.00), 0
+        )
+        sizer = PortfolioRebalanceSignalSizer({"AAA": 0.5, "BBB": 0.1})
+        signals = sizer.size_portfolio(self.portfolio)
+        self.assertEqual(
+            [(s.ticker, s.action, s.suggested_quantity) for s in signals],
+            [("CCC", "SLD", 5), ("BBB", "BOT", 3)]
+        )
+        # Unweighted, the short is covered rather than added to
+        sizer = PortfolioRebalanceSignalSizer({"AAA": 0.5})
+        signals = sizer.size_portfolio(self.portfolio)
+        self.assertIn(("BBB", "BOT", 2), [
+            (s.ticker, s.action, s.suggested_quantity) for s in signals
+        ])
+
+    def test_tickers(self):
+        """
+        Test that only the given tickers are traded, leaving the
+        positions of the others as they are.
+        """
+        sizer = PortfolioRebalanceSignalSizer({"BBB": 0.6, "AAA": 0.4})
+        signals = sizer.size_portfolio(self.portfolio, ["BBB", "AAA"])
+        self.assertEqual(
+            [(s.ticker, s.action, s.suggested_quantity) for s in signals],
+            [("AAA", "SLD", 2), ("BBB", "BOT", 5)]
+        )
+        self.assertEqual(sizer.size_portfolio(self.portfolio, []), [])
+
+
+class TestOrderBatch(unittest.TestCase):
+    """
+    Test that a rebalance is sent as one OrderBatchEvent, whose
+    fills are those of its orders executed one at a time.
+    """
+    def setUp(self):
+        self.events_queue = BacktestEventQueue()
+        self.price_handler = PriceHandlerMock()
+        self.portfolio_handler = PortfolioHandler(
+            PriceParser.parse(1000.00), self.events_queue,
+            self.price_handler, ExampleRiskManager()
+        )
+        self.portfolio_handler.portfolio.transact_position(
+            "BOT", "AAA", 10, PriceParser.parse(50.00), 0
+        )
+        self.execution_handler = IBSimulatedExecutionHandler(
+            self.events_queue, self.price_handler
+        )
+
+    def test_rebalance(self):
+        batch = self.portfolio_handler.rebalance(
+            PortfolioRebalanceSignalSizer({"BBB": 0.5, "CCC": 0.5})
+        )
+        self.assertEqual(self.events_queue.get(), batch)
+        self.assertTrue(self.events_queue.empty())
+        self.assertEqual(batch.type, EventType.ORDER_BATCH)
+        self.assertEqual(
+            [(o.ticker, o.action, o.quantity) for o in batch],
+            [("AAA", "SLD", 10), ("BBB", "BOT", 5), ("CCC", "BOT", 25)]
+        )
+
+        self.execution_handler.execute_order_batch(batch)
+        fills = [self.events_queue.get() for _ in range(len(batch))]
+        for order in batch:
+            self.execution_handler.execute_order(order)
+        expected = [self.events_queue.get() for _ in range(len(batch))]
+        for fill, other in zip(fills, expected):
+            self.assertEqual(fill.type, EventType.FILL)
+            for attr in FILL_ATTRS:
+                self.assertEqual(getattr(fill, attr), getattr(other, attr))
+
+    def test_nothing_to_rebalance(self):
+        sizer = PortfolioRebalanceSignalSizer({"AAA": 0.5})
+        self.assertIsNone(self.portfolio_handler.rebalance(sizer))
+        self.assertTrue(self.events_queue.empty())
+        self.assertEqual(len(OrderBatchEvent([OrderEvent("AAA", "BOT", 1)])), 1)
+
+
+class PortfolioHandlerMock(object):
+    def __init__(self):
+        self.rebalances = []
+
+    def rebalance(self, signal_sizer, tickers=None):
+        self.rebalances.append(tickers)
+
+
+class TestMonthlyRebalanceStrategy(unittest.TestCase):
+    """
+    Test that the strategy rebalances once per month end, and
+    only the tickers with a bar if any is missing one.
+    """
+    def bar(self, ticker, day):
+        return BarEvent(
+            ticker, datetime.datetime(2020, 1, day), 86400, 1, 1, 1, 1, 1
+        )
+
+    def test_rebalances(self):
+        strategy = MonthlyRebalanceStrategy(
+            ["SPY", "AGG"], None, {"SPY": 0.5, "AGG": 0.5}
+        )
+        portfolio_handler = PortfolioHandlerMock()
+        for ticker, day in [
+            ("SPY", 30), ("AGG", 30), ("SPY", 31), ("AGG", 31)
+        ]:
+            strategy.calculate_signals(
+                self.bar(ticker, day), portfolio_handler
+            )
+        self.assertEqual(portfolio_handler.rebalances, [None])
+
+    def test_missing_bar(self):
+        strategy = MonthlyRebalanceStrategy(
+            ["SPY", "AGG"], None, {"SPY": 0.5, "AGG": 0.5}
+        )
+        portfolio_handler = PortfolioHandlerMock()
+        strategy.calculate_signals(self.bar("SPY", 31), portfolio_handler)
+        self.assertEqual(portfolio_handler.rebalances, [])
+        strategy.calculate_signals(
+            BarEvent(
+                "SPY", datetime.datetime(2020, 2, 3), 86400, 1, 1, 1, 1, 1
+            ), portfolio_handler
+        )
+        self.assertEqual(portfolio_handler.rebalances, [["SPY"]])
+
+
+class TestSessionRebalance(unittest.TestCase):
+    """
+    Test that the monthly rebalance example holds the ticker
+    weights after rebalancing with batches of orders.
+    """
+    def setUp(self):
+        self.out_dir = tempfile.mkdtemp()
+        self.config = munchify({
+            "CSV_DATA_DIR": settings.TEST.CSV_DATA_DIR,
+            "OUTPUT_DIR": self.out_dir
+        })
+
+    def tearDown(self):
+        shutil.rmtree(self.out_dir)
+
+    def test_session(self):
+        tickers = ["SPY", "AGG", "GOOG"]
+        weights = {"SPY": 0.4, "AGG": 0.4, "GOOG": 0.2}
+        start_date = datetime.datetime(2015, 1, 1)
+        end_date = datetime.datetime(2016, 1, 1)
+        events_queue = BacktestEventQueue()
+        price_handler = YahooDailyCsvBarPriceHandler(
+            self.config.CSV_DATA_DIR, events_queue, tickers,
+            start_date=start_date, end_date=end_date
+        )
+        strategy = MonthlyRebalanceStrategy(tickers, events_queue, weights)
+        session = TradingSession(
+            self.config, strategy, tickers, 100000.0,
+            start_date, end_date, events_queue,
+            price_handler=price_handler, title=["Rebalance"]
+        )
+        session._run_session()
+        portfolio = session.portfolio_handler.portfolio
+        self.assertTrue(portfolio.cur_cash >= 0)
+        # Positions last rebalanced at the end of November
+        equity = PriceParser.display(portfolio.equity)
+        for ticker, weight in weights.items():
+            value = PriceParser.display(portfolio.positions[ticker].market_value)
+            self.assertAlmostEqual(value / equity, weight, delta=0.03)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,250 @@
+import datetime
+import random
+import shutil
+import tempfile
+import unittest
+
+from munch import munchify
+
+from examples.monthly_rebalance_backtest import MonthlyRebalanceStrategy
+from qstrader import settings
+from qstrader.dispatcher import BacktestEventQueue
+from qstrader.portfolio import Portfolio
+from qstrader.position import Position
+from qstrader.position_book import (
+    PositionBook, PositionView, ClosedPositionBook, POSITION_FIELDS
+)
+from qstrader.price_parser import PriceParser
+from qstrader.price_handler.base import AbstractTickPriceHandler
+from qstrader.price_handler.yahoo_daily_csv_bar import YahooDailyCsvBarPriceHandler
+from qstrader.trading_session import TradingSession
+
+
+class PriceHandlerMock(AbstractTickPriceHandler):
+    def __init__(self, tickers):
+        self.prices = {
+            ticker: (PriceParser.parse(100.00), PriceParser.parse(100.02))
+            for ticker in tickers
+        }
+
+    def get_best_bid_ask(self, ticker):
+        return self.prices[ticker]
+
+
+class TestPositionBook(unittest.TestCase):
+    """
+    Test that a PositionView behaves exactly as the
+    Position it was created from.
+    """
+    def setUp(self):
+        self.args = (
+            "BOT", "AMZN", 100,
+            PriceParser.parse(566.56), PriceParser.parse(1.00),
+            PriceParser.parse(566.27), PriceParser.parse(566.71)
+        )
+        self.position = Position(*self.args)
+        self.book = PositionBook(capacity=2)
+        self.book["AMZN"] = Position(*self.args)
+
+    def test_view_matches_position(self):
+        view = self.book["AMZN"]
+        self.assertIsInstance(view, PositionView)
+        self.assertEqual(view.as_dict(), self.position.__dict__)
+
+        for pt in (self.position, view):
+            pt.transact_shares(
+                "BOT", 200, PriceParser.parse(566.395), PriceParser.parse(1.00)
+            )
+            pt.transact_shares(
+                "SLD", 100, PriceParser.parse(565.83), PriceParser.parse(1.00)
+            )
+            pt.update_market_value(
+                PriceParser.parse(565.00), PriceParser.parse(565.10)
+            )
+        self.assertEqual(self.book["AMZN"].as_dict(), self.position.__dict__)
+
+    def test_non_integral_values(self):
+        """
+        Test that values which the int64 columns would truncate,
+        such as float commissions, are refused.
+        """
+        view = self.book["AMZN"]
+        with self.assertRaises(ValueError):
+            view.transact_shares("BOT", 100, PriceParser.parse(566.0), 1.5)
+        args = self.args[:4] + (0.25,) + self.args[5:]
+        with self.assertRaises(ValueError):
+            self.book["GOOG"] = Position(*args)
+        with self.assertRaises(ValueError):
+            self.book.update_market_values([5650000000.5], [5651000000])
+        # Integral floats are stored as integers
+        view.realised_pnl = 10.0
+        self.assertEqual(view.realised_pnl, 10)
+
+    def test_dictionary_interface(self):
+        self.assertIn("AMZN", self.book)
+        self.assertNotIn("GOOG", self.book)
+        self.assertIsNone(self.book.get("GOOG"))
+        self.assertEqual(list(self.book), ["AMZN"])
+        self.assertEqual(len(self.book), 1)
+
+        # Rows are grown beyond the initial capacity and recycled
+        for ticker in ("GOOG", "MSFT", "AAPL"):
+            self.book[ticker] = Position(
+                "SLD", ticker, 10,
+                PriceParser.parse(50.00), PriceParser.parse(1.00),
+                PriceParser.parse(49.90), PriceParser.parse(50.10)
+            )
+        self.assertEqual(self.book.capacity, 4)
+        self.assertEqual(self.book["AMZN"].as_dict(), self.position.__dict__)
+        closed = self.book.pop("GOOG")
+        self.assertEqual(closed.ticker, "GOOG")
+        self.assertEqual(len(self.book), 3)
+        self.book["IBM"] = Position(*self.args)
+        self.assertEqual(self.book.capacity, 4)
+        self.assertEqual(self.book["IBM"].action, "BOT")
+
+    def test_closed_positions(self):
+        closed = ClosedPositionBook(capacity=1)
+        closed.append(self.book.pop("AMZN"))
+        closed.append(self.position)
+        self.assertEqual(len(closed), 2)
+        self.assertEqual(closed[-1].as_dict(), self.position.__dict__)
+        self.assertEqual(
+            [p.ticker for p in closed], ["AMZN", "AMZN"]
+        )
+        df = closed.to_frame()
+        self.assertEqual(list(df.columns), list(self.position.__dict__))
+        for name in POSITION_FIELDS:
+            self.assertEqual(df[name].iloc[1], getattr(self.position, name))
+
+
+class TestPositionBookPortfolio(unittest.TestCase):
+    """
+    Test that a Portfolio storing its Positions in a
+    PositionBook gives identical results to one storing
+    them as Position objects.
+    """
+    def setUp(self):
+        self.tickers = ["T%03d" % i for i in range(100)]
+        self.ph = PriceHandlerMock(self.tickers)
+        cash = PriceParser.parse(10000000.00)
+        self.portfolio = Portfolio(self.ph, cash)
+        self.book_portfolio = Portfolio(self.ph, cash, position_book=True)
+
+    def assertPortfoliosEqual(self):
+        for attr in ("cur_cash", "equity", "realised_pnl", "unrealised_pnl"):
+            self.assertEqual(
+                getattr(self.portfolio, attr),
+                getattr(self.book_portfolio, attr)
+            )
+        self.assertEqual(
+            sorted(self.portfolio.positions),
+            sorted(self.book_portfolio.positions)
+        )
+        for ticker, pt in self.portfolio.positions.items():
+            self.assertEqual(
+                self.book_portfolio.positions[ticker].as_dict(), pt.__dict__
+            )
+        self.assertEqual(
+            [p.__dict__ for p in self.portfolio.closed_positions],
+            [p.as_dict() for p in self.book_portfolio.closed_positions]
+        )
+
+    def test_random_trades(self):
+        rnd = random.Random(42)
+        for i in range(2000):
+            ticker = rnd.choice(self.tickers)
+            action = rnd.choice(("BOT", "SLD"))
+            quantity = rnd.randint(1, 3) * 100
+            pt = self.portfolio.positions.get(ticker)
+            if pt is not None:
+                # Add to, reduce or close out the position
+                # without reversing its direction
+                opening = "BOT" if pt.net > 0 else "SLD"
+                closing = "SLD" if pt.net > 0 else "BOT"
+                if rnd.random() < 0.3:
+                    action, quantity = closing, abs(pt.net)
+                elif action == closing:
+                    quantity = min(quantity, abs(pt.net))
+                else:
+                    action = opening
+            price = PriceParser.parse(rnd.uniform(90.0, 110.0))
+            commission = PriceParser.parse(1.00)
+            for portfolio in (self.portfolio, self.book_portfolio):
+                portfolio.transact_position(
+                    action, ticker, quantity, price, commission
+                )
+            if i % 100 == 0:
+                bid = PriceParser.parse(rnd.uniform(90.0, 110.0))
+                self.ph.prices[ticker] = (bid, bid + PriceParser.parse(0.02))
+                for portfolio in (self.portfolio, self.book_portfolio):
+                    portfolio._update_position_value(ticker)
+        self.assertPortfoliosEqual()
+        self.assertGreater(len(self.book_portfolio.closed_positions), 64)
+
+        # Vectorised full revaluation of the book
+        for ticker in self.tickers:
+            bid = PriceParser.parse(rnd.uniform(90.0, 110.0))
+            self.ph.prices[ticker] = (bid, bid + PriceParser.parse(0.03))
+        self.portfolio._update_portfolio()
+        self.book_portfolio._update_portfolio()
+        self.assertPortfoliosEqual()
+
+
+class TestSessionPositionBook(unittest.TestCase):
+    """
+    Test that a backtest with its Positions in a PositionBook
+    has exactly the equity of one with a dictionary of Positions.
+    """
+    def setUp(self):
+        self.out_dir = tempfile.mkdtemp()
+        self.config = munchify({
+            "CSV_DATA_DIR": settings.TEST.CSV_DATA_DIR,
+            "OUTPUT_DIR": self.out_dir
+        })
+
+    def tearDown(self):
+        shutil.rmtree(self.out_dir)
+
+    def run_session(self, position_book):
+        tickers = ["SPY", "AGG", "GOOG"]
+        weights = {"SPY": 0.4, "AGG": 0.4, "GOOG": 0.2}
+        start_date = datetime.datetime(2014, 1, 1)
+        end_date = datetime.datetime(2016, 1, 1)
+        events_queue = BacktestEventQueue()
+        price_handler = YahooDailyCsvBarPriceHandler(
+            self.config.CSV_DATA_DIR, events_queue, tickers,
+            start_date=start_date, end_date=end_date
+        )
+        session = TradingSession(
+            self.config, MonthlyRebalanceStrategy(
+                tickers, events_queue, weights
+            ), tickers, 100000.0, start_date, end_date, events_queue,
+            price_handler=price_handler, title=["Position book"],
+            position_book=position_book
+        )
+        session._run_session()
+        return session
+
+    def test_equity_matches(self):
+        book = self.run_session(True)
+        positions = book.portfolio_handler.portfolio.positions
+        self.assertIsInstance(positions, PositionBook)
+        self.assertEqual(len(positions), 3)
+        self.assertIsInstance(
+            book.portfolio_handler.portfolio.closed_positions,
+            ClosedPositionBook
+        )
+        dicts = self.run_session(False)
+        self.assertIsInstance(dicts.portfolio_handler.portfolio.positions, dict)
+        equity = book.statistics.equity.series()
+        self.assertGreater(equity.nunique(), 1)
+        self.assertTrue(equity.equals(dicts.statistics.equity.series()))
+        self.assertEqual(
+            book.portfolio_handler.portfolio.cur_cash,
+            dicts.portfolio_handler.portfolio.cur_cash
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,99 @@
+import datetime
+import os
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+
+from qstrader.compat import queue
+from qstrader.price_handler.cache import CsvPriceCache
+from qstrader.price_handler.yahoo_daily_csv_bar import YahooDailyCsvBarPriceHandler
+from qstrader.price_parser import PriceParser
+from qstrader import settings
+
+
+class TestCsvPriceCache(unittest.TestCase):
+    """
+    Test that price handlers reading CSV files through a
+    CsvPriceCache emit exactly the same events as those
+    parsing the CSV files directly, and that the cache is
+    invalidated whenever a CSV file changes.
+    """
+    def setUp(self):
+        self.csv_dir = tempfile.mkdtemp()
+        self.tickers = ["SPY", "AGG"]
+        for ticker in self.tickers:
+            shutil.copy(
+                os.path.join(settings.TEST.CSV_DATA_DIR, "%s.csv" % ticker),
+                self.csv_dir
+            )
+
+    def tearDown(self):
+        shutil.rmtree(self.csv_dir)
+
+    def _stream_all(self, price_cache=None, columnar=False):
+        events_queue = queue.Queue()
+        price_handler = YahooDailyCsvBarPriceHandler(
+            self.csv_dir, events_queue, self.tickers,
+            start_date=datetime.datetime(2010, 1, 1),
+            end_date=datetime.datetime(2011, 1, 1),
+            columnar=columnar, price_cache=price_cache
+        )
+        events = []
+        while price_handler.continue_backtest:
+            price_handler.stream_next()
+            while not events_queue.empty():
+                events.append(str(events_queue.get(False)))
+        return events
+
+    def test_cached_events_identical(self):
+        events = self._stream_all()
+        cache = CsvPriceCache()
+        self.assertEqual(self._stream_all(price_cache=cache), events)
+        self.assertEqual(len(cache.misses), 2)
+        self.assertTrue(os.path.exists(os.path.join(
+            self.csv_dir, ".price_cache", "SPY.csv", "meta.json"
+        )))
+        self.assertEqual(self._stream_all(price_cache=cache), events)
+        self.assertEqual(
+            self._stream_all(price_cache=cache, columnar=True), events
+        )
+        self.assertEqual(len(cache.hits), 4)
+        self.assertEqual(
+            cache.report(), "CsvPriceCache: 4 hits, 2 misses (SPY.csv, AGG.csv)"
+        )
+
+    def test_integer_prices(self):
+        cache = CsvPriceCache(cache_dir=os.path.join(self.csv_dir, "cache"))
+        path = os.path.join(self.csv_dir, "SPY.csv")
+        kwargs = dict(header=0, parse_dates=True, index_col=0)
+        for i in range(2):
+            df = cache.read_csv(path, ("Open", "Close"), **kwargs)
+            self.assertEqual(df["Open"].dtype, np.int64)
+            self.assertEqual(df["Volume"].dtype, np.int64)
+            self.assertEqual(df["Open"].iloc[0], PriceParser.parse(43.96875))
+            self.assertEqual(df.index[0], datetime.datetime(1993, 1, 29))
+        self.assertEqual((len(cache.misses), len(cache.hits)), (1, 1))
+
+    def test_changed_csv_invalidates(self):
+        cache = CsvPriceCache()
+        path = os.path.join(self.csv_dir, "AGG.csv")
+        kwargs = dict(header=0, parse_dates=True, index_col=0)
+        rows = len(cache.read_csv(path, ("Close",), **kwargs))
+        with open(path) as csv_file:
+            lines = csv_file.readlines()
+        with open(path, "w") as csv_file:
+            csv_file.writelines(lines[:-10])
+        self.assertEqual(
+            len(cache.read_csv(path, ("Close",), **kwargs)), rows - 10
+        )
+        self.assertEqual(len(cache.misses), 2)
+        self.assertEqual(
+            len(cache.read_csv(path, ("Close",), **kwargs)), rows - 10
+        )
+        self.assertEqual(len(cache.hits), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,135 @@
+import datetime
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from qstrader import settings
+from qstrader.dispatcher import BacktestEventQueue
+from qstrader.event import BarBatchEvent, BarEvent
+from qstrader.price_handler.history import PriceHistory
+from qstrader.price_handler.yahoo_daily_csv_bar import YahooDailyCsvBarPriceHandler
+from qstrader.price_parser import PriceParser
+
+
+def bar(ticker, day, close, volume=100):
+    close = PriceParser.parse(float(close))
+    spread = PriceParser.parse(1.0)
+    return BarEvent(
+        ticker, pd.Timestamp("2020-01-01") + pd.Timedelta(days=day),
+        86400, close, close + spread, close - spread, close, volume
+    )
+
+
+class TestPriceHistory(unittest.TestCase):
+    """
+    Test the ring buffer of the bars of the last lookback
+    timestamps, and its windowed views.
+    """
+    def test_wraps_and_views(self):
+        history = PriceHistory(4)
+        for day in range(10):
+            history.record(bar("SPY", day, 100 + day))
+            history.record(bar("AGG", day, 50 + day))
+        self.assertEqual(len(history), 4)
+        self.assertEqual(history.tickers, ["SPY", "AGG"])
+
+        closes = history.history()
+        np.testing.assert_array_equal(
+            closes, [[106, 56], [107, 57], [108, 58], [109, 59]]
+        )
+        np.testing.assert_array_equal(
+            history.history("SPY", lookback=2), [108, 109]
+        )
+        np.testing.assert_array_equal(
+            history.history(["AGG"], "volume", 1), [[100]]
+        )
+        # Adjacent tickers are viewed rather than copied, read-only
+        self.assertTrue(np.shares_memory(closes, history.data["close_price"]))
+        self.assertTrue(np.shares_memory(
+            history.history("AGG"), history.data["close_price"]
+        ))
+        with self.assertRaises(ValueError):
+            closes[0, 0] = 0.0
+        reordered = history.history(["AGG", "SPY"], lookback=1)
+        np.testing.assert_array_equal(reordered, [[59, 109]])
+        self.assertFalse(
+            np.shares_memory(reordered, history.data["close_price"])
+        )
+
+        self.assertEqual(
+            list(history.index()),
+            list(pd.date_range("2020-01-07", periods=4, freq="D"))
+        )
+        frame = history.history_frame(["SPY"], "high_price", 3)
+        self.assertEqual(list(frame.columns), ["SPY"])
+        self.assertEqual(frame["SPY"].tolist(), [108.0, 109.0, 110.0])
+
+    def test_carry_forward_and_new_tickers(self):
+        history = PriceHistory(3, tickers=["SPY"])
+        history.record(bar("SPY", 0, 100))
+        history.record(bar("SPY", 1, 101))
+        for ticker in ("T%d" % i for i in range(10)):
+            history.record(bar(ticker, 1, 10))
+        history.record(bar("T9", 2, 11))
+        closes = history.history_frame()
+        self.assertEqual(len(closes.columns), 11)
+        self.assertEqual(closes["SPY"].tolist(), [100.0, 101.0, 101.0])
+        self.assertTrue(np.isnan(closes["T9"].iloc[0]))
+        self.assertEqual(closes["T9"].tolist()[1:], [10.0, 11.0])
+        self.assertEqual(closes["T0"].tolist()[1:], [10.0, 10.0])
+
+    def test_record_batch(self):
+        bars = PriceHistory(5)
+        batches = PriceHistory(5)
+        for day in range(7):
+            events = [bar("SPY", day, 100 + day), bar("AGG", day, 50 - day)]
+            for event in events:
+                bars.record(event)
+            batches.record_batch(BarBatchEvent(
+                events[0].time, 86400, ["SPY", "AGG"],
+                *[
+                    np.array([getattr(event, field) for event in events])
+                    for field in (
+                        "open_price", "high_price", "low_price",
+                        "close_price", "volume"
+                    )
+                ]
+            ))
+        for field in bars.fields:
+            np.testing.assert_array_equal(
+                bars.history(field=field), batches.history(field=field)
+            )
+        self.assertTrue(np.isnan(batches.history(field="adj_close_price")).all())
+
+
+class TestPriceHandlerHistory(unittest.TestCase):
+    """
+    Test that a price handler with its history enabled keeps
+    the closes of the bars it has streamed.
+    """
+    def test_yahoo_history(self):
+        tickers = ["SPY", "AGG"]
+        start_date = datetime.datetime(2010, 1, 1)
+        end_date = datetime.datetime(2010, 7, 1)
+        for batch_bars in (False, True):
+            price_handler = YahooDailyCsvBarPriceHandler(
+                settings.TEST.CSV_DATA_DIR, BacktestEventQueue(), tickers,
+                start_date=start_date, end_date=end_date,
+                columnar=batch_bars, batch_bars=batch_bars
+            )
+            history = price_handler.enable_history(20)
+            while price_handler.continue_backtest:
+                price_handler.stream_next()
+            expected = pd.DataFrame({
+                ticker: price_handler.tickers_data[ticker]["Close"]
+                for ticker in tickers
+            }).loc[start_date:end_date - datetime.timedelta(days=1)].iloc[-20:]
+            np.testing.assert_allclose(
+                history.history(tickers), expected.values, rtol=1e-9
+            )
+            self.assertTrue(history.index().equals(expected.index))
+
+
+if __name__ == "__main__":
+    unittest.main()
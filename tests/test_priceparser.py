@@ -1,5 +1,6 @@
 import unittest
 import numpy as np
+import pandas as pd
 from qstrader.price_parser import PriceParser
 from qstrader.compat import PY2
 
@@ -59,5 +60,96 @@ class TestPriceParser(unittest.TestCase):
         self.assertEqual(displayed, 10.12)
 
 
+class TestPriceParserArrays(unittest.TestCase):
+    def setUp(self):
+        self.floats = np.array([10.1234567, 10.0, 0.513393, 683.56001])
+        self.ints = np.array([200, 101234567, 5133930], dtype=np.int64)
+
+    def test_parse_array_matches_parse(self):
+        parsed = PriceParser.parse_array(self.floats)
+        self.assertEqual(parsed.dtype, np.int64)
+        self.assertEqual(
+            parsed.tolist(), [PriceParser.parse(x) for x in self.floats]
+        )
+
+    def test_parse_array_passes_through_ints(self):
+        parsed = PriceParser.parse_array(self.ints)
+        self.assertEqual(parsed.dtype, np.int64)
+        self.assertEqual(parsed.tolist(), self.ints.tolist())
+
+    def test_parse_array_from_series(self):
+        series = pd.Series(self.floats, index=list("abcd"), name="Close")
+        parsed = PriceParser.parse_array(series)
+        self.assertIsInstance(parsed, pd.Series)
+        self.assertEqual(list(parsed.index), list("abcd"))
+        self.assertEqual(parsed.name, "Close")
+        self.assertEqual(parsed["a"], 101234567)
+
+    def test_parse_array_from_strings(self):
+        parsed = PriceParser.parse_array(["10.1234567", "10.0"])
+        self.assertEqual(parsed.tolist(), [101234567, 100000000])
+
+    def test_parse_array_missing(self):
+        with self.assertRaises(ValueError):
+            PriceParser.parse_array(np.array([1.0, np.nan]))
+
+    def test_display_array_matches_display(self):
+        displayed = PriceParser.display_array(self.ints)
+        self.assertEqual(
+            displayed.tolist(), [PriceParser.display(x) for x in self.ints]
+        )
+        displayed = PriceParser.display_array(self.ints, 5)
+        self.assertEqual(
+            displayed.tolist(),
+            [PriceParser.display(x, 5) for x in self.ints]
+        )
+
+    def test_unparsed_display_array(self):
+        displayed = PriceParser.display_array(self.floats)
+        self.assertEqual(displayed.tolist(), [10.12, 10.0, 0.51, 683.56])
+
+    def test_display_array_from_series(self):
+        series = pd.Series(self.ints)
+        displayed = PriceParser.display_array(series)
+        self.assertIsInstance(displayed, pd.Series)
+        self.assertEqual(displayed[1], 10.12)
+
+    def test_scalar_matches_dispatch(self):
+        for x in (
+            200, np.int64(200), 10.1234567, 10.0,
+            np.float64(10.1234567), "10.1234567"
+        ):
+            self.assertEqual(PriceParser.parse_scalar(x), PriceParser.parse(x))
+            self.assertEqual(
+                type(PriceParser.parse_scalar(x)), type(PriceParser.parse(x))
+            )
+        for x in (101234567, np.int64(101234567), 10.1234567):
+            self.assertEqual(
+                PriceParser.display_scalar(x), PriceParser.display(x)
+            )
+            self.assertEqual(
+                PriceParser.display_scalar(x, 5), PriceParser.display(x, 5)
+            )
+        with self.assertRaises(ValueError):
+            PriceParser.parse_scalar(np.nan)
+
+    def test_scalar_integer_types(self):
+        """
+        Test that every integer type is treated as an integer
+        price, as by the array methods.
+        """
+        for dtype in (np.int32, np.uint32, np.uint64):
+            self.assertEqual(PriceParser.parse_scalar(dtype(5)), 5)
+            self.assertEqual(
+                PriceParser.parse_scalar(dtype(5)),
+                PriceParser.parse_array(np.array([5], dtype))[0]
+            )
+            self.assertEqual(PriceParser.display_scalar(dtype(50000000)), 5.0)
+            self.assertEqual(
+                PriceParser.display_scalar(dtype(50000000)),
+                PriceParser.display_array(np.array([50000000], dtype))[0]
+            )
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,117 @@
+import threading
+import unittest
+
+from qstrader.compat import queue
+from qstrader.event import TickEvent
+from qstrader.price_handler.ring_buffer import TickRingBuffer
+
+try:
+    import trading_ig  # noqa: F401
+except ImportError:
+    trading_ig = None
+
+
+class FakeClock(object):
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestTickRingBuffer(unittest.TestCase):
+    """
+    Test that the TickRingBuffer delivers updates in the order
+    they were put, conflates each full ticker to its latest
+    updates and accounts for every update and its latency.
+    """
+    def test_order_conflation_and_latency(self):
+        clock = FakeClock()
+        buffer = TickRingBuffer(maxlen=2, clock=clock)
+        for i, ticker in enumerate(["A", "B", "A", "A", "B"]):
+            clock.now = float(i)
+            buffer.put(ticker, (ticker, i))
+        clock.now = 10.0
+        delivered = []
+        while True:
+            event = buffer.get()
+            if event is None:
+                break
+            delivered.append(event)
+        # The first update of A was conflated away
+        self.assertEqual(delivered, [("B", 1), ("A", 2), ("A", 3), ("B", 4)])
+        stats = buffer.stats()
+        self.assertEqual(stats["received"], 5)
+        self.assertEqual(stats["delivered"], 4)
+        self.assertEqual(stats["conflated"], 1)
+        self.assertEqual(stats["pending"], 0)
+        self.assertEqual(stats["max_latency"], 9.0)
+        self.assertEqual(stats["mean_latency"], (9.0 + 8.0 + 7.0 + 6.0) / 4)
+
+    def test_fake_stream_thread(self):
+        """
+        A fake stream thread bursts quotes while the consumer
+        drains them, without any update being unaccounted for.
+        """
+        buffer = TickRingBuffer(maxlen=64)
+        tickers = ["GBPUSD", "EURUSD", "USDJPY"]
+        done = threading.Event()
+
+        def stream():
+            for i in range(30000):
+                ticker = tickers[i % 3]
+                buffer.put(ticker, TickEvent(ticker, i, i, i + 1))
+            done.set()
+
+        thread = threading.Thread(target=stream)
+        thread.start()
+        last = {}
+        delivered = 0
+        while not done.is_set() or len(buffer):
+            event = buffer.get()
+            if event is None:
+                continue
+            delivered += 1
+            # Updates of each ticker stay in order
+            self.assertGreater(event.time, last.get(event.ticker, -1))
+            last[event.ticker] = event.time
+        thread.join()
+        stats = buffer.stats()
+        self.assertEqual(stats["received"], 30000)
+        self.assertEqual(stats["delivered"], delivered)
+        self.assertGreaterEqual(delivered + stats["conflated"], 30000)
+        # The latest quote of every ticker is always delivered
+        self.assertEqual(sorted(last.values()), [29997, 29998, 29999])
+
+    @unittest.skipIf(trading_ig is None, "trading_ig is not installed")
+    def test_ig_price_handler(self):
+        from qstrader.price_handler.ig import IGTickPriceHandler
+
+        class FakeLightstreamerClient(object):
+            def subscribe(self, subscription):
+                self.subscription = subscription
+
+        class FakeStreamService(object):
+            ls_client = FakeLightstreamerClient()
+
+        events_queue = queue.Queue()
+        price_handler = IGTickPriceHandler(
+            events_queue, FakeStreamService(), ["CS.D.GBPUSD.CFD.IP"],
+            buffer_size=2
+        )
+        for i in range(3):
+            price_handler.on_prices_update({
+                "name": "CS.D.GBPUSD.CFD.IP",
+                "values": {
+                    "UPDATE_TIME": "12:00:0%d" % i,
+                    "BID": "1.2%d" % i, "OFFER": "1.3%d" % i
+                }
+            })
+        for _ in range(3):
+            price_handler.stream_next()
+        self.assertEqual(events_queue.qsize(), 2)
+        self.assertEqual(price_handler.buffer.stats()["conflated"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
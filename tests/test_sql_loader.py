@@ -0,0 +1,128 @@
+import datetime
+import os
+import shutil
+import sqlite3
+import tempfile
+import unittest
+
+import pandas as pd
+
+from qstrader.compat import queue
+from qstrader.price_handler.questrade_daily_bar import (
+    QuestradeDatabaseBarPriceHandler
+)
+from qstrader.price_handler.sql_loader import (
+    ConnectionPool, SqlBarLoader, postgres_pool
+)
+from qstrader.price_parser import PriceParser
+
+
+class TestSqlBarLoader(unittest.TestCase):
+    """
+    Test the SqlBarLoader, and the QuestradeDatabaseBarPriceHandler
+    using it, against an SQLite stand-in of the candles table.
+    """
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.db_path = os.path.join(self.tmp_dir, "candles.db")
+        connection = sqlite3.connect(self.db_path)
+        connection.execute(
+            'CREATE TABLE "trading_app_candles" ('
+            'start_date TEXT, open_price REAL, high_price REAL, '
+            'low_price REAL, close_price REAL, volume INTEGER, '
+            'symbol_symbols_id TEXT)'
+        )
+        rows = []
+        for i, ticker in enumerate(["SPY", "AGG", "GOOG"]):
+            for day in range(10):
+                price = 100.0 + 10 * i + day
+                rows.append((
+                    "2020-01-%02d 00:00:00" % (day + 1), price, price + 1.0,
+                    price - 1.0, price + 0.5, 1000 * (day + 1), ticker
+                ))
+        connection.executemany(
+            'INSERT INTO "trading_app_candles" VALUES (?, ?, ?, ?, ?, ?, ?)',
+            rows
+        )
+        connection.commit()
+        connection.close()
+        self.connections = 0
+        self.queries = []
+
+        def connect():
+            self.connections += 1
+            connection = sqlite3.connect(self.db_path)
+            connection.set_trace_callback(self.queries.append)
+            return connection
+
+        self.pool = ConnectionPool(connect, maxconn=2)
+        self.loader = SqlBarLoader(self.pool, placeholder="?")
+
+    def tearDown(self):
+        self.pool.closeall()
+        shutil.rmtree(self.tmp_dir)
+
+    def _selects(self):
+        return [q for q in self.queries if q.startswith("SELECT")]
+
+    def test_load_date_range(self):
+        data = self.loader.load(
+            ["SPY", "GOOG", "MSFT"],
+            start_date=datetime.datetime(2020, 1, 3),
+            end_date=datetime.datetime(2020, 1, 8)
+        )
+        self.assertEqual(sorted(data), ["GOOG", "SPY"])
+        spy = data["SPY"]
+        self.assertEqual(
+            list(spy.columns),
+            ["Open", "High", "Low", "Close", "Volume", "Ticker"]
+        )
+        self.assertEqual(spy.index.name, "Date")
+        self.assertEqual(spy.index[0], pd.Timestamp("2020-01-03"))
+        self.assertEqual(spy.index[-1], pd.Timestamp("2020-01-07"))
+        self.assertEqual(list(data["GOOG"]["Close"]), [
+            122.5, 123.5, 124.5, 125.5, 126.5
+        ])
+        # Every ticker is read with a single query
+        self.assertEqual(len(self._selects()), 1)
+
+    def test_pooled_connections(self):
+        for _ in range(3):
+            self.loader.load(["SPY"])
+        self.assertEqual(self.connections, 1)
+        self.assertEqual(len(self._selects()), 3)
+
+    def test_price_handler(self):
+        events_queue = queue.Queue()
+        price_handler = QuestradeDatabaseBarPriceHandler(
+            events_queue, ["SPY", "AGG", "GOOG", "MSFT"],
+            start_date=datetime.datetime(2020, 1, 2),
+            end_date=datetime.datetime(2020, 1, 5),
+            loader=self.loader
+        )
+        self.assertEqual(len(self._selects()), 1)
+        self.assertEqual(sorted(price_handler.tickers), ["AGG", "GOOG", "SPY"])
+        bars = []
+        while price_handler.continue_backtest:
+            price_handler.stream_next()
+            while not events_queue.empty():
+                bars.append(events_queue.get(False))
+        self.assertEqual(
+            [(bar.time.day, bar.ticker) for bar in bars[:4]],
+            [(2, "AGG"), (2, "GOOG"), (2, "SPY"), (3, "AGG")]
+        )
+        self.assertEqual(len(bars), 9)
+        self.assertEqual(
+            price_handler.get_last_close("GOOG"), PriceParser.parse(123.5)
+        )
+
+    def test_postgres_settings(self):
+        pool = postgres_pool({"DB_HOST": "db.example.com", "DB_PORT": 5433})
+        self.assertIs(pool, postgres_pool({
+            "DB_HOST": "db.example.com", "DB_PORT": "5433"
+        }))
+        self.assertIsNot(pool, postgres_pool())
+
+
+if __name__ == "__main__":
+    unittest.main()
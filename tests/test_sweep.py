@@ -0,0 +1,115 @@
+import datetime
+import shutil
+import tempfile
+import unittest
+
+from munch import munchify
+
+from qstrader.dispatcher import BacktestEventQueue
+from qstrader.event import EventType, SignalEvent
+from qstrader.price_handler.yahoo_daily_csv_bar import YahooDailyCsvBarPriceHandler
+from qstrader.signal_sizer.naive import NaiveSignalSizer
+from qstrader.strategy.base import AbstractStrategy
+from qstrader.sweep import ParameterSweep, SweepCompliance, parameter_grid
+from qstrader.trading_session import TradingSession
+from qstrader import settings
+
+
+class PeriodicStrategy(AbstractStrategy):
+    """
+    Alternately buys and sells the ticker every period bars.
+    """
+    def __init__(self, ticker, events_queue, period, quantity):
+        self.ticker = ticker
+        self.events_queue = events_queue
+        self.period = period
+        self.quantity = quantity
+        self.bars = 0
+        self.invested = False
+
+    def calculate_signals(self, event, portfolio_handler):
+        if event.type == EventType.BAR and event.ticker == self.ticker:
+            if self.bars % self.period == 0:
+                action = "SLD" if self.invested else "BOT"
+                signal = NaiveSignalSizer(self.quantity).size_signal(
+                    portfolio_handler.portfolio,
+                    SignalEvent(self.ticker, action)
+                )
+                self.events_queue.put(signal)
+                self.invested = not self.invested
+            self.bars += 1
+
+
+def periodic_factory(events_queue, period, quantity):
+    return PeriodicStrategy("SPY", events_queue, period, quantity)
+
+
+class TestParameterSweep(unittest.TestCase):
+    """
+    Test that a sweep gives the same results whether run
+    inline or over a process pool, and the same results as
+    running each TradingSession on its own.
+    """
+    def setUp(self):
+        self.out_dir = tempfile.mkdtemp()
+        self.config = munchify({
+            "CSV_DATA_DIR": settings.TEST.CSV_DATA_DIR,
+            "OUTPUT_DIR": self.out_dir
+        })
+        self.start_date = datetime.datetime(2010, 1, 1)
+        self.end_date = datetime.datetime(2011, 1, 1)
+        self.param_grid = {"period": [5, 20], "quantity": [10, 50]}
+
+    def tearDown(self):
+        shutil.rmtree(self.out_dir)
+
+    def _sweep(self, processes):
+        return ParameterSweep(
+            self.config, periodic_factory, self.param_grid, ["SPY"],
+            equity=10000.0, start_date=self.start_date,
+            end_date=self.end_date, processes=processes
+        ).run()
+
+    def test_parameter_grid(self):
+        self.assertEqual(
+            parameter_grid(self.param_grid), [
+                {"period": 5, "quantity": 10},
+                {"period": 5, "quantity": 50},
+                {"period": 20, "quantity": 10},
+                {"period": 20, "quantity": 50},
+            ]
+        )
+
+    def test_inline_and_pool_identical(self):
+        inline = self._sweep(processes=1)
+        pooled = self._sweep(processes=2)
+        self.assertEqual(len(inline), 4)
+        self.assertTrue(inline.equals(pooled))
+        for column in (
+            "period", "quantity", "sharpe", "max_drawdown",
+            "max_drawdown_duration", "total_return", "trades"
+        ):
+            self.assertIn(column, inline.columns)
+        self.assertEqual(list(inline["trades"]), [25, 25, 6, 6])
+
+    def test_matches_single_session(self):
+        sweep = self._sweep(processes=1)
+        events_queue = BacktestEventQueue()
+        price_handler = YahooDailyCsvBarPriceHandler(
+            self.config.CSV_DATA_DIR, events_queue, ["SPY"],
+            start_date=self.start_date, end_date=self.end_date
+        )
+        session = TradingSession(
+            self.config, periodic_factory(events_queue, 20, 50), ["SPY"],
+            10000.0, self.start_date, self.end_date, events_queue,
+            price_handler=price_handler, compliance=SweepCompliance(),
+            title=["Single"]
+        )
+        results = session.start_trading(testing=True)
+        row = sweep.iloc[3]
+        self.assertEqual(row["sharpe"], results["sharpe"])
+        self.assertEqual(row["final_equity"], results["equity"].iloc[-1])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,214 @@
+import calendar
+import datetime
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+import pandas as pd
+from munch import munchify
+
+from qstrader.dispatcher import BacktestEventQueue
+from qstrader.event import EventType, SignalEvent
+from qstrader.execution_handler.ib_simulated import IBSimulatedExecutionHandler
+from qstrader.price_handler.yahoo_daily_csv_bar import YahooDailyCsvBarPriceHandler
+from qstrader.price_parser import PriceParser
+from qstrader.signal_sizer.weight import WeightComplexSignalSizer
+from qstrader.strategy.base import AbstractStrategy
+from qstrader.trading_session import TradingSession
+from qstrader.vectorized import TargetWeightBacktest
+from qstrader import settings
+
+
+def end_of_month(date):
+    return date.day == calendar.monthrange(date.year, date.month)[1]
+
+
+class MonthEndRebalanceStrategy(AbstractStrategy):
+    """
+    Rebalances every ticker to its weight on the bars falling
+    on the last day of a month.
+    """
+    def __init__(self, events_queue, ticker_weights):
+        self.events_queue = events_queue
+        self.signal_sizer = WeightComplexSignalSizer(ticker_weights)
+        self.invested = set()
+
+    def calculate_signals(self, event, portfolio_handler):
+        if event.type == EventType.BAR and end_of_month(event.time):
+            ticker = event.ticker
+            action = "REBALANCE" if ticker in self.invested else "BOT"
+            signal = self.signal_sizer.size_signal(
+                portfolio_handler.portfolio, SignalEvent(ticker, action)
+            )
+            if signal.suggested_quantity > 0:
+                self.events_queue.put(signal)
+                self.invested.add(ticker)
+
+
+class TestTargetWeightBacktest(unittest.TestCase):
+    """
+    Test the vectorised backtest of target weights against
+    hand-calculated fills and the event-driven TradingSession.
+    """
+    def setUp(self):
+        self.out_dir = tempfile.mkdtemp()
+        self.config = munchify({
+            "CSV_DATA_DIR": settings.TEST.CSV_DATA_DIR,
+            "OUTPUT_DIR": self.out_dir
+        })
+        self.start_date = datetime.datetime(2010, 1, 1)
+        self.end_date = datetime.datetime(2013, 1, 1)
+        self.spy = YahooDailyCsvBarPriceHandler.read_ticker_csv(
+            self.config.CSV_DATA_DIR, "SPY"
+        ).loc[self.start_date:self.end_date - datetime.timedelta(days=1)]
+
+    def tearDown(self):
+        shutil.rmtree(self.out_dir)
+
+    def test_commission_array(self):
+        """
+        Test that the commissions calculated at once match those
+        calculated one transaction at a time.
+        """
+        handler = IBSimulatedExecutionHandler(None, None)
+        quantities = np.array([1, 100, 499, 500, 1000, 2500, 100000])
+        prices = PriceParser.parse_array(
+            np.array([1.0, 25.37, 103.5, 210.11, 57.05, 12.0, 300.25])
+        )
+        expected = [
+            handler.calculate_ib_commission(quantity, price)
+            for quantity, price in zip(quantities.tolist(), prices.tolist())
+        ]
+        self.assertEqual(
+            IBSimulatedExecutionHandler.calculate_ib_commission_array(
+                quantities, prices
+            ).tolist(), expected
+        )
+
+    def test_buy_and_hold(self):
+        """
+        Test that a single full allocation buys as many whole
+        shares as the cash allows, and then follows the close.
+        """
+        weights = pd.DataFrame({"SPY": [1.0]}, index=[self.start_date])
+        backtest = TargetWeightBacktest(
+            self.config, weights, 100000.0,
+            self.start_date, self.end_date, benchmark="SPY"
+        )
+        results = backtest.run()
+
+        first_close = self.spy["Close"].iloc[0]
+        quantity = int(np.floor(100000.0 / PriceParser.display(
+            PriceParser.parse(first_close)
+        )))
+        position = backtest.portfolio_handler.portfolio.positions["SPY"]
+        self.assertEqual(position.quantity, quantity)
+
+        commission = PriceParser.display(position.total_commission, 7)
+        equity = results["equity"]
+        self.assertEqual(len(equity), len(self.spy))
+        self.assertTrue(equity.index.equals(self.spy.index))
+        expected = (
+            100000.0 - commission + quantity * (
+                self.spy["Close"].values - first_close
+            )
+        )
+        np.testing.assert_allclose(equity.values, expected, atol=0.01)
+        self.assertAlmostEqual(
+            results["equity_b"].iloc[-1], self.spy["Close"].iloc[-1], 2
+        )
+
+    def test_sell_before_buy_and_close(self):
+        """
+        Test that rebalancing out of one ticker into another
+        closes its Position and funds the purchase, and that
+        rebalance dates without a bar move to the next bar.
+        """
+        weights = pd.DataFrame(
+            {"SPY": [1.0, 0.0], "AGG": [0.0, 1.0]},
+            index=[datetime.datetime(2010, 1, 2), datetime.datetime(2011, 7, 2)]
+        )
+        backtest = TargetWeightBacktest(
+            self.config, weights, 100000.0, self.start_date, self.end_date
+        )
+        results = backtest.run()
+        portfolio = backtest.portfolio_handler.portfolio
+        self.assertEqual(list(portfolio.positions), ["AGG"])
+        self.assertEqual(len(portfolio.closed_positions), 1)
+        self.assertEqual(results["positions"]["ticker"].tolist(), ["SPY"])
+        self.assertGreater(portfolio.cur_cash, 0)
+        self.assertLess(
+            PriceParser.display(portfolio.cur_cash),
+            PriceParser.display(portfolio.positions["AGG"].avg_price)
+        )
+        self.assertAlmostEqual(
+            results["equity"].iloc[-1],
+            PriceParser.display(portfolio.equity), 2
+        )
+
+    def test_no_rebalances(self):
+        """
+        Test that without weights, or with weights dated only after
+        the last bar, nothing is bought and the equity is the cash.
+        """
+        for weights in (
+            pd.DataFrame({"SPY": []}, index=pd.DatetimeIndex([]), dtype=float),
+            pd.DataFrame({"SPY": [1.0]}, index=[datetime.datetime(2014, 1, 1)]),
+        ):
+            backtest = TargetWeightBacktest(
+                self.config, weights, 100000.0, self.start_date, self.end_date
+            )
+            results = backtest.run()
+            self.assertEqual(len(backtest.portfolio_handler.portfolio.positions), 0)
+            self.assertEqual(len(results["equity"]), len(self.spy))
+            self.assertTrue((results["equity"] == 100000.0).all())
+
+    def test_negative_weights(self):
+        """
+        Test that short target weights are refused.
+        """
+        weights = pd.DataFrame({"SPY": [-0.5]}, index=[self.start_date])
+        with self.assertRaises(ValueError):
+            TargetWeightBacktest(self.config, weights, 100000.0)
+
+    def test_matches_event_driven(self):
+        """
+        Test that a month-end rebalance gives (almost) the same
+        results as the event-driven TradingSession, in which the
+        tickers of a bar are rebalanced one after another.
+        """
+        ticker_weights = {"SPY": 0.6, "AGG": 0.4}
+        tickers = list(ticker_weights)
+        events_queue = BacktestEventQueue()
+        price_handler = YahooDailyCsvBarPriceHandler(
+            self.config.CSV_DATA_DIR, events_queue, tickers,
+            start_date=self.start_date, end_date=self.end_date
+        )
+        session = TradingSession(
+            self.config, MonthEndRebalanceStrategy(events_queue, ticker_weights),
+            tickers, 500000.0, self.start_date, self.end_date, events_queue,
+            price_handler=price_handler, title=["Event"], benchmark="SPY"
+        )
+        expected = session.start_trading(testing=True)
+
+        dates = [date for date in self.spy.index if end_of_month(date)]
+        weights = pd.DataFrame([ticker_weights] * len(dates), index=dates)
+        results = TargetWeightBacktest(
+            self.config, weights, 500000.0, self.start_date, self.end_date,
+            title=["Vectorised"], benchmark="SPY"
+        ).run()
+
+        self.assertEqual(sorted(results), sorted(expected))
+        self.assertTrue(results["equity"].index.equals(expected["equity"].index))
+        np.testing.assert_allclose(
+            results["equity"].values, expected["equity"].values, rtol=0.005
+        )
+        self.assertAlmostEqual(results["sharpe"], expected["sharpe"], 1)
+        np.testing.assert_allclose(
+            results["equity_b"].values, expected["equity_b"].values
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,240 @@
+import datetime
+import unittest
+
+from qstrader.price_handler.yahoo_daily_csv_bar import YahooDailyCsvBarPriceHandler
+from qstrader.compat import queue
+from qstrader import settings
+
+
+class TestYahooColumnarStream(unittest.TestCase):
+    """
+    Test that the columnar streaming mode of the
+    YahooDailyCsvBarPriceHandler emits exactly the same
+    BarEvents, in the same order, as the row-by-row mode.
+    """
+    def setUp(self):
+        """
+        Set up two price handlers over the same tickers
+        and date range, one of them in columnar mode.
+        """
+        self.config = settings.TEST
+        self.tickers = ["SPY", "AGG"]
+        self.start_date = datetime.datetime(2010, 1, 1)
+        self.end_date = datetime.datetime(2011, 1, 1)
+
+    def _stream_all(self, columnar, recycle_events=False):
+        events_queue = queue.Queue()
+        price_handler = YahooDailyCsvBarPriceHandler(
+            self.config.CSV_DATA_DIR, events_queue, self.tickers,
+            start_date=self.start_date, end_date=self.end_date,
+            columnar=columnar, recycle_events=recycle_events
+        )
+        events = []
+        while price_handler.continue_backtest:
+            price_handler.stream_next()
+            while not events_queue.empty():
+                # Take a snapshot as recycled events are overwritten
+                events.append(str(events_queue.get(False)))
+        return price_handler, events
+
+    def test_columnar_events_identical(self):
+        """
+        Both modes should produce identical bars, with
+        identical Python types for every attribute.
+        """
+        ph_rows, rows = self._stream_all(columnar=False)
+        ph_cols, cols = self._stream_all(columnar=True)
+        self.assertEqual(len(rows), 504)
+        self.assertEqual(len(rows), len(cols))
+        self.assertEqual(rows, cols)
+        self.assertEqual(ph_rows.tickers, ph_cols.tickers)
+
+    def test_columnar_attribute_types(self):
+        """
+        The columnar BarEvents should hold the same Python
+        types for every attribute as the row-by-row events.
+        """
+        rows = []
+        cols = []
+        for columnar, events in ((False, rows), (True, cols)):
+            events_queue = queue.Queue()
+            price_handler = YahooDailyCsvBarPriceHandler(
+                self.config.CSV_DATA_DIR, events_queue, self.tickers,
+                start_date=self.start_date, end_date=self.end_date,
+                columnar=columnar
+            )
+            for i in range(10):
+                price_handler.stream_next()
+                events.append(events_queue.get(False))
+        for a, b in zip(rows, cols):
+            for attr in (
+                "ticker", "time", "period", "open_price", "high_price",
+                "low_price", "close_price", "adj_close_price", "volume"
+            ):
+                self.assertEqual(getattr(a, attr), getattr(b, attr))
+                self.assertEqual(
+                    type(getattr(a, attr)), type(getattr(b, attr))
+                )
+
+    def test_columnar_ordering(self):
+        """
+        Bars should be ordered by timestamp and then by ticker.
+        """
+        ph, events = self._stream_all(columnar=True)
+        self.assertIn("Ticker: AGG, Time: 2010-01-04", events[0])
+        self.assertIn("Ticker: SPY, Time: 2010-01-04", events[1])
+        self.assertIn("Ticker: SPY, Time: 2010-12-31", events[-1])
+
+    def test_recycled_events_identical(self):
+        """
+        Recycling a single BarEvent should not change the
+        stream of bars seen by a consumer of the queue.
+        """
+        ph_rows, rows = self._stream_all(columnar=False)
+        ph_cols, cols = self._stream_all(columnar=True, recycle_events=True)
+        self.assertEqual(rows, cols)
+
+        events_queue = queue.Queue()
+        price_handler = YahooDailyCsvBarPriceHandler(
+            self.config.CSV_DATA_DIR, events_queue, self.tickers,
+            columnar=True, recycle_events=True
+        )
+        price_handler.stream_next()
+        price_handler.stream_next()
+        self.assertIs(events_queue.get(False), events_queue.get(False))
+
+
+class TestYahooBatchStream(unittest.TestCase):
+    """
+    Test that the BarBatchEvents streamed in batch mode
+    contain exactly the bars of the row-by-row mode.
+    """
+    def setUp(self):
+        self.config = settings.TEST
+        self.tickers = ["SPY", "AGG"]
+
+    def _price_handler(self, events_queue, **kwargs):
+        return YahooDailyCsvBarPriceHandler(
+            self.config.CSV_DATA_DIR, events_queue, self.tickers,
+            start_date=datetime.datetime(2010, 1, 1),
+            end_date=datetime.datetime(2011, 1, 1),
+            **kwargs
+        )
+
+    def test_batches_contain_bars(self):
+        events_queue = queue.Queue()
+        price_handler = self._price_handler(events_queue, batch_bars=True)
+        batches = []
+        while price_handler.continue_backtest:
+            price_handler.stream_next()
+            while not events_queue.empty():
+                batches.append(events_queue.get(False))
+        self.assertEqual(len(batches), 252)
+        self.assertEqual(
+            [event.typename for event in batches[:2]],
+            ["BAR_BATCH", "BAR_BATCH"]
+        )
+        self.assertEqual(batches[0].tickers, ["AGG", "SPY"])
+        self.assertEqual(batches[0].period_readable, "1day")
+
+        events_queue = queue.Queue()
+        row_handler = self._price_handler(events_queue)
+        rows = []
+        while row_handler.continue_backtest:
+            row_handler.stream_next()
+            while not events_queue.empty():
+                rows.append(str(events_queue.get(False)))
+        self.assertEqual(rows, [str(bar) for batch in batches for bar in batch])
+        self.assertEqual(row_handler.tickers, price_handler.tickers)
+
+
+class TestYahooLazyStream(unittest.TestCase):
+    """
+    Test that the lazy mode of the YahooDailyCsvBarPriceHandler
+    streams the same bars as the eager row-by-row mode, and that
+    tickers can be subscribed and unsubscribed while streaming.
+    """
+    def setUp(self):
+        self.config = settings.TEST
+        self.tickers = ["SPY", "AGG", "GOOG"]
+
+    def _price_handler(self, events_queue, tickers, **kwargs):
+        return YahooDailyCsvBarPriceHandler(
+            self.config.CSV_DATA_DIR, events_queue, tickers,
+            start_date=datetime.datetime(2010, 1, 1),
+            end_date=datetime.datetime(2011, 1, 1),
+            **kwargs
+        )
+
+    def _stream(self, price_handler, events_queue, on_bar=None):
+        bars = []
+        while price_handler.continue_backtest:
+            price_handler.stream_next()
+            while not events_queue.empty():
+                event = events_queue.get(False)
+                bars.append(str(event))
+                if on_bar is not None:
+                    on_bar(event)
+        return bars
+
+    def test_lazy_bars_identical(self):
+        events_queue = queue.Queue()
+        eager = self._stream(
+            self._price_handler(events_queue, self.tickers), events_queue
+        )
+        price_handler = self._price_handler(
+            events_queue, self.tickers, lazy=True, chunksize=100
+        )
+        # Nothing is read until the first bar is streamed
+        self.assertEqual(price_handler.tickers_data, {})
+        self.assertIsNone(price_handler.get_last_close("SPY"))
+        lazy = self._stream(price_handler, events_queue)
+        self.assertEqual(len(eager), 756)
+        self.assertEqual(lazy, eager)
+
+    def test_subscribe_unsubscribe_while_streaming(self):
+        events_queue = queue.Queue()
+        price_handler = self._price_handler(
+            events_queue, ["SPY"], lazy=True, chunksize=50
+        )
+        switch = datetime.datetime(2010, 7, 1)
+
+        times = {}
+
+        def on_bar(event):
+            times.setdefault(event.ticker, []).append(event.time)
+            if event.ticker == "SPY" and event.time >= switch:
+                price_handler.subscribe_ticker("AGG")
+                price_handler.unsubscribe_ticker("SPY")
+
+        self._stream(price_handler, events_queue, on_bar)
+        self.assertEqual(list(price_handler.tickers), ["AGG"])
+        self.assertNotIn("SPY", price_handler.bar_stream)
+        # AGG streams from the bar after the switch, SPY stops there
+        self.assertEqual(times["SPY"][-1], datetime.datetime(2010, 7, 1))
+        self.assertEqual(times["AGG"][0], datetime.datetime(2010, 7, 2))
+        self.assertEqual(times["AGG"][-1], datetime.datetime(2010, 12, 31))
+        self.assertEqual(len(times["SPY"]) + len(times["AGG"]), 252)
+
+    def test_unsubscribe_closes_csv(self):
+        events_queue = queue.Queue()
+        price_handler = self._price_handler(
+            events_queue, self.tickers, lazy=True, chunksize=50
+        )
+        price_handler.stream_next()
+        rows = price_handler.bar_stream._rows["GOOG"]
+        price_handler.unsubscribe_ticker("GOOG")
+        self.assertNotIn("GOOG", price_handler.tickers)
+        self.assertRaises(StopIteration, next, rows)
+        bars = self._stream(price_handler, events_queue)
+        self.assertFalse(any("GOOG" in bar for bar in bars))
+
+    def test_lazy_requires_rows(self):
+        self.assertRaises(
+            ValueError, self._price_handler, queue.Queue(),
+            self.tickers, lazy=True, columnar=True
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()